@@ -33,4 +33,5 @@ setup(
 
     # Requirements
     install_requires=["PySide6>=6.0.0"],
+    extras_require={"occlusion": ["shapely>=2.0"]},
 )
@@ -6,3 +6,20 @@ segments for use with pen plotters or vinyl cutting machines.
 from .version import __version__  # noqa: F401
 from .svg_utils import get_svg_page_size  # noqa: F401
 from .svg_to_outlines import svg_to_outlines  # noqa: F401
+from .qt_bootstrap import ensure_qt_application  # noqa: F401
+from .executor import OutlineExecutor, svg_to_outlines_async  # noqa: F401
+from .streaming import svg_to_outlines_streaming  # noqa: F401
+from .scan import scan_svg  # noqa: F401
+from .layers import svg_to_layer_outlines  # noqa: F401
+from .parallel import svg_to_outlines_parallel  # noqa: F401
+from .thread_pool import OutlineThreadPool  # noqa: F401
+from .batch import svg_to_outlines_batch  # noqa: F401
+from .svg_input import open_svg, parse_svg  # noqa: F401
+from .cache import OutlineCache  # noqa: F401
+from .renderer import OutlineRenderer, RendererCache  # noqa: F401
+from .outline_utils import transform_outlines, step_and_repeat  # noqa: F401
+from .outline_utils import clip_outlines  # noqa: F401
+from .preflight import preflight_svg, PreflightReport  # noqa: F401
+from .arcs import fit_arcs, Arc  # noqa: F401
+from .display_list import DisplayList, capture_display_list  # noqa: F401
+from .display_list import svg_to_outlines_levels  # noqa: F401
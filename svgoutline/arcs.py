@@ -0,0 +1,221 @@
+"""
+Fitting circular arcs to outlines.
+
+Controllers for many machines (e.g. those driven by G-code) can move along
+circular arcs (G2/G3) natively but not along Bezier curves. Drawing a curve
+as a polyline produces a long stream of short straight moves (G1) which
+can overflow the controller's planning buffer and slow the machine down.
+:py:func:`fit_arcs` replaces runs of polyline points with circular arcs (and
+runs of nearly collinear points with single straight lines).
+"""
+
+import math
+
+from collections import namedtuple
+
+
+Arc = namedtuple("Arc", "start end centre sweep")
+"""
+A circular arc segment.
+
+Attributes
+----------
+start, end : (x, y)
+    The start and end points of the arc. (For a full circle these are
+    identical.)
+centre : (x, y)
+    The centre of the circle.
+sweep : float
+    The angle (in radians) the arc sweeps through from start to end. Positive
+    angles rotate from the +x axis towards the +y axis, i.e. clockwise in the
+    SVG coordinate system where y points down (and anticlockwise where y
+    points up).
+"""
+
+
+def fit_arcs(outlines, tolerance=0.05):
+    """
+    Replace runs of points in a list of outlines with circular arcs and
+    straight lines, each deviating from the original outline by no more than
+    'tolerance'.
+
+    Runs are found greedily, each extending as far along the outline as
+    possible. The fitted arcs pass exactly through the first and last point
+    of each run (so consecutive segments are joined) but, since polylines
+    have no tangent information, are not necessarily tangent to each other.
+
+    Parameters
+    ----------
+    outlines : [((r, g, b, a) or None, width, [(x, y), ...]), ...]
+    tolerance : float
+        The maximum distance (in the same units as the outlines, normally mm)
+        between the fitted segments and the original outline. Note that the
+        original outline already deviates from any curves in the SVG (see
+        the 'pixels_per_mm' argument of :py:func:`svgoutline.svg_to_outlines`)
+        and so arcs will only be fitted to curves which are finely flattened
+        compared with this tolerance.
+
+    Returns
+    -------
+    [((r, g, b, a) or None, width, [segment, ...]), ...]
+        The outlines, with each line given as a list of segments. Each
+        segment is either a straight line ((x0, y0), (x1, y1)) or an
+        :py:class:`Arc`. Each segment starts at the end of the previous one.
+        Outlines with fewer than two (distinct) points have no segments.
+    """
+    return [(rgba, width, _fit_line(line, tolerance)) for rgba, width, line in outlines]
+
+
+def _fit_line(line, tolerance):
+    """
+    Fit segments to a single line [(x, y), ...] (see :py:func:`fit_arcs`).
+    """
+    # Remove repeated points
+    points = [p for i, p in enumerate(line) if i == 0 or p != line[i - 1]]
+
+    segments = []
+    i = 0
+    last = len(points) - 1
+    while i < last:
+        # Find the end of the longest run starting at point i which can be
+        # fitted by a line or arc (exponential search followed by binary
+        # search). Runs of two points can always be fitted by a line.
+        end = i + 1
+        step = 1
+        while end + step <= last and _fit(points, i, end + step, tolerance):
+            end += step
+            step *= 2
+        high = min(end + step, last + 1)
+        while high - end > 1:
+            middle = (end + high) // 2
+            if _fit(points, i, middle, tolerance):
+                end = middle
+            else:
+                high = middle
+
+        segments.append(_fit(points, i, end, tolerance))
+        i = end
+
+    return segments
+
+
+def _fit(points, i, j, tolerance):
+    """
+    Fit a straight line or arc to points[i:j + 1]. Returns the segment or
+    None if neither fits within the tolerance.
+    """
+    start = points[i]
+    end = points[j]
+    if j == i + 1 or _fits_line(points, i, j, tolerance):
+        return (start, end)
+    else:
+        return _fit_arc(points, i, j, tolerance)
+
+
+def _fits_line(points, i, j, tolerance):
+    """
+    Test whether points[i:j + 1] all lie within tolerance of the straight
+    line between points[i] and points[j].
+    """
+    x0, y0 = points[i]
+    x1, y1 = points[j]
+    dx = x1 - x0
+    dy = y1 - y0
+    length_squared = (dx * dx) + (dy * dy)
+    if length_squared == 0.0:
+        return False
+
+    for k in range(i + 1, j):
+        x, y = points[k]
+        t = min(1.0, max(0.0, (((x - x0) * dx) + ((y - y0) * dy)) / length_squared))
+        if math.hypot(x - (x0 + (t * dx)), y - (y0 + (t * dy))) > tolerance:
+            return False
+
+    return True
+
+
+def _circle_through(a, b, c):
+    """
+    Return the centre of the circle through three points, or None if they are
+    collinear.
+    """
+    (ax, ay), (bx, by), (cx, cy) = a, b, c
+    d = 2.0 * ((ax * (by - cy)) + (bx * (cy - ay)) + (cx * (ay - by)))
+    if d == 0.0:
+        return None
+
+    a2 = (ax * ax) + (ay * ay)
+    b2 = (bx * bx) + (by * by)
+    c2 = (cx * cx) + (cy * cy)
+    return (
+        ((a2 * (by - cy)) + (b2 * (cy - ay)) + (c2 * (ay - by))) / d,
+        ((a2 * (cx - bx)) + (b2 * (ax - cx)) + (c2 * (bx - ax))) / d,
+    )
+
+
+def _radial_error(point, start, centre, radius):
+    """
+    Return the distance of a point outside (positive) or inside (negative)
+    the circle with the given centre and radius passing through 'start'.
+    """
+    # Computed as (|p - c|^2 - |s - c|^2) / (|p - c| + r) which, unlike the
+    # obvious |p - c| - r, remains accurate for nearly straight arcs where
+    # the radius is many orders of magnitude larger than the error.
+    (x, y), (sx, sy), (cx, cy) = point, start, centre
+    difference = ((x - sx) * (x + sx - (2.0 * cx))) + (
+        (y - sy) * (y + sy - (2.0 * cy))
+    )
+    return difference / (math.hypot(x - cx, y - cy) + radius)
+
+
+def _fit_arc(points, i, j, tolerance):
+    """
+    Fit an arc to points[i:j + 1], returning an :py:class:`Arc` or None if
+    no arc fits within the tolerance.
+    """
+    start = points[i]
+    end = points[j]
+    if start != end:
+        centre = _circle_through(start, points[(i + j) // 2], end)
+    else:
+        # A closed loop: fit a full circle
+        n = j - i
+        centre = _circle_through(start, points[i + (n // 3)], points[i + (2 * n // 3)])
+    if centre is None:
+        return None
+
+    cx, cy = centre
+    radius = math.hypot(start[0] - cx, start[1] - cy)
+
+    sweep = 0.0
+    for k in range(i, j):
+        x0, y0 = points[k]
+        x1, y1 = points[k + 1]
+
+        # The lines between the points must stay close to the circle. Lines
+        # are furthest outside the circle at their ends and furthest inside
+        # at the point closest to the centre.
+        if abs(_radial_error((x1, y1), start, centre, radius)) > tolerance:
+            return None
+        dx = x1 - x0
+        dy = y1 - y0
+        length_squared = (dx * dx) + (dy * dy)
+        t = min(1.0, max(0.0, (((cx - x0) * dx) + ((cy - y0) * dy)) / length_squared))
+        closest = (x0 + (t * dx), y0 + (t * dy))
+        if -_radial_error(closest, start, centre, radius) > tolerance:
+            return None
+
+        # The points must progress around the circle in a consistent
+        # direction
+        step = math.atan2(
+            ((x0 - cx) * (y1 - cy)) - ((y0 - cy) * (x1 - cx)),
+            ((x0 - cx) * (x1 - cx)) + ((y0 - cy) * (y1 - cy)),
+        )
+        if step * sweep < 0.0:
+            return None
+        sweep += step
+
+    if abs(sweep) > (2.0 * math.pi) + 1e-9:
+        return None
+
+    return Arc(start, end, centre, sweep)
@@ -0,0 +1,113 @@
+"""
+Pipelined extraction of outlines from a batch of SVGs.
+
+Reading, parsing and pre-processing SVGs does not involve Qt and so can be
+overlapped with rendering. Here, a pool of threads prepares upcoming
+documents while the calling thread renders the current one. When reading
+documents is slow (e.g. from network storage), the total time taken
+approaches that of just rendering them.
+"""
+
+import os
+
+from collections import deque
+
+from concurrent.futures import ThreadPoolExecutor
+
+from svgoutline.svg_input import parse_svg
+from svgoutline.svg_utils import get_svg_page_size
+from svgoutline.svg_to_outlines import (
+    serialise_svg,
+    load_serialised_svg_renderer,
+    render_outlines,
+)
+from svgoutline.qt_bootstrap import ensure_qt_application
+
+
+def svg_to_outlines_batch(
+    sources,
+    width_mm=None,
+    height_mm=None,
+    pixels_per_mm=5.0,
+    prefetch=4,
+    max_workers=None,
+):
+    """
+    Extract the outlines from each of a series of SVGs, generating lists of
+    outlines in the same order as the input.
+
+    Each SVG is read, parsed and pre-processed in a pool of background
+    threads up to 'prefetch' documents ahead of the one being rendered.
+    Rendering is performed in the calling thread.
+
+    Parameters
+    ----------
+    sources : iterable
+        The SVGs to render. Each may be an already parsed ElementTree or
+        anything accepted by :py:func:`svgoutline.svg_input.open_svg` (e.g.
+        a filename, bytes or a file object opened in binary mode). The
+        iterable is consumed lazily, no more than 'prefetch' items ahead.
+    width_mm, height_mm, pixels_per_mm
+        See :py:func:`svgoutline.svg_to_outlines`. These apply to every SVG.
+        If the page size is not given, it is determined separately for each
+        SVG.
+    prefetch : int
+        The maximum number of SVGs to be prepared in advance of the one being
+        rendered. This bounds the memory used by prepared-but-unrendered
+        documents.
+    max_workers : int or None
+        The number of threads used to prepare SVGs. Defaults to 'prefetch'.
+
+    Generates
+    ---------
+    [((r, g, b, a) or None, width, [(x, y), ...]), ...]
+        The outlines for each SVG in turn. See
+        :py:func:`svgoutline.svg_to_outlines`.
+    """
+    ensure_qt_application()
+
+    sources = iter(sources)
+    pending = deque()
+
+    with ThreadPoolExecutor(
+        max_workers or prefetch or os.cpu_count() or 1,
+        thread_name_prefix="svgoutline-batch",
+    ) as executor:
+        try:
+            while True:
+                # Keep up to 'prefetch' documents queued beyond the next one
+                for source in sources:
+                    pending.append(
+                        executor.submit(_prepare_svg, source, width_mm, height_mm)
+                    )
+                    if len(pending) > prefetch:
+                        break
+                if not pending:
+                    break
+
+                svg_data, page_width_mm, page_height_mm = pending.popleft().result()
+                yield render_outlines(
+                    load_serialised_svg_renderer(svg_data),
+                    page_width_mm,
+                    page_height_mm,
+                    pixels_per_mm,
+                )
+        finally:
+            # If the generator is closed early or rendering fails, don't
+            # bother preparing documents which won't be rendered.
+            for future in pending:
+                future.cancel()
+
+
+def _prepare_svg(source, width_mm, height_mm):
+    """
+    Read, parse and pre-process an SVG (in a background thread). Returns
+    (svg_data, width_mm, height_mm) where svg_data is suitable for
+    :py:func:`svgoutline.svg_to_outlines.load_serialised_svg_renderer`.
+    """
+    root = parse_svg(source)
+
+    if width_mm is None or height_mm is None:
+        width_mm, height_mm = get_svg_page_size(root)
+
+    return (serialise_svg(root), width_mm, height_mm)
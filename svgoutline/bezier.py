@@ -0,0 +1,173 @@
+"""
+Utilities for working with straight line and Bezier curve segments.
+
+Segments are given as tuples of two (a straight line), three (a quadratic
+Bezier curve) or four (a cubic Bezier curve) (x, y) control points. The
+first and last points are the segment's start and end points.
+"""
+
+import math
+
+
+# Gauss-Legendre quadrature nodes and weights (5 point, on [-1, 1])
+_GAUSS_LEGENDRE = [
+    (0.0, 0.5688888888888889),
+    (-0.5384693101056831, 0.4786286704993665),
+    (0.5384693101056831, 0.4786286704993665),
+    (-0.9061798459386640, 0.2369268850561891),
+    (0.9061798459386640, 0.2369268850561891),
+]
+
+# Relative tolerance to which curve lengths are computed
+LENGTH_TOLERANCE = 1e-9
+
+# Maximum subdivision depth used when computing curve lengths
+_MAX_LENGTH_DEPTH = 20
+
+
+def point_at(segment, t):
+    """
+    Return the (x, y) point at parameter 't' (0.0 to 1.0) along a segment.
+    """
+    points = list(segment)
+    while len(points) > 1:
+        points = [
+            (x0 + (x1 - x0) * t, y0 + (y1 - y0) * t)
+            for (x0, y0), (x1, y1) in zip(points, points[1:])
+        ]
+    return points[0]
+
+
+def split_segment(segment, t):
+    """
+    Split a segment at parameter 't' (0.0 to 1.0), returning the two halves
+    (segments of the same degree).
+    """
+    # De Casteljau's algorithm
+    before = []
+    after = []
+    points = list(segment)
+    while points:
+        before.append(points[0])
+        after.append(points[-1])
+        points = [
+            (x0 + (x1 - x0) * t, y0 + (y1 - y0) * t)
+            for (x0, y0), (x1, y1) in zip(points, points[1:])
+        ]
+    return tuple(before), tuple(reversed(after))
+
+
+def _derivative(segment):
+    """
+    Return the control points of the derivative of a (Bezier) segment.
+    """
+    n = len(segment) - 1
+    return [
+        (n * (x1 - x0), n * (y1 - y0))
+        for (x0, y0), (x1, y1) in zip(segment, segment[1:])
+    ]
+
+
+def _integrate_speed(derivative, t0, t1):
+    """
+    Integrate the speed (magnitude of the derivative) over [t0, t1] using
+    Gauss-Legendre quadrature.
+    """
+    half = (t1 - t0) / 2.0
+    middle = (t0 + t1) / 2.0
+    return half * sum(
+        weight * math.hypot(*point_at(derivative, middle + (half * node)))
+        for node, weight in _GAUSS_LEGENDRE
+    )
+
+
+def _adaptive_length(derivative, t0, t1, estimate, depth):
+    """
+    Compute the length of a curve between t0 and t1, subdividing until the
+    length of the halves agree with the whole.
+    """
+    tm = (t0 + t1) / 2.0
+    left = _integrate_speed(derivative, t0, tm)
+    right = _integrate_speed(derivative, tm, t1)
+    length = left + right
+    converged = abs(length - estimate) <= LENGTH_TOLERANCE * length
+    if converged or depth >= _MAX_LENGTH_DEPTH:
+        return length
+
+    left = _adaptive_length(derivative, t0, tm, left, depth + 1)
+    right = _adaptive_length(derivative, tm, t1, right, depth + 1)
+    return left + right
+
+
+def segment_length(segment, t=1.0):
+    """
+    Return the length of a segment from its start to parameter 't' (by
+    default, its full length).
+    """
+    if len(segment) == 2:
+        (x0, y0), (x1, y1) = segment
+        return math.hypot(x1 - x0, y1 - y0) * t
+
+    derivative = _derivative(segment)
+    estimate = _integrate_speed(derivative, 0.0, t)
+    return _adaptive_length(derivative, 0.0, t, estimate, 0)
+
+
+def parameter_at_length(segment, length, total_length=None):
+    """
+    Return the parameter 't' at which a segment reaches the given length
+    (measured from its start). If already known, the total length of the
+    segment may be given as 'total_length'.
+    """
+    if total_length is None:
+        total_length = segment_length(segment)
+
+    if length <= 0.0 or total_length <= 0.0:
+        return 0.0
+    elif length >= total_length:
+        return 1.0
+    elif len(segment) == 2:
+        return length / total_length
+
+    # Newton's method, falling back on bisection when a step leaves the
+    # bracketing interval (e.g. near cusps where the speed is zero)
+    derivative = _derivative(segment)
+    low = 0.0
+    high = 1.0
+    t = length / total_length
+    for _ in range(100):
+        error = segment_length(segment, t) - length
+        if abs(error) <= LENGTH_TOLERANCE * total_length:
+            break
+
+        if error < 0.0:
+            low = t
+        else:
+            high = t
+
+        speed = math.hypot(*point_at(derivative, t))
+        t_next = t - (error / speed) if speed > 0.0 else -1.0
+        t = t_next if low < t_next < high else (low + high) / 2.0
+
+    return t
+
+
+def cubic_to_quadratic(segment):
+    """
+    If a cubic segment is exactly a quadratic Bezier curve (e.g. as produced
+    when Qt converts a quadratic curve to a cubic one), return the equivalent
+    quadratic segment. Otherwise, return the cubic segment unchanged.
+    """
+    (x0, y0), (x1, y1), (x2, y2), (x3, y3) = segment
+
+    # The quadratic control point, as implied by each cubic control point
+    qx1 = ((3.0 * x1) - x0) / 2.0
+    qy1 = ((3.0 * y1) - y0) / 2.0
+    qx2 = ((3.0 * x2) - x3) / 2.0
+    qy2 = ((3.0 * y2) - y3) / 2.0
+
+    tolerance = 1e-9 * max(1.0, abs(qx1), abs(qy1), abs(qx2), abs(qy2))
+    if abs(qx1 - qx2) <= tolerance and abs(qy1 - qy2) <= tolerance:
+        return ((x0, y0), ((qx1 + qx2) / 2.0, (qy1 + qy2) / 2.0), (x3, y3))
+    else:
+        return segment
@@ -0,0 +1,326 @@
+"""
+A persistent, size-bounded, on-disk cache of extracted outlines.
+
+Entries are keyed by a hash of the SVG's bytes, the rendering parameters and
+the svgoutline version and are stored in a compact binary format, one file
+per entry. When the total size of the cache exceeds its limit, the least
+recently used entries (according to their modification times, which are
+updated on every cache hit) are removed.
+
+Entries are written to a temporary file which is then atomically renamed into
+place so the cache may safely be shared by several processes (and threads)
+at once: readers will see either a complete entry or no entry at all.
+Temporary files abandoned by writers which crashed are removed once they are
+:py:data:`STALE_TEMP_AGE` seconds old.
+"""
+
+import os
+import io
+import mmap
+import struct
+import time
+import hashlib
+import tempfile
+
+from xml.etree import ElementTree
+
+from svgoutline.version import __version__
+
+
+# File extension used for cache entries
+ENTRY_SUFFIX = ".outlines"
+
+# File extension used for partially written cache entries
+TEMP_SUFFIX = ".tmp"
+
+# The age (in seconds) after which a partially written cache entry is assumed
+# to have been abandoned (e.g. by a process which crashed while writing it)
+STALE_TEMP_AGE = 60 * 60
+
+# Magic number and format version at the start of every cache entry
+ENTRY_MAGIC = b"SVGO"
+ENTRY_FORMAT_VERSION = 1
+
+# Entry header: magic, format version, number of outlines
+_HEADER = struct.Struct("<4sII")
+
+# Outline header: has colour, r, g, b, a, width, number of points
+_OUTLINE_HEADER = struct.Struct("<?4ddI")
+
+# Number of bytes read at a time when hashing files
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def encode_outlines(outlines):
+    """
+    Encode a list of outlines (as produced by
+    :py:func:`svgoutline.svg_to_outlines`) into a compact binary form.
+    """
+    out = [_HEADER.pack(ENTRY_MAGIC, ENTRY_FORMAT_VERSION, len(outlines))]
+    for rgba, width, line in outlines:
+        out.append(
+            _OUTLINE_HEADER.pack(
+                rgba is not None,
+                *(rgba or (0.0, 0.0, 0.0, 0.0)),
+                width,
+                len(line),
+            )
+        )
+        out.append(struct.pack(f"<{len(line) * 2}d", *(v for p in line for v in p)))
+    return b"".join(out)
+
+
+def decode_outlines(data):
+    """
+    Decode outlines encoded by :py:func:`encode_outlines`. Raises ValueError
+    if the data is not valid.
+    """
+    try:
+        magic, format_version, num_outlines = _HEADER.unpack_from(data, 0)
+        if magic != ENTRY_MAGIC or format_version != ENTRY_FORMAT_VERSION:
+            raise ValueError("Not a cache entry (or unsupported version).")
+        offset = _HEADER.size
+
+        outlines = []
+        for _ in range(num_outlines):
+            has_colour, r, g, b, a, width, num_points = _OUTLINE_HEADER.unpack_from(
+                data, offset
+            )
+            offset += _OUTLINE_HEADER.size
+
+            coords = iter(struct.unpack_from(f"<{num_points * 2}d", data, offset))
+            offset += num_points * 2 * 8
+
+            rgba = (r, g, b, a) if has_colour else None
+            outlines.append((rgba, width, list(zip(coords, coords))))
+    except struct.error as exc:
+        raise ValueError(f"Truncated cache entry: {exc}")
+
+    if offset != len(data):
+        raise ValueError("Unexpected data at end of cache entry.")
+
+    return outlines
+
+
+def hash_svg(source):
+    """
+    Compute a SHA-256 hash of an SVG's content.
+
+    Parameters
+    ----------
+    source
+        The SVG in any form accepted by :py:func:`svgoutline.svg_to_outlines`.
+        Filenames, buffers and file objects are hashed as raw (possibly
+        compressed) bytes without being parsed. Parsed ElementTrees are hashed
+        in their serialised form.
+
+    Returns
+    -------
+    digest, source
+        The digest (bytes) and the source to use for subsequent rendering.
+        Non-seekable file objects cannot be read twice so, in that case, the
+        returned source will hold the data read while computing the hash. In
+        all other cases the source is returned unchanged.
+    """
+    content_hash = hashlib.sha256()
+
+    if ElementTree.iselement(source):
+        content_hash.update(ElementTree.tostring(source))
+    elif isinstance(source, ElementTree.ElementTree):
+        content_hash.update(ElementTree.tostring(source.getroot()))
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+                content_hash.update(block)
+    elif hasattr(source, "read") and not isinstance(source, mmap.mmap):
+        seekable = getattr(source, "seekable", lambda: False)()
+        if seekable:
+            position = source.tell()
+            for block in iter(lambda: source.read(_HASH_BLOCK_SIZE), b""):
+                content_hash.update(block)
+            source.seek(position)
+        else:
+            data = source.read()
+            content_hash.update(data)
+            source = io.BytesIO(data)
+    else:
+        content_hash.update(source)
+
+    return content_hash.digest(), source
+
+
+class OutlineCache(object):
+    """
+    A persistent cache of outlines produced by
+    :py:func:`svgoutline.svg_to_outlines`. Typically used via the 'cache'
+    argument of that function::
+
+        cache = OutlineCache("/var/cache/svgoutline")
+        outlines = svg_to_outlines("example.svg", cache=cache)
+    """
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024):
+        """
+        Parameters
+        ----------
+        directory : str
+            The directory in which to store the cache entries. Will be created
+            if it does not exist.
+        max_bytes : int
+            The maximum total size of the cache entries. When exceeded, the
+            least recently used entries are removed.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+        os.makedirs(directory, exist_ok=True)
+
+    def make_key(
+        self,
+        source,
+        width_mm=None,
+        height_mm=None,
+        pixels_per_mm=5.0,
+        clip=None,
+        occlusion=False,
+        cache_instances=False,
+        cache_glyphs=False,
+    ):
+        """
+        Compute the cache key for the given arguments to
+        :py:func:`svgoutline.svg_to_outlines`.
+
+        NB: 'cache_instances' and 'cache_glyphs' are included since they may
+        change the outlines produced very slightly.
+
+        Returns
+        -------
+        key, source
+            The key (a str) and the source to use for rendering (see
+            :py:func:`hash_svg`).
+        """
+        content_hash, source = hash_svg(source)
+
+        key_hash = hashlib.sha256()
+        key_hash.update(
+            repr(
+                (
+                    __version__,
+                    width_mm,
+                    height_mm,
+                    pixels_per_mm,
+                    clip,
+                    occlusion,
+                    cache_instances,
+                    cache_glyphs,
+                )
+            ).encode("utf-8")
+        )
+        key_hash.update(content_hash)
+
+        return key_hash.hexdigest(), source
+
+    def _filename(self, key):
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def get(self, key):
+        """
+        Return the cached outlines for the given key or None if not in the
+        cache.
+        """
+        filename = self._filename(key)
+        try:
+            with open(filename, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+
+        try:
+            outlines = decode_outlines(data)
+        except ValueError:
+            # Corrupt entry, treat as a cache miss
+            return None
+
+        # Mark as recently used
+        try:
+            os.utime(filename)
+        except OSError:
+            pass
+
+        return outlines
+
+    def put(self, key, outlines):
+        """
+        Add outlines to the cache, evicting the least recently used entries if
+        the cache has grown too large.
+        """
+        fd, temp_filename = tempfile.mkstemp(dir=self.directory, suffix=TEMP_SUFFIX)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(encode_outlines(outlines))
+            os.replace(temp_filename, self._filename(key))
+        except BaseException:
+            try:
+                os.remove(temp_filename)
+            except OSError:
+                pass
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache is no larger
+        than max_bytes.
+
+        Stale temporary files (see :py:data:`STALE_TEMP_AGE`) are also
+        removed. Other temporary files (entries still being written) count
+        towards the size of the cache but are not removed.
+        """
+        stale_before = time.time() - STALE_TEMP_AGE
+
+        entries = []
+        total_bytes = 0
+        for entry in os.scandir(self.directory):
+            is_entry = entry.name.endswith(ENTRY_SUFFIX)
+            is_temp = entry.name.endswith(TEMP_SUFFIX)
+            if not (is_entry or is_temp):
+                continue
+
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                # Removed by another process
+                continue
+
+            if is_temp and stat.st_mtime < stale_before:
+                # Abandoned by a crashed writer
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+                continue
+
+            if is_entry:
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total_bytes += stat.st_size
+
+        entries.sort()
+        for _mtime, size, path in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # Removed by another process
+                pass
+            total_bytes -= size
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(ENTRY_SUFFIX):
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,281 @@
+"""
+Capturing the geometry drawn by an SVG for cheap rendering at several
+resolutions.
+
+Curves are flattened into straight lines (and lines dashed) while QSvg paints
+the document, at a resolution fixed by the 'pixels_per_mm' argument of
+:py:func:`svgoutline.svg_to_outlines`. Changing the resolution therefore
+normally requires the whole document to be painted again. Instead,
+:py:func:`capture_display_list` records the paths QSvg draws (along with the
+pen, transform and opacity used for each) in a :py:class:`DisplayList` which
+can be flattened at any resolution without involving QSvg again.
+
+:py:func:`svg_to_outlines_levels` uses this to produce outlines at several
+levels of detail (coarsest first) from a single render, e.g. so that a viewer
+can show a rough preview of a large document almost immediately.
+"""
+
+from PySide6.QtGui import QPainter
+from PySide6.QtCore import QRectF
+
+from svgoutline.svg_input import parse_svg
+from svgoutline.svg_utils import get_svg_page_size
+from svgoutline.svg_to_outlines import (
+    load_svg_renderer,
+    keeps_aspect_ratio,
+    get_view_box_transform,
+)
+from svgoutline.outline_painter import OutlinePaintDevice
+from svgoutline.outline_utils import page_bounds, clip_outlines
+from svgoutline.qt_bootstrap import ensure_qt_application
+
+
+# Line widths are rounded to this many decimal places when matching the
+# widths of outlines at different levels of detail (so that widths differing
+# only due to floating point rounding are shared).
+WIDTH_KEY_DECIMALS = 9
+
+
+class DisplayList(object):
+    """
+    The paths drawn by an SVG, ready to be flattened into outlines at any
+    resolution.
+
+    Example::
+
+        display_list = capture_display_list("example.svg")
+        preview = display_list.render(pixels_per_mm=1.0)
+        outlines = display_list.render(pixels_per_mm=20.0)
+
+    Rendering a display list produces the same outlines as
+    :py:func:`svgoutline.svg_to_outlines` would at the same resolution (up to
+    floating point rounding in the least significant digits).
+    Display lists are not modified by rendering and may be rendered from
+    several threads at once (so long as a Qt application exists).
+    """
+
+    def __init__(
+        self,
+        width_mm,
+        height_mm,
+        view_box,
+        keep_aspect_ratio,
+        items,
+        occlusion=False,
+    ):
+        """
+        Parameters
+        ----------
+        width_mm, height_mm : float
+            The page size (in mm).
+        view_box : (x, y, width, height)
+            The SVG's view box.
+        keep_aspect_ratio : bool
+            True if the view box is to be scaled uniformly onto the page.
+        items : [(path_data, pen, brush, transform, opacity), ...]
+            The paths drawn, as produced by
+            :py:meth:`svgoutline.outline_painter.OutlinePaintDevice.getDisplayList`,
+            with transforms mapping into view box coordinates.
+        occlusion : bool
+            True if the items include paths which are filled but not stroked
+            (i.e. the display list may be rendered with 'occlusion').
+        """
+        self.width_mm = width_mm
+        self.height_mm = height_mm
+        self.view_box = view_box
+        self.keep_aspect_ratio = keep_aspect_ratio
+        self.items = items
+        self.occlusion = occlusion
+
+    def __len__(self):
+        return len(self.items)
+
+    def render(
+        self,
+        pixels_per_mm=5.0,
+        cache_instances=False,
+        cache_glyphs=False,
+        occlusion=False,
+        curves=False,
+    ):
+        """
+        Flatten (and dash) the paths in the display list and return the
+        resulting outlines. See :py:func:`svgoutline.svg_to_outlines` for a
+        description of the arguments and return value.
+        """
+        if occlusion and not self.occlusion:
+            raise ValueError(
+                "Display list was not captured with occlusion (filled-only "
+                "elements were omitted)."
+            )
+
+        outline_paint_device = OutlinePaintDevice(
+            self.width_mm,
+            self.height_mm,
+            pixels_per_mm,
+            cache_instances,
+            cache_glyphs,
+            occlusion,
+            curves,
+        )
+
+        # NB: The view box is mapped onto the page exactly as QSvg would map
+        # it onto this device (i.e. using its size in whole pixels) so that
+        # the outlines match those produced by svg_to_outlines.
+        outline_paint_device.replay(
+            self.items,
+            get_view_box_transform(
+                QRectF(*self.view_box),
+                self.keep_aspect_ratio,
+                outline_paint_device.width(),
+                outline_paint_device.height(),
+            ),
+        )
+        return outline_paint_device.getOutlines()
+
+    def render_levels(
+        self,
+        levels=(1.0, 5.0, 20.0),
+        cache_instances=False,
+        cache_glyphs=False,
+        occlusion=False,
+    ):
+        """
+        Render the display list at several levels of detail, coarsest first.
+
+        Each level is identical to the output of
+        :py:func:`svgoutline.svg_to_outlines` at that resolution (see
+        :py:meth:`render`). The levels share their colour and width
+        metadata: outlines drawn in the same colour at different levels refer
+        to the same (r, g, b, a) tuple and widths which are equal up to
+        rounding refer to the same value. (Like
+        :py:func:`svgoutline.svg_to_outlines`, line widths may differ very
+        slightly between resolutions at which the page is not a whole number
+        of pixels in size.)
+
+        Parameters
+        ----------
+        levels : [pixels_per_mm, ...]
+            The resolutions to render (in any order).
+        cache_instances, cache_glyphs, occlusion
+            See :py:func:`svgoutline.svg_to_outlines`.
+
+        Generates
+        ---------
+        (pixels_per_mm, [((r, g, b, a) or None, width, [(x, y), ...]), ...])
+            The outlines at each level, in order of increasing resolution.
+        """
+        # {rgba: rgba, ...}
+        colours = {}
+        # {rounded_width: width, ...}
+        widths = {}
+        for pixels_per_mm in sorted(levels):
+            outlines = []
+            for rgba, width, line in self.render(
+                pixels_per_mm, cache_instances, cache_glyphs, occlusion
+            ):
+                rgba = colours.setdefault(rgba, rgba)
+                width = widths.setdefault(round(width, WIDTH_KEY_DECIMALS), width)
+                outlines.append((rgba, width, line))
+            yield pixels_per_mm, outlines
+
+
+def capture_display_list(root, width_mm=None, height_mm=None, occlusion=False):
+    """
+    Paint an SVG and record the paths drawn in a :py:class:`DisplayList`.
+
+    Parameters
+    ----------
+    root
+        The SVG, in any form accepted by :py:func:`svgoutline.svg_to_outlines`.
+    width_mm, height_mm : float
+        The page size (in mm). If not given, the size is taken from the SVG.
+    occlusion : bool
+        If True, also record paths which are filled but not stroked so that
+        the display list may be rendered with 'occlusion'. Otherwise these
+        are omitted to save time.
+
+    Returns
+    -------
+    :py:class:`DisplayList`
+    """
+    # This method internally uses various parts of Qt which require that a Qt
+    # application exists. If one does not exist, one will be created.
+    ensure_qt_application()
+
+    root = parse_svg(root)
+
+    # Determine the page size from the document if necessary
+    if width_mm is None or height_mm is None:
+        width_mm, height_mm = get_svg_page_size(root)
+
+    svg_renderer = load_svg_renderer(root, prune=not occlusion)
+
+    # The view box is mapped onto itself so that the paths are captured in
+    # view box coordinates, independent of any particular resolution. (The
+    # device's resolution is therefore irrelevant.)
+    view_box = svg_renderer.viewBoxF()
+    outline_paint_device = OutlinePaintDevice(width_mm, height_mm, capture=True)
+    painter = QPainter(outline_paint_device)
+    try:
+        svg_renderer.render(painter, view_box)
+    finally:
+        painter.end()
+
+    return DisplayList(
+        width_mm,
+        height_mm,
+        view_box.getRect(),
+        keeps_aspect_ratio(svg_renderer),
+        outline_paint_device.getDisplayList(),
+        occlusion,
+    )
+
+
+def svg_to_outlines_levels(
+    root,
+    width_mm=None,
+    height_mm=None,
+    levels=(1.0, 5.0, 20.0),
+    cache_instances=False,
+    cache_glyphs=False,
+    clip=None,
+    occlusion=False,
+):
+    """
+    Like :py:func:`svgoutline.svg_to_outlines` but produces outlines at
+    several levels of detail (resolutions) from a single render of the SVG,
+    yielding the coarsest level first.
+
+    The SVG is rendered into a :py:class:`DisplayList` just once. Each level
+    is then produced by flattening the captured paths at that level's
+    resolution (see :py:meth:`DisplayList.render_levels`).
+
+    Example::
+
+        for pixels_per_mm, outlines in svg_to_outlines_levels("example.svg"):
+            viewer.show(outlines)
+
+    Parameters
+    ----------
+    root, width_mm, height_mm, cache_instances, cache_glyphs, clip, occlusion
+        See :py:func:`svgoutline.svg_to_outlines`.
+    levels : [pixels_per_mm, ...]
+        The resolutions to render (in any order).
+
+    Generates
+    ---------
+    (pixels_per_mm, [((r, g, b, a) or None, width, [(x, y), ...]), ...])
+        The outlines at each level, in order of increasing resolution.
+    """
+    display_list = capture_display_list(root, width_mm, height_mm, occlusion)
+
+    if clip is True:
+        clip = page_bounds(display_list.width_mm, display_list.height_mm)
+
+    for pixels_per_mm, outlines in display_list.render_levels(
+        levels, cache_instances, cache_glyphs, occlusion
+    ):
+        if clip is not None and clip is not False:
+            outlines = clip_outlines(outlines, clip)
+        yield pixels_per_mm, outlines
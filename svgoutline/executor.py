@@ -0,0 +1,388 @@
+"""
+An asyncio-friendly front-end to :py:func:`svgoutline.svg_to_outlines` which
+runs the (blocking) Qt rendering process in a bounded pool of worker
+processes.
+
+Each worker process creates its QGuiApplication once, when it starts, and
+then services rendering jobs until it is shut down. Since a worker process
+can be killed at any time without affecting the caller, per-call timeouts and
+cancellation are implemented by simply killing (and later replacing) the
+worker process handling the job.
+"""
+
+import os
+import asyncio
+import multiprocessing
+
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from xml.etree import ElementTree
+
+from svgoutline.svg_input import open_svg
+
+
+def _worker_main(connection):
+    """
+    Entry point for worker processes. Receives jobs of the form (svg_data,
+    width_mm, height_mm, pixels_per_mm), where svg_data is the SVG document
+    as (possibly gzip compressed) bytes, from the connection and replies with
+    (True, outlines) on success or (False, exception) on failure. Exits when
+    the connection is closed or None is received.
+    """
+    from svgoutline.svg_to_outlines import svg_to_outlines
+    from svgoutline.svg_input import parse_svg
+    from svgoutline.qt_bootstrap import ensure_qt_application
+
+    # Start Qt up-front so that the first job does not pay for it
+    ensure_qt_application(preload_fonts=True)
+
+    while True:
+        try:
+            job = connection.recv()
+        except (EOFError, OSError):
+            break
+        if job is None:
+            break
+
+        svg_data, width_mm, height_mm, pixels_per_mm = job
+        try:
+            result = (
+                True,
+                svg_to_outlines(
+                    parse_svg(svg_data),
+                    width_mm,
+                    height_mm,
+                    pixels_per_mm,
+                ),
+            )
+        except Exception as exc:
+            result = (False, exc)
+
+        try:
+            connection.send(result)
+        except Exception as exc:
+            # The exception raised could not be pickled, send a description
+            # of it instead.
+            connection.send((False, RuntimeError(repr(exc))))
+
+
+def _read_svg(source):
+    """
+    Return an SVG, given in any of the forms accepted by
+    :py:func:`svgoutline.svg_to_outlines`, as bytes which may be sent to a
+    worker process.
+    """
+    if ElementTree.iselement(source):
+        return ElementTree.tostring(source)
+    elif isinstance(source, ElementTree.ElementTree):
+        return ElementTree.tostring(source.getroot())
+    elif isinstance(source, bytes):
+        return source
+    else:
+        # Filenames, file objects and other buffers (e.g. mmaps) cannot be
+        # sent to another process and so are read here
+        with open_svg(source) as file:
+            return file.read()
+
+
+async def _acquire(semaphore, timeout):
+    """
+    Acquire an asyncio.Semaphore, waiting at most 'timeout' seconds (or
+    indefinitely if None). Raises asyncio.TimeoutError on timeout.
+
+    NB: Prior to Python 3.12, asyncio.wait_for(semaphore.acquire(), timeout)
+    can raise (on timeout or cancellation) even though the semaphore was
+    acquired, leaking it. Here the acquisition is shielded from wait_for and,
+    if it completed anyway, the semaphore is released again before raising.
+    """
+    acquire = asyncio.ensure_future(semaphore.acquire())
+    try:
+        await asyncio.wait_for(asyncio.shield(acquire), timeout)
+    except BaseException:
+        # NB: Cancelling a pending acquisition is handled by the semaphore.
+        # Only one which has already completed must be undone.
+        if not acquire.cancel():
+            if not acquire.cancelled() and acquire.exception() is None:
+                semaphore.release()
+        raise
+
+
+class _Worker(object):
+    """
+    A single worker process. The process is started lazily by the first call
+    to :py:meth:`call`.
+    """
+
+    def __init__(self, mp_context):
+        self._mp_context = mp_context
+        self._process = None
+        self._connection = None
+
+    def call(self, job):
+        """
+        Send a job to the worker process and block until it completes. Raises
+        BrokenProcessPool if the worker dies (or is killed) before replying.
+        """
+        if self._process is None:
+            self._connection, child_connection = self._mp_context.Pipe()
+            self._process = self._mp_context.Process(
+                target=_worker_main,
+                args=(child_connection,),
+                daemon=True,
+            )
+            self._process.start()
+            child_connection.close()
+
+        try:
+            self._connection.send(job)
+            success, value = self._connection.recv()
+        except (EOFError, OSError):
+            self._connection.close()
+            raise BrokenProcessPool("Worker process terminated unexpectedly.")
+
+        if success:
+            return value
+        else:
+            raise value
+
+    def shutdown(self):
+        """Ask the worker process to exit once it has finished its job."""
+        if self._process is not None:
+            try:
+                self._connection.send(None)
+            except (EOFError, OSError):
+                pass
+            self._process.join()
+            self._connection.close()
+
+    def kill(self):
+        """
+        Immediately kill the worker process. Any thread blocked in
+        :py:meth:`call` will receive a BrokenProcessPool exception.
+        """
+        if self._process is not None:
+            self._process.kill()
+            self._process.join()
+
+
+class OutlineExecutor(object):
+    """
+    Runs :py:func:`svgoutline.svg_to_outlines` jobs in a bounded pool of
+    worker processes without blocking the asyncio event loop.
+
+    Example::
+
+        async with OutlineExecutor(max_workers=4) as executor:
+            outlines = await executor.svg_to_outlines(root, timeout=30)
+
+    An executor may be used from several event loops in turn (e.g. by
+    successive calls to :py:func:`asyncio.run`) but not from more than one
+    at a time.
+    """
+
+    def __init__(self, max_workers=None, max_queue=None, mp_context=None):
+        """
+        Parameters
+        ----------
+        max_workers : int or None
+            The maximum number of worker processes (and hence concurrently
+            rendered SVGs). Defaults to the number of CPUs.
+        max_queue : int or None
+            The maximum number of jobs which may be waiting for a worker to
+            become free. Once exceeded, further jobs are immediately rejected
+            with :py:exc:`asyncio.QueueFull`. If None, the queue is unbounded.
+        mp_context : multiprocessing context or None
+            The multiprocessing context used to start worker processes.
+            Defaults to the 'spawn' context since Qt does not reliably survive
+            being forked.
+        """
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._max_queue = max_queue
+        self._mp_context = mp_context or multiprocessing.get_context("spawn")
+
+        # Workers not currently processing a job
+        self._idle_workers = []
+
+        # All workers which have not been shut down or killed
+        self._workers = set()
+
+        # Number of jobs waiting for a worker to become free
+        self._num_waiting = 0
+
+        # Limits the number of concurrent jobs. Created lazily, and recreated
+        # whenever the executor is used from a new event loop (e.g. by
+        # successive asyncio.run calls), since asyncio primitives are bound
+        # to the event loop in which they are first used.
+        self._semaphore = None
+        self._semaphore_loop = None
+
+        # Threads used to wait on worker processes (one per worker)
+        self._threads = ThreadPoolExecutor(self._max_workers)
+
+        self._closed = False
+
+    async def svg_to_outlines(
+        self,
+        root,
+        width_mm=None,
+        height_mm=None,
+        pixels_per_mm=5.0,
+        timeout=None,
+    ):
+        """
+        Equivalent to :py:func:`svgoutline.svg_to_outlines` but runs the
+        render in a worker process.
+
+        Parameters
+        ----------
+        root
+            The SVG to render, in any form accepted by
+            :py:func:`svgoutline.svg_to_outlines` (e.g. an ElementTree, a
+            filename, bytes or a binary file object). Filenames and file
+            objects are read (in a thread) before the job is sent to a
+            worker process.
+        width_mm, height_mm, pixels_per_mm
+            See :py:func:`svgoutline.svg_to_outlines`.
+        timeout : float or None
+            If given, the maximum number of seconds to wait for the render
+            (including any time spent waiting for a free worker). When this
+            expires, :py:exc:`asyncio.TimeoutError` is raised and the worker
+            process (if any) is killed.
+
+        Cancelling the call kills the worker process processing the job.
+        """
+        if self._closed:
+            raise RuntimeError("OutlineExecutor has been closed.")
+
+        loop = asyncio.get_running_loop()
+
+        if timeout is None:
+            deadline = None
+        else:
+            deadline = loop.time() + timeout
+
+        def remaining():
+            if deadline is None:
+                return None
+            else:
+                return max(0.0, deadline - loop.time())
+
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self._max_workers)
+            self._semaphore_loop = loop
+
+        if (
+            self._max_queue is not None
+            and self._semaphore.locked()
+            and self._num_waiting >= self._max_queue
+        ):
+            raise asyncio.QueueFull()
+
+        self._num_waiting += 1
+        try:
+            await _acquire(self._semaphore, remaining())
+        finally:
+            self._num_waiting -= 1
+
+        try:
+            # Serialise (or read) outside of the event loop since this can
+            # take some time for large documents. (NB: The default executor
+            # is used since, if this times out, the read continues in the
+            # background and would otherwise occupy one of self._threads,
+            # which are reserved for waiting on workers.)
+            svg_data = await asyncio.wait_for(
+                loop.run_in_executor(None, _read_svg, root),
+                remaining(),
+            )
+
+            if self._idle_workers:
+                worker = self._idle_workers.pop()
+            else:
+                worker = _Worker(self._mp_context)
+                self._workers.add(worker)
+
+            try:
+                outlines = await asyncio.wait_for(
+                    loop.run_in_executor(
+                        self._threads,
+                        worker.call,
+                        (svg_data, width_mm, height_mm, pixels_per_mm),
+                    ),
+                    remaining(),
+                )
+            except (asyncio.CancelledError, asyncio.TimeoutError, BrokenProcessPool):
+                # Cancelled or timed out mid-render, or the worker died: kill
+                # the worker since it may well be stuck. Since killing waits
+                # for the process to exit, this is done outside of the event
+                # loop. (NB: The default executor is used since all of
+                # self._threads may be blocked waiting on other workers.)
+                self._workers.discard(worker)
+                await loop.run_in_executor(None, worker.kill)
+                raise
+            except BaseException:
+                # Exception raised by svg_to_outlines, the worker is fine
+                self._idle_workers.append(worker)
+                raise
+            else:
+                self._idle_workers.append(worker)
+                return outlines
+        finally:
+            self._semaphore.release()
+
+    def close(self):
+        """
+        Shut down all worker processes. Any in-progress jobs will be killed.
+        """
+        self._closed = True
+        for worker in self._idle_workers:
+            self._workers.discard(worker)
+            worker.shutdown()
+        self._idle_workers = []
+
+        for worker in self._workers:
+            worker.kill()
+        self._workers.clear()
+
+        self._threads.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+_default_executor = None
+
+
+async def svg_to_outlines_async(
+    root,
+    width_mm=None,
+    height_mm=None,
+    pixels_per_mm=5.0,
+    timeout=None,
+    executor=None,
+):
+    """
+    An asyncio version of :py:func:`svgoutline.svg_to_outlines` which performs
+    rendering in a worker process, leaving the event loop free.
+
+    Parameters
+    ----------
+    root, width_mm, height_mm, pixels_per_mm, timeout
+        See :py:meth:`OutlineExecutor.svg_to_outlines`.
+    executor : :py:class:`OutlineExecutor` or None
+        The executor to run the render in. If None, a shared default executor
+        (with one worker per CPU) will be used.
+    """
+    global _default_executor
+
+    if executor is None:
+        if _default_executor is None:
+            _default_executor = OutlineExecutor()
+        executor = _default_executor
+
+    return await executor.svg_to_outlines(
+        root, width_mm, height_mm, pixels_per_mm, timeout
+    )
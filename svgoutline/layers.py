@@ -0,0 +1,137 @@
+"""
+Extraction of the outlines in each Inkscape layer of an SVG.
+
+It is common to use Inkscape layers to group outlines which should be treated
+differently, e.g. using different tools on a cutting machine. The functions in
+this module parse and load the SVG just once and then render each layer in
+turn (optionally in parallel).
+"""
+
+import multiprocessing
+
+from copy import deepcopy
+from itertools import repeat
+
+from concurrent.futures import ProcessPoolExecutor
+
+from xml.etree import ElementTree
+
+from svgoutline.svg_utils import (
+    INKSCAPE_NAMESPACE,
+    get_svg_page_size,
+    get_inkscape_layers,
+)
+from svgoutline.svg_input import parse_svg
+from svgoutline.svg_to_outlines import load_svg_renderer, render_outlines
+from svgoutline.qt_bootstrap import ensure_qt_application
+
+
+def svg_to_layer_outlines(
+    root,
+    width_mm=None,
+    height_mm=None,
+    pixels_per_mm=5.0,
+    processes=None,
+):
+    """
+    Given an SVG as a Python ElementTree, return the outlines in each of its
+    Inkscape layers.
+
+    Parameters
+    ----------
+    root, width_mm, height_mm, pixels_per_mm
+        See :py:func:`svgoutline.svg_to_outlines`.
+    processes : int or None
+        If None, all layers are rendered by the calling process. Otherwise,
+        the layers are rendered in parallel using this many worker processes.
+
+    Returns
+    -------
+    {label: [((r, g, b, a) or None, width, [(x, y), ...]), ...], ...}
+        A dictionary mapping from layer label (as shown in Inkscape) to the
+        outlines in that layer (in the same format as
+        :py:func:`svgoutline.svg_to_outlines`). Layers without a label are
+        identified by their 'id'. If several layers share the same label,
+        their outlines are concatenated. The dictionary is given in document
+        order.
+
+        Layers within layers (sub-layers) are treated as part of their
+        enclosing layer. Content outside of any layer is not included. Hidden
+        layers are included but will contain no outlines.
+    """
+    ensure_qt_application()
+
+    root = parse_svg(root)
+
+    if width_mm is None or height_mm is None:
+        width_mm, height_mm = get_svg_page_size(root)
+
+    layers = get_inkscape_layers(root)
+
+    # Layers must have IDs to be rendered individually
+    if any("id" not in layer.attrib for layer in layers):
+        used_ids = set(e.get("id") for e in root.iter())
+        root = deepcopy(root)
+        layers = get_inkscape_layers(root)
+        for i, layer in enumerate(layers):
+            if "id" not in layer.attrib:
+                while f"layer-{i}" in used_ids:
+                    i += len(layers)
+                layer.set("id", f"layer-{i}")
+                used_ids.add(layer.get("id"))
+
+    element_ids = [layer.get("id") for layer in layers]
+    labels = [
+        layer.get(f"{{{INKSCAPE_NAMESPACE}}}label", layer.get("id")) for layer in layers
+    ]
+
+    if processes is None:
+        svg_renderer = load_svg_renderer(root)
+        layer_outlines = [
+            render_outlines(
+                svg_renderer, width_mm, height_mm, pixels_per_mm, element_id
+            )
+            for element_id in element_ids
+        ]
+    else:
+        with ProcessPoolExecutor(
+            processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(ElementTree.tostring(root),),
+        ) as pool:
+            layer_outlines = list(
+                pool.map(
+                    _render_element_in_worker,
+                    element_ids,
+                    repeat(width_mm),
+                    repeat(height_mm),
+                    repeat(pixels_per_mm),
+                )
+            )
+
+    out = {}
+    for label, outlines in zip(labels, layer_outlines):
+        out.setdefault(label, []).extend(outlines)
+    return out
+
+
+# The QSvgRenderer used by worker processes (see _init_worker)
+_worker_svg_renderer = None
+
+
+def _init_worker(svg_data):
+    """
+    Initialise a worker process by loading the (serialised) SVG into a
+    QSvgRenderer.
+    """
+    global _worker_svg_renderer
+
+    ensure_qt_application()
+    _worker_svg_renderer = load_svg_renderer(ElementTree.fromstring(svg_data))
+
+
+def _render_element_in_worker(element_id, width_mm, height_mm, pixels_per_mm):
+    return render_outlines(
+        _worker_svg_renderer, width_mm, height_mm, pixels_per_mm, element_id
+    )
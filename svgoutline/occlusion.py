@@ -0,0 +1,174 @@
+"""
+Hidden line removal: removing the parts of outlines which are hidden beneath
+opaque filled shapes drawn on top of them.
+
+This module requires the 'shapely' package (version 2.0 or later) which is
+an optional dependency of svgoutline.
+"""
+
+from functools import reduce
+
+try:
+    import numpy
+    import shapely
+except ImportError:
+    shapely = None
+
+
+def _fill_geometries(fills):
+    """
+    Convert a list of fills [[[(x, y), ...], ...], ...], each a set of
+    non-intersecting polygons defining a region using the odd-even fill
+    rule, into an array of shapely geometries.
+    """
+    geometries = numpy.full(len(fills), shapely.Polygon(), dtype=object)
+
+    # Build all rings at once (this is much faster than building each
+    # individually)
+    rings = [
+        (f, ring)
+        for f, polygons in enumerate(fills)
+        for ring in polygons
+        if len(ring) >= 3
+    ]
+    if not rings:
+        return geometries
+
+    ring_fill = numpy.array([f for f, _ring in rings], dtype=int)
+    ring_polygons = shapely.polygons(
+        shapely.linearrings(
+            [xy for _f, ring in rings for xy in ring],
+            indices=numpy.repeat(
+                numpy.arange(len(rings)), [len(ring) for _f, ring in rings]
+            ),
+        )
+    )
+
+    num_rings = numpy.bincount(ring_fill, minlength=len(fills))
+
+    # Most fills consist of a single polygon...
+    single = num_rings[ring_fill] == 1
+    geometries[ring_fill[single]] = ring_polygons[single]
+
+    # ...the remainder (e.g. with holes) are combined according to the
+    # odd-even rule
+    for f in numpy.flatnonzero(num_rings > 1).tolist():
+        geometries[f] = reduce(
+            shapely.symmetric_difference, ring_polygons[ring_fill == f]
+        )
+
+    return shapely.make_valid(geometries)
+
+
+def remove_occluded(outlines, fills):
+    """
+    Remove the parts of outlines which are hidden beneath opaque fills drawn
+    after them.
+
+    Candidate fills for each outline are found using a spatial index (an
+    STRtree) so that only fills whose bounding boxes overlap an outline (and
+    which were drawn after it) are subtracted from it.
+
+    Parameters
+    ----------
+    outlines : [((r, g, b, a) or None, width, [(x, y), ...]), ...]
+        The outlines, in the order drawn.
+    fills : [(num_outlines, [[(x, y), ...], ...]), ...]
+        The regions covered by opaque fills, in the order drawn, as produced
+        by :py:meth:`svgoutline.outline_painter.OutlinePaintEngine.getFills`.
+        'num_outlines' gives the number of outlines drawn before each fill
+        and so which outlines it may hide.
+
+    Returns
+    -------
+    [((r, g, b, a) or None, width, [(x, y), ...]), ...]
+        The visible parts of the outlines, in their original order. Outlines
+        partly hidden are split into several outlines.
+    """
+    if shapely is None:
+        raise ImportError("Hidden line removal requires the 'shapely' package.")
+
+    outlines = list(outlines)
+    if not outlines or not fills:
+        return outlines
+
+    fill_order = numpy.array([num_outlines for num_outlines, _polygons in fills])
+    fill_geometries = _fill_geometries([polygons for _num_outlines, polygons in fills])
+
+    line_geometries = numpy.array(
+        [
+            shapely.LineString(line) if len(line) >= 2 else shapely.MultiPoint(line)
+            for _rgba, _width, line in outlines
+        ],
+        dtype=object,
+    )
+
+    # Find the fills drawn after each outline whose bounding boxes overlap
+    # it. (Testing for actual intersection is left to shapely.difference
+    # since doing so up-front costs more than it saves.) The resulting pairs
+    # are sorted by outline.
+    line_index, fill_index = shapely.STRtree(fill_geometries).query(line_geometries)
+    drawn_after = fill_order[fill_index] > line_index
+    line_index = line_index[drawn_after]
+    fill_index = fill_index[drawn_after]
+
+    occluded = set(line_index.tolist())
+    visible = line_geometries.copy()
+
+    # Outlines completely hidden by a single fill (a common case in dense
+    # drawings) are found with a (cheap) containment test...
+    shapely.prepare(fill_geometries)
+    hidden = numpy.zeros(len(outlines), dtype=bool)
+    hidden[
+        line_index[
+            shapely.contains(fill_geometries[fill_index], line_geometries[line_index])
+        ]
+    ] = True
+    visible[hidden] = shapely.LineString()
+    not_hidden = ~hidden[line_index]
+    line_index = line_index[not_hidden]
+    fill_index = fill_index[not_hidden]
+
+    # ...then the occluding fills are subtracted from the remaining outlines
+    # one at a time (vectorised across outlines), largest first. Outlines are
+    # skipped once completely hidden.
+    order = numpy.lexsort((-shapely.area(fill_geometries)[fill_index], line_index))
+    line_index = line_index[order]
+    fill_index = fill_index[order]
+    rank = numpy.arange(len(line_index)) - numpy.searchsorted(line_index, line_index)
+    by_rank = numpy.argsort(rank, kind="stable")
+    rank_start = numpy.searchsorted(
+        rank[by_rank], numpy.arange(rank.max(initial=-1) + 2)
+    )
+    for start, end in zip(rank_start[:-1], rank_start[1:]):
+        pairs = by_rank[start:end]
+        lines = line_index[pairs]
+        fills = fill_index[pairs]
+        remaining = ~shapely.is_empty(visible[lines])
+        lines = lines[remaining]
+        visible[lines] = shapely.difference(
+            visible[lines], fill_geometries[fills[remaining]]
+        )
+
+    out = []
+    for i, (rgba, width, line) in enumerate(outlines):
+        if i not in occluded:
+            out.append((rgba, width, line))
+            continue
+
+        parts = visible[i]
+        if parts.is_empty:
+            continue
+        if len(line) >= 2:
+            # Rejoin any pieces split at self-intersections
+            parts = shapely.line_merge(parts, directed=True)
+        for part in shapely.get_parts(parts):
+            out.append(
+                (
+                    rgba,
+                    width,
+                    list(map(tuple, shapely.get_coordinates(part).tolist())),
+                )
+            )
+
+    return out
@@ -12,6 +12,7 @@ documents into lists of line segments ready for cutting/drawing with a plotter.
 """
 
 import warnings
+import struct
 import math
 
 from itertools import cycle
@@ -21,15 +22,33 @@ try:
 except ImportError:
     izip = zip
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from PySide6.QtGui import QPainter
 from PySide6.QtGui import QPaintDevice
 from PySide6.QtGui import QPaintEngine
 
 from PySide6.QtCore import Qt
 from PySide6.QtCore import QLineF
+from PySide6.QtCore import QByteArray
+from PySide6.QtCore import QDataStream
+from PySide6.QtCore import QIODevice
 
 from PySide6.QtGui import QPen
+from PySide6.QtGui import QBrush
 from PySide6.QtGui import QTransform
+from PySide6.QtGui import QPainterPath
+
+from svgoutline.occlusion import remove_occluded
+from svgoutline.bezier import (
+    split_segment,
+    segment_length,
+    parameter_at_length,
+    cubic_to_quadratic,
+)
 
 
 def split_line(line, offset):
@@ -109,14 +128,360 @@ def dash_line(line, dash_pattern, dash_offset=0):
     return out
 
 
+def dash_segments(segments, dash_pattern, dash_offset=0):
+    """
+    Like :py:func:`dash_line` but for a line given as a list of straight line
+    and Bezier curve segments (see :py:mod:`svgoutline.bezier`). Curves are
+    split at the parameters where the dashes start and end along their
+    length. Returns a new list [[segment, ...], ...].
+    """
+    if len(dash_pattern) % 2 != 0:
+        warnings.warn(
+            "Dash pattern with non-even number of lengths; " "ignoring final length."
+        )
+        dash_pattern = dash_pattern[:-1]
+
+    if not dash_pattern or not segments:
+        return [segments]
+
+    pattern_length = sum(dash_pattern)
+    dash_offset %= pattern_length
+
+    # Advance through the dash pattern according to the offset
+    dash_iter = iter(izip(cycle(dash_pattern), cycle([True, False])))
+    for dash_length, dash_on in dash_iter:
+        if dash_length <= dash_offset:
+            dash_offset -= dash_length
+        else:
+            dash_length -= dash_offset
+            break
+
+    out = []
+    dash = []
+    for segment in segments:
+        length = segment_length(segment)
+        while length > dash_length:
+            # Dash ends part-way along this segment
+            if dash_length > 0:
+                t = parameter_at_length(segment, dash_length, length)
+                before, segment = split_segment(segment, t)
+                if dash_on:
+                    dash.append(before)
+                length -= dash_length
+            if dash:
+                out.append(dash)
+                dash = []
+            dash_length, dash_on = next(dash_iter)
+
+        if dash_on:
+            dash.append(segment)
+        dash_length -= length
+
+    if dash:
+        out.append(dash)
+
+    return out
+
+
+def path_key(path):
+    """
+    Return a hashable value which uniquely identifies the geometry of a
+    QPainterPath (its serialised form).
+    """
+    data = QByteArray()
+    stream = QDataStream(data, QIODevice.WriteOnly)
+    stream << path
+    return data.data()
+
+
+# The serialised form of a QPainterPath (as produced by QDataStream) is:
+#
+#     int32 element_count
+#     (int32 type, float64 x, float64 y) * element_count
+#     int32 current_subpath_start_index
+#     int32 fill_rule
+#
+# All values are big-endian.
+_PATH_COUNT = struct.Struct(">i")
+_PATH_ELEMENT = struct.Struct(">idd")
+_PATH_TRAILER = struct.Struct(">ii")
+
+# QPainterPath.ElementType values
+_MOVE_TO = 0
+_LINE_TO = 1
+_CURVE_TO = 2
+_CURVE_TO_DATA = 3
+
+# Coordinates of translation-normalised subpaths are rounded to this many
+# decimal places so that the same subpath drawn at different positions is
+# recognised despite floating point rounding.
+SUBPATH_KEY_DECIMALS = 9
+
+if numpy is not None:
+    _PATH_ELEMENT_DTYPE = numpy.dtype([("type", ">i4"), ("x", ">f8"), ("y", ">f8")])
+
+
+def split_path_data(data):
+    """
+    Split a serialised QPainterPath (see :py:func:`path_key`) into its
+    subpaths, translating each so that it starts at the origin.
+
+    Returns
+    -------
+    [(x, y, subpath_data), ...]
+        For each subpath, the (x, y) coordinates of its first point and its
+        translated and serialised form. Coordinates in the latter are rounded
+        to SUBPATH_KEY_DECIMALS decimal places so that identical subpaths
+        at different locations have identical serialised forms.
+    """
+    (count,) = _PATH_COUNT.unpack_from(data, 0)
+    if count == 0:
+        # NB: Empty paths are serialised without a trailer
+        return []
+
+    _cstart, fill_rule = _PATH_TRAILER.unpack_from(data, 4 + (count * 20))
+    trailer = _PATH_TRAILER.pack(0, fill_rule)
+
+    if numpy is not None:
+        elements = numpy.frombuffer(
+            data, dtype=_PATH_ELEMENT_DTYPE, count=count, offset=4
+        ).copy()
+        is_start = elements["type"] == _MOVE_TO
+        is_start[0] = True
+        starts = numpy.flatnonzero(is_start)
+
+        # Translate all subpaths to the origin at once
+        subpath_index = numpy.cumsum(is_start) - 1
+        xs = elements["x"][starts]
+        ys = elements["y"][starts]
+        elements["x"] = numpy.round(
+            elements["x"] - xs[subpath_index], SUBPATH_KEY_DECIMALS
+        )
+        elements["y"] = numpy.round(
+            elements["y"] - ys[subpath_index], SUBPATH_KEY_DECIMALS
+        )
+        normalised = elements.tobytes()
+
+        starts = starts.tolist()
+        ends = starts[1:] + [count]
+        return [
+            (
+                x,
+                y,
+                _PATH_COUNT.pack(end - start)
+                + normalised[start * 20 : end * 20]
+                + trailer,
+            )
+            for x, y, start, end in zip(xs.tolist(), ys.tolist(), starts, ends)
+        ]
+    else:
+        subpaths = []
+        for element in _PATH_ELEMENT.iter_unpack(data[4 : 4 + (count * 20)]):
+            if element[0] == _MOVE_TO or not subpaths:
+                subpaths.append([])
+            subpaths[-1].append(element)
+
+        out = []
+        for subpath in subpaths:
+            _type, x, y = subpath[0]
+            out.append(
+                (
+                    x,
+                    y,
+                    _PATH_COUNT.pack(len(subpath))
+                    + b"".join(
+                        _PATH_ELEMENT.pack(
+                            element_type,
+                            round(ex - x, SUBPATH_KEY_DECIMALS),
+                            round(ey - y, SUBPATH_KEY_DECIMALS),
+                        )
+                        for element_type, ex, ey in subpath
+                    )
+                    + trailer,
+                )
+            )
+        return out
+
+
+def path_segments(data):
+    """
+    Convert a serialised QPainterPath (see :py:func:`path_key`) into a list of
+    straight line and Bezier curve segments (see :py:mod:`svgoutline.bezier`)
+    for each of its subpaths.
+
+    Qt represents quadratic curves as (equivalent) cubic curves: these are
+    converted back into quadratic curves.
+
+    Returns
+    -------
+    [[segment, ...], ...]
+        The segments making up each non-empty subpath.
+    """
+    (count,) = _PATH_COUNT.unpack_from(data, 0)
+
+    subpaths = []
+    segments = []
+    controls = []
+    last = None
+    for element_type, x, y in _PATH_ELEMENT.iter_unpack(data[4 : 4 + (count * 20)]):
+        point = (x, y)
+        if element_type == _MOVE_TO:
+            if segments:
+                subpaths.append(segments)
+            segments = []
+            last = point
+        elif element_type == _LINE_TO:
+            segments.append((last, point))
+            last = point
+        elif element_type == _CURVE_TO:
+            controls = [point]
+        elif element_type == _CURVE_TO_DATA:
+            controls.append(point)
+            if len(controls) == 3:
+                segments.append(cubic_to_quadratic((last, *controls)))
+                last = point
+
+    if segments:
+        subpaths.append(segments)
+
+    return subpaths
+
+
+def path_from_data(data):
+    """
+    Deserialise a QPainterPath produced by :py:func:`path_key` or
+    :py:func:`split_path_data`.
+    """
+    path = QPainterPath()
+    # NB: The QByteArray must be kept alive while the stream is in use
+    byte_array = QByteArray(data)
+    stream = QDataStream(byte_array, QIODevice.ReadOnly)
+    stream >> path
+    return path
+
+
+def linear_part(transform):
+    """
+    Return a QTransform with the translation of an (affine) QTransform
+    removed.
+    """
+    return QTransform(
+        transform.m11(),
+        transform.m12(),
+        transform.m21(),
+        transform.m22(),
+        0.0,
+        0.0,
+    )
+
+
+def shape_key(transform):
+    """
+    Return a hashable value which identifies the linear part of an affine
+    QTransform up to rotation and reflection.
+
+    Two transforms with equal keys map any shape to congruent shapes (i.e.
+    shapes differing only in position, orientation and handedness) and so
+    the lines produced by flattening a path with one may be rotated (or
+    reflected) into place to flatten it with the other.
+
+    The key is the positive semi-definite factor P of the polar decomposition
+    A = RP of the linear part A, where R is a rotation (or reflection). Values
+    are rounded to SUBPATH_KEY_DECIMALS decimal places so that equal shapes
+    are recognised despite floating point rounding.
+    """
+    # NB: Qt maps (x, y) to (m11*x + m21*y, m12*x + m22*y)
+    a = transform.m11()
+    b = transform.m21()
+    c = transform.m12()
+    d = transform.m22()
+
+    if (a * d) - (b * c) >= 0:
+        # R is the rotation by angle
+        angle = math.atan2(c - b, a + d)
+        cos = math.cos(angle)
+        sin = math.sin(angle)
+        p11 = (cos * a) + (sin * c)
+        p12 = (cos * b) + (sin * d)
+        p22 = (cos * d) - (sin * b)
+    else:
+        # R is the reflection [[cos, sin], [sin, -cos]]
+        angle = math.atan2(c + b, a - d)
+        cos = math.cos(angle)
+        sin = math.sin(angle)
+        p11 = (cos * a) + (sin * c)
+        p12 = (cos * b) + (sin * d)
+        p22 = (sin * b) - (cos * d)
+
+    return (
+        round(p11, SUBPATH_KEY_DECIMALS),
+        round(p12, SUBPATH_KEY_DECIMALS),
+        round(p22, SUBPATH_KEY_DECIMALS),
+    )
+
+
 class OutlinePaintEngine(QPaintEngine):
     """
     Used internally by OutlinePaintDevice. Accumulates stroke-drawing commands
     and records the pixel-coordinates of these line segments and colours used.
     Fetch the accumulated lines using getOutlines().
+
+    If 'cache_instances' is True, the flattened (and dashed) form of each
+    distinct path drawn is cached and reused when an identical path is drawn
+    again with the same pen and the same transform up to translation,
+    rotation and reflection (e.g. many <use> instances of the same symbol,
+    see :py:func:`shape_key`). Cached lines are transformed into place rather
+    than being flattened again. Because of rounding, the coordinates
+    produced for these instances may differ from a full flattening in the
+    least significant digits. Instances drawn in a different orientation
+    may have their curves approximated by a slightly different set of line
+    segments (within the accuracy implied by the resolution). Instances
+    drawn at a different scale (or with a different skew) are flattened
+    separately.
+
+    If 'cache_glyphs' is True, the same is done for each individual subpath
+    of the paths drawn. This is intended for text: Qt draws (stroked) text
+    as a single path containing one or more subpaths per glyph and so a
+    paragraph of text will contain many repeats of the same subpaths at
+    different positions. Subpaths are matched after translating them to the
+    origin and rounding (see :py:func:`split_path_data`). Since subpaths are
+    flattened at the origin rather than in place, curves may occasionally be
+    approximated by a slightly different set of line segments.
+
+    NB: Stroked text reaches the paint engine as an ordinary path (QPainter
+    converts it before calling drawPath) with no record of the font or
+    glyphs used. The glyph cache is therefore keyed on the geometry of each
+    subpath (which identifies a glyph contour at a given font, size and
+    orientation) rather than on the font and glyph. Subpaths are only
+    flattened individually once one of the subpaths of a path has been seen
+    before, so paths made of distinct subpaths (e.g. most non-text shapes)
+    are flattened whole, as without the cache.
+
+    If 'occlusion' is True, the regions covered by opaque fills are also
+    recorded (see getFills()).
+
+    If 'curves' is True, paths are not flattened: the outlines recorded are
+    lists of straight line and Bezier curve segments (see
+    :py:mod:`svgoutline.bezier`) rather than lists of points. Paths drawn
+    with projective transforms (which do not preserve Bezier curves) are
+    flattened into straight line segments. The instance and glyph caches are
+    not used in this mode since extracting segments is cheap.
+
+    If 'capture' is True, nothing is flattened or recorded in the outlines.
+    Instead, each path drawn is recorded, along with the pen, brush,
+    transform and opacity used, in a display list (see getDisplayList())
+    which may later be replayed (see replay()).
     """
 
-    def __init__(self, paint_device):
+    def __init__(
+        self,
+        paint_device,
+        cache_instances=False,
+        cache_glyphs=False,
+        occlusion=False,
+        curves=False,
+        capture=False,
+    ):
         # NB: AllFeatures passed since doing otherwise results in unsupported
         # features being turned into rasters (which is not a useful fallback
         # here).
@@ -124,14 +489,47 @@ class OutlinePaintEngine(QPaintEngine):
 
         self._transform = QTransform()
         self._pen = QPen()
+        self._brush = QBrush()
         self._opacity = 1.0
 
         # [((r, g, b, a) or None, width, [(x, y), ...]), ...]
         #
         # Colours are None or tuples of 0.0 to 1.0 floats. Line widths are
-        # given in pixels. Line coordinates are given in pixels.
+        # given in pixels. Line coordinates are given in pixels. (In curves
+        # mode, lines are given as [segment, ...] instead.)
         self._outlines = []
 
+        self._curves = curves
+
+        # {key: [[(x, y), ...], ...], ...} or None if disabled. The cached
+        # lines are in the coordinates of the path drawn (i.e. with the
+        # transform undone). (See _flatten_path_cached.)
+        self._instance_cache = {} if cache_instances else None
+
+        # {(subpath_data, style): (width, [[(x, y), ...], ...]) or None, ...}
+        # or None if disabled. The cached lines are in pixels relative to the
+        # (transformed) first point of the subpath. None entries mark
+        # subpaths seen once but not yet flattened individually. (See
+        # _flatten_subpaths_cached.)
+        self._glyph_cache = {} if cache_glyphs else None
+
+        # [(num_outlines, [[(x, y), ...], ...]), ...] or None if disabled.
+        #
+        # The regions covered by opaque fills, in the order drawn. Each is
+        # given as the number of outlines drawn before it along with a set of
+        # non-intersecting polygons (in pixels) which define the region
+        # covered using the odd-even fill rule.
+        self._fills = [] if occlusion else None
+
+        # [(path_data, pen, brush, transform, opacity), ...] or None if
+        # disabled.
+        #
+        # The paths drawn, in the order drawn, serialised as by path_key.
+        # Identical paths share the same (interned) path_data value. The
+        # transform maps into pixels.
+        self._display_list = [] if capture else None
+        self._interned_path_data = {}
+
     def getOutlines(self):
         """
         See OutlinePaintDevice.getOutlines(), except the line widths and
@@ -139,6 +537,48 @@ class OutlinePaintEngine(QPaintEngine):
         """
         return self._outlines
 
+    def getFills(self):
+        """
+        Return the regions covered by opaque fills (if 'occlusion' is
+        enabled). Each fill is given as a (num_outlines, polygons) pair where
+        'num_outlines' is the number of outlines (see getOutlines()) drawn
+        before the fill (and so potentially hidden by it). 'polygons' is a
+        list of non-intersecting polygons [[(x, y), ...], ...] (in pixels)
+        which, using the odd-even fill rule, define the region covered.
+        """
+        return self._fills
+
+    def getDisplayList(self):
+        """
+        Return the paths drawn (if 'capture' is enabled) as a list of
+        (path_data, pen, brush, transform, opacity) tuples where 'path_data'
+        is the serialised path (see :py:func:`path_key`) and 'transform' maps
+        the path into pixels.
+        """
+        return self._display_list
+
+    def replay(self, display_list, transform=None):
+        """
+        Draw the paths in a display list (see getDisplayList()), as if they
+        were being drawn for the first time, with 'transform' (a QTransform),
+        if given, applied after the transform recorded for each path.
+        """
+        if transform is None:
+            transform = QTransform()
+
+        # {path_data: QPainterPath, ...}
+        paths = {}
+        for path_data, pen, brush, path_transform, opacity in display_list:
+            path = paths.get(path_data)
+            if path is None:
+                path = paths[path_data] = path_from_data(path_data)
+
+            self._pen = pen
+            self._brush = brush
+            self._transform = path_transform * transform
+            self._opacity = opacity
+            self.drawPath(path)
+
     def begin(self, paint_device):
         return True
 
@@ -153,6 +593,8 @@ class OutlinePaintEngine(QPaintEngine):
             self._opacity = new_state.opacity()
         if dirty_flags & QPaintEngine.DirtyPen:
             self._pen = new_state.pen()
+        if dirty_flags & QPaintEngine.DirtyBrush:
+            self._brush = new_state.brush()
         if (
             dirty_flags & QPaintEngine.DirtyClipEnabled
             or dirty_flags & QPaintEngine.DirtyClipRegion
@@ -175,15 +617,32 @@ class OutlinePaintEngine(QPaintEngine):
 
     def drawImage(self, r, pm, sr, flags):
         # Draw image outline...
-        self.drawRects(r, 1)
+        self._draw_rect(r)
 
     def drawPixmap(self, r, pm, sr):
         # Draw pixmap outline...
-        self.drawRects(r, 1)
+        self._draw_rect(r)
+
+    def _draw_rect(self, r):
+        # NB: Passing a single QRectF to the drawRects method (which expects
+        # an array) crashes PySide so the rectangle is drawn as a path
+        # instead.
+        #
+        # NB: The (unknown) image content is not treated as an opaque fill.
+        path = QPainterPath()
+        path.addRect(r)
+        if self._display_list is not None:
+            self._capture_path(path, QBrush())
+        else:
+            self._stroke_path(path)
 
     def drawPolygon(self, points, count, mode):
         # PySide bug PYSIDE-891 prevents a useful implementation of this
-        # function being written.
+        # function being written. (As of PySide6 6.12, any Python override
+        # of this method still crashes the interpreter when called, before
+        # reaching Python code. Disabling paint engine features to make
+        # QPainter emulate polygons does not help either since the emulation
+        # falls back on rasterisation.)
         #
         # Since drawPolygon is only used for <line>, <polyline> and <polygon>
         # elements, it is possible avoid this method being called by
@@ -208,6 +667,61 @@ class OutlinePaintEngine(QPaintEngine):
         )
 
     def drawPath(self, path):
+        if self._display_list is not None:
+            self._capture_path(path, self._brush)
+            return
+
+        # NB: The fill is drawn before (i.e. beneath) the stroke
+        if self._fills is not None and self._is_opaque(self._brush):
+            self._fills.append((len(self._outlines), self._fill_polygons(path)))
+
+        self._stroke_path(path)
+
+    def _capture_path(self, path, brush):
+        """
+        Record a QPainterPath, along with the current drawing state, in the
+        display list.
+        """
+        path_data = path_key(path)
+        path_data = self._interned_path_data.setdefault(path_data, path_data)
+        self._display_list.append(
+            (
+                path_data,
+                QPen(self._pen),
+                QBrush(brush),
+                QTransform(self._transform),
+                self._opacity,
+            )
+        )
+
+    def _is_opaque(self, brush):
+        """
+        Test whether a brush fills a region with entirely opaque colour(s).
+        """
+        # NB: QBrush.isOpaque accounts for gradient stops and textures (but
+        # not the painter's opacity). Hatching patterns are never opaque.
+        return self._opacity >= 1.0 and brush.isOpaque()
+
+    def _fill_polygons(self, path):
+        """
+        Convert a QPainterPath into a set of non-intersecting polygons (in
+        pixels) which define the region it fills using the odd-even fill
+        rule.
+        """
+        # NB: Qt resolves the fill rule and any self-intersections. The path
+        # is not rebuilt from its flattened subpaths beforehand since several
+        # QPainterPath methods (e.g. addPolygon) leak references to None in
+        # PySide6, eventually crashing the interpreter.
+        return [
+            [p.toTuple() for p in poly]
+            for poly in self._transform.map(path).simplified().toSubpathPolygons()
+        ]
+
+    def _stroke_path(self, path):
+        """
+        Record the outlines produced by stroking a QPainterPath with the
+        current pen.
+        """
         # Nothing to do if not drawing the outline
         if (
             self._pen.style() == Qt.PenStyle.NoPen
@@ -232,10 +746,99 @@ class OutlinePaintEngine(QPaintEngine):
         else:
             rgba = None
 
-        # Determine dash style
+        if self._curves:
+            scaled_pen_width, lines = self._curve_path(path)
+        elif self._instance_cache is not None:
+            scaled_pen_width, lines = self._flatten_path_cached(path)
+        elif self._glyph_cache is not None:
+            scaled_pen_width, lines = self._flatten_subpaths_cached(path)
+        else:
+            scaled_pen_width, lines = self._flatten_path(path)
+
+        self._outlines.extend((rgba, scaled_pen_width, line) for line in lines)
+
+    def _get_dash_style(self):
+        """
+        Return the (pen_width, dash_pattern, dash_offset) of the current pen
+        with the dash lengths scaled by the pen width.
+        """
         pen_width = self._pen.widthF() or 1.0
         dash_pattern = [v * pen_width for v in self._pen.dashPattern()]
         dash_offset = self._pen.dashOffset() * pen_width
+        return pen_width, dash_pattern, dash_offset
+
+    def _get_scaled_pen_width(self, pen_width):
+        """
+        Return the pen width in pixels (after the current transform).
+        """
+        if self._pen.isCosmetic():
+            # Cosmetic pens are not scaled
+            return pen_width
+
+        # Approximate the scaling factor applied by the current transform as
+        # being the scale applied to a diagonal line. This won't work if the
+        # line happens to be an eigen vector but for non-uniform scalings, the
+        # concept of a scaled line widthis not especially well defined anyway
+        # anyway.
+        #
+        # (test_line has length 1)
+        test_line = QLineF(0, 0, 2**0.5 / 2.0, 2**0.5 / 2.0)
+        return pen_width * self._transform.map(test_line).length()
+
+    def _curve_path(self, path):
+        """
+        Convert a QPainterPath into a series of (dashed) lines made up of
+        straight line and Bezier curve segments using the current pen and
+        transform.
+
+        Returns
+        -------
+        scaled_pen_width, [[segment, ...], ...]
+            The pen width and lines, in pixels.
+        """
+        transform = self._transform
+        if transform.type() == QTransform.TxProject:
+            # Projective transforms don't preserve Bezier curves
+            scaled_pen_width, lines = self._flatten_path(path)
+            return scaled_pen_width, [
+                list(zip(line, line[1:])) for line in lines if len(line) >= 2
+            ]
+
+        pen_width, dash_pattern, dash_offset = self._get_dash_style()
+        scaled_pen_width = self._get_scaled_pen_width(pen_width)
+
+        # NB: Since affine transforms map Bezier curves to Bezier curves, it
+        # is sufficient to transform their control points.
+        def transform_segments(segments):
+            return [tuple(transform.map(x, y) for x, y in s) for s in segments]
+
+        lines = []
+        for segments in path_segments(path_key(path)):
+            if self._pen.isCosmetic():
+                # Dash spacing is in pixels for cosmetic pens
+                segments = transform_segments(segments)
+                lines.extend(dash_segments(segments, dash_pattern, dash_offset))
+            else:
+                # Dashing is performed prior to the current transform (to
+                # achieve correct dash spacing)
+                lines.extend(
+                    transform_segments(line)
+                    for line in dash_segments(segments, dash_pattern, dash_offset)
+                )
+
+        return scaled_pen_width, lines
+
+    def _flatten_path(self, path):
+        """
+        Convert a QPainterPath into a series of (dashed) straight lines using
+        the current pen and transform.
+
+        Returns
+        -------
+        scaled_pen_width, [[(x, y), ...], ...]
+            The pen width and lines, in pixels.
+        """
+        pen_width, dash_pattern, dash_offset = self._get_dash_style()
 
         # When applying the dash style, perform this on a version of the line
         # prior to the current transform (to achieve correct dash spacing)
@@ -250,26 +853,18 @@ class OutlinePaintEngine(QPaintEngine):
                     "scaled."
                 )
 
-        # Approximate the scaling factor applied by the current transform as
-        # being the scale applied to a diagonal line. This won't work if the
-        # line happens to be an eigen vector but for non-uniform scalings, the
-        # concept of a scaled line widthis not especially well defined anyway
-        # anyway.
-        #
-        # (test_line has length 1)
-        test_line = QLineF(0, 0, 2**0.5 / 2.0, 2**0.5 / 2.0)
-        scaled_pen_width = pen_width * self._transform.map(test_line).length()
+        scaled_pen_width = self._get_scaled_pen_width(pen_width)
 
         # Don't scale the points for dashing when in cosmetic mode
         if self._pen.isCosmetic():
             transform = inverse_transform = QTransform()
-            scaled_pen_width = pen_width
 
         # Convert to simple straight line segments. The conversion of Text,
         # Bezier curves, arcs, ellipses etc. into to chains of simple straight
         # line is implemented by QPainterPath.toSubpathPolygons. Note that the
         # transform being supplied here is important to ensure bezier-to-line
         # segmentation occurs at the correct resolution.
+        lines = []
         for poly in path.toSubpathPolygons(self._transform):
             # Apply dash style. The coordinates must be scaled back to their
             # native size for this process since the spacing for dashes is
@@ -277,13 +872,126 @@ class OutlinePaintEngine(QPaintEngine):
             line = [p.toTuple() for p in inverse_transform.map(poly)]
             sub_lines = dash_line(line, dash_pattern, dash_offset)
 
-            # Transform the coordinates back to pixels once more and add colour
-            # information.
-            self._outlines.extend(
-                (rgba, scaled_pen_width, [transform.map(*p) for p in line])
-                for line in sub_lines
+            # Transform the coordinates back to pixels once more
+            lines.extend([transform.map(*p) for p in line] for line in sub_lines)
+
+        return scaled_pen_width, lines
+
+    def _flatten_path_cached(self, path):
+        """
+        As :py:meth:`_flatten_path` but reusing the result of previously
+        flattening the same path with the same pen and a transform differing
+        only by translation, rotation or reflection.
+        """
+        transform = self._transform
+        if transform.type() == QTransform.TxProject:
+            # Projective transforms don't commute with translation
+            return self._flatten_path(path)
+
+        # NB: Lines are cached in the path's own coordinates (i.e. with the
+        # transform undone) and so must be transformed into place afterwards
+        inverse_linear, invertible = linear_part(transform).inverted()
+        if not invertible:
+            return self._flatten_path(path)
+
+        key = (
+            path_key(path),
+            shape_key(transform),
+            self._pen.widthF(),
+            tuple(self._pen.dashPattern()),
+            self._pen.dashOffset(),
+            self._pen.isCosmetic(),
+        )
+
+        dx = transform.dx()
+        dy = transform.dy()
+
+        cached = self._instance_cache.get(key)
+        if cached is None:
+            if self._glyph_cache is not None:
+                scaled_pen_width, lines = self._flatten_subpaths_cached(path)
+            else:
+                scaled_pen_width, lines = self._flatten_path(path)
+            self._instance_cache[key] = [
+                [inverse_linear.map(x - dx, y - dy) for x, y in line] for line in lines
+            ]
+            return scaled_pen_width, lines
+        else:
+            # NB: The pen width is recomputed since the approximation used
+            # (see _get_scaled_pen_width) is not invariant under rotation
+            scaled_pen_width = self._get_scaled_pen_width(self._pen.widthF() or 1.0)
+            m11 = transform.m11()
+            m12 = transform.m12()
+            m21 = transform.m21()
+            m22 = transform.m22()
+            return (
+                scaled_pen_width,
+                [
+                    [
+                        ((m11 * x) + (m21 * y) + dx, (m12 * x) + (m22 * y) + dy)
+                        for x, y in line
+                    ]
+                    for line in cached
+                ],
             )
 
+    def _flatten_subpaths_cached(self, path):
+        """
+        As :py:meth:`_flatten_path` but flattening each distinct subpath (up
+        to translation) only once, once it has been seen to repeat.
+        """
+        transform = self._transform
+        if transform.type() == QTransform.TxProject:
+            # Projective transforms don't commute with translation
+            return self._flatten_path(path)
+
+        linear_transform = linear_part(transform)
+        style = (
+            transform.m11(),
+            transform.m12(),
+            transform.m21(),
+            transform.m22(),
+            self._pen.widthF(),
+            tuple(self._pen.dashPattern()),
+            self._pen.dashOffset(),
+            self._pen.isCosmetic(),
+        )
+
+        subpaths = split_path_data(path_key(path))
+        keys = [(subpath_data, style) for _x, _y, subpath_data in subpaths]
+
+        # Splitting a path and flattening its subpaths one at a time is
+        # slower than flattening it whole. This is only worthwhile once a
+        # subpath is repeated, as glyphs in text are, so paths whose subpaths
+        # have not been seen before (e.g. most non-text shapes) are flattened
+        # whole and their subpaths merely noted as seen (with a None entry).
+        if len(set(keys)) == len(keys) and all(
+            key not in self._glyph_cache for key in keys
+        ):
+            self._glyph_cache.update(dict.fromkeys(keys))
+            return self._flatten_path(path)
+
+        lines = []
+        for (x, y, subpath_data), key in zip(subpaths, keys):
+            cached = self._glyph_cache.get(key)
+            if cached is None:
+                # Flatten the subpath (at the origin) with the translation
+                # removed from the transform
+                self._transform = linear_transform
+                try:
+                    cached = self._flatten_path(path_from_data(subpath_data))
+                finally:
+                    self._transform = transform
+                self._glyph_cache[key] = cached
+
+            scaled_pen_width, subpath_lines = cached
+            dx, dy = transform.map(x, y)
+            lines.extend(
+                [(lx + dx, ly + dy) for lx, ly in line] for line in subpath_lines
+            )
+
+        return scaled_pen_width, lines
+
 
 class OutlinePaintDevice(QPaintDevice):
     """
@@ -292,7 +1000,17 @@ class OutlinePaintDevice(QPaintDevice):
     fetched using ``getOutlines``.
     """
 
-    def __init__(self, width_mm, height_mm, pixels_per_mm=5):
+    def __init__(
+        self,
+        width_mm,
+        height_mm,
+        pixels_per_mm=5,
+        cache_instances=False,
+        cache_glyphs=False,
+        occlusion=False,
+        curves=False,
+        capture=False,
+    ):
         """
         Create the paint device with the specified dimensions.
 
@@ -308,13 +1026,39 @@ class OutlinePaintDevice(QPaintDevice):
             lines were to be rasterised on a display with this may pixels per
             mm.  Higher resolutions result in greater numbers of straight line
             segments being created.
+        cache_instances : bool
+            If True, reuse the flattened form of paths drawn repeatedly with
+            different translations, rotations or reflections. See
+            :py:class:`OutlinePaintEngine`.
+        cache_glyphs : bool
+            If True, reuse the flattened form of subpaths (e.g. glyphs in
+            text) drawn repeatedly at different positions. See
+            :py:class:`OutlinePaintEngine`.
+        occlusion : bool
+            If True, the parts of outlines hidden beneath opaque fills drawn
+            on top of them are removed (see
+            :py:func:`svgoutline.occlusion.remove_occluded`). Requires
+            shapely.
+        curves : bool
+            If True, curves are not flattened and each outline is given as a
+            list of straight line and Bezier curve segments (see
+            getOutlines()). Cannot be combined with 'occlusion'.
+        capture : bool
+            If True, instead of producing outlines, record the paths drawn in
+            a display list (see getDisplayList()).
         """
+        if curves and occlusion:
+            raise ValueError("Occlusion is not supported for curve outlines.")
+
         super().__init__()
         self._width = width_mm
         self._height = height_mm
         self._ppmm = pixels_per_mm
+        self._curves = curves
 
-        self._paint_engine = OutlinePaintEngine(self)
+        self._paint_engine = OutlinePaintEngine(
+            self, cache_instances, cache_glyphs, occlusion, curves, capture
+        )
 
     def getOutlines(self):
         """
@@ -340,14 +1084,61 @@ class OutlinePaintDevice(QPaintDevice):
             polyline. These polylines may be considered open. If the first and
             last coordinate are coincident, the polyline may have been open or
             closed but this information is not retained.
+
+            If 'curves' is enabled, each 'line' is instead given as a list of
+            segments [((x, y), ...), ...], each a tuple of two (a straight
+            line), three (a quadratic Bezier curve) or four (a cubic Bezier
+            curve) control points (in mm). Each segment starts at the end of
+            the previous one.
         """
+        outlines = self._paint_engine.getOutlines()
+        fills = self._paint_engine.getFills()
+        if fills is not None:
+            outlines = remove_occluded(outlines, fills)
+
         # Scale line coordinates back into mm (from pixels)
         scale = 1.0 / self._ppmm
+        if self._curves:
+            return [
+                (
+                    rgba,
+                    width * scale,
+                    [
+                        tuple((x * scale, y * scale) for (x, y) in segment)
+                        for segment in line
+                    ],
+                )
+                for (rgba, width, line) in outlines
+            ]
         return [
             (rgba, width * scale, [(x * scale, y * scale) for (x, y) in line])
-            for (rgba, width, line) in self._paint_engine.getOutlines()
+            for (rgba, width, line) in outlines
         ]
 
+    def getDisplayList(self):
+        """
+        Return the paths drawn to this device (when 'capture' is enabled).
+
+        Returns
+        -------
+        [(path_data, pen, brush, transform, opacity), ...]
+            The paths drawn, in the order drawn. 'path_data' is the
+            serialised QPainterPath (see :py:func:`path_key`), 'pen' and
+            'brush' are the QPen and QBrush used, 'transform' is the
+            QTransform the path was drawn with and 'opacity' is the painter's
+            opacity.
+        """
+        return self._paint_engine.getDisplayList()
+
+    def replay(self, display_list, transform=None):
+        """
+        Draw the paths in a display list produced by getDisplayList() onto
+        this device, with 'transform' (a QTransform mapping the recorded
+        coordinates into pixels), if given, applied after the transform
+        recorded for each path.
+        """
+        self._paint_engine.replay(display_list, transform)
+
     def paintEngine(self):
         return self._paint_engine
 
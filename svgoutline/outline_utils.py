@@ -0,0 +1,346 @@
+"""
+Utilities for manipulating outlines of the form produced by
+:py:func:`svgoutline.svg_to_outlines`, i.e. lists of::
+
+    ((r, g, b, a) or None, width, [(x, y), ...])
+
+Where numpy is available it is used to vectorise operations on the
+coordinates, otherwise a (slower) pure Python implementation is used.
+
+Affine transforms are given as six-tuples (a, b, c, d, e, f) using the same
+convention as SVG's matrix() transform, i.e. mapping (x, y) to (a*x + c*y +
+e, b*x + d*y + f). Rectangles are given as four-tuples (x_min, y_min, x_max,
+y_max).
+"""
+
+import math
+
+from itertools import chain
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+def translate(dx, dy):
+    """Return an affine transform which translates by (dx, dy)."""
+    return (1.0, 0.0, 0.0, 1.0, dx, dy)
+
+
+def rotate(degrees, cx=0.0, cy=0.0):
+    """
+    Return an affine transform which rotates by the given angle (clockwise,
+    in the SVG coordinate system where y points down) about (cx, cy).
+    """
+    radians = math.radians(degrees)
+    cos = math.cos(radians)
+    sin = math.sin(radians)
+    return (
+        cos,
+        sin,
+        -sin,
+        cos,
+        cx - (cos * cx) + (sin * cy),
+        cy - (sin * cx) - (cos * cy),
+    )
+
+
+def compose(*transforms):
+    """
+    Compose several affine transforms into one. The transforms are applied in
+    the order given (i.e. the first transform is applied first).
+    """
+    a, b, c, d, e, f = IDENTITY
+    for a2, b2, c2, d2, e2, f2 in transforms:
+        a, b, c, d, e, f = (
+            (a2 * a) + (c2 * b),
+            (b2 * a) + (d2 * b),
+            (a2 * c) + (c2 * d),
+            (b2 * c) + (d2 * d),
+            (a2 * e) + (c2 * f) + e2,
+            (b2 * e) + (d2 * f) + f2,
+        )
+    return (a, b, c, d, e, f)
+
+
+def grid_transforms(columns, rows, pitch_x, pitch_y, x=0.0, y=0.0):
+    """
+    Return a list of translations for a grid of 'columns' x 'rows' copies
+    spaced 'pitch_x' and 'pitch_y' apart with the first copy offset by (x, y).
+    Copies are given in row-major order.
+    """
+    return [
+        translate(x + (column * pitch_x), y + (row * pitch_y))
+        for row in range(rows)
+        for column in range(columns)
+    ]
+
+
+def _width_scale(transform):
+    """
+    The factor by which line widths are scaled by a transform (exact for
+    uniform scalings, an approximation otherwise).
+    """
+    a, b, c, d, _e, _f = transform
+    return math.sqrt(abs((a * d) - (b * c)))
+
+
+def transform_outlines(outlines, transform):
+    """
+    Apply an affine transform (a, b, c, d, e, f) to a list of outlines,
+    returning a new list of outlines. Line widths are scaled accordingly.
+    """
+    return next(iter(_transform_outlines(outlines, [transform])))
+
+
+def step_and_repeat(outlines, transforms, lazy=False):
+    """
+    Produce several transformed copies of a set of outlines, for example to
+    lay out many copies of a design on a sheet without rendering each copy
+    separately::
+
+        label = svg_to_outlines(root)
+        sheet = step_and_repeat(label, grid_transforms(20, 20, 50.0, 25.0))
+
+    Parameters
+    ----------
+    outlines : [((r, g, b, a) or None, width, [(x, y), ...]), ...]
+    transforms : iterable of (a, b, c, d, e, f)
+        The transforms to apply to each copy. See :py:func:`translate`,
+        :py:func:`rotate`, :py:func:`compose` and :py:func:`grid_transforms`.
+    lazy : bool
+        If False (the default), return a single list containing the outlines
+        of every copy. If True, return an iterator which produces a list of
+        outlines for each copy in turn, computing each only as required.
+    """
+    copies = _transform_outlines(outlines, transforms)
+    if lazy:
+        return copies
+    else:
+        return [outline for copy in copies for outline in copy]
+
+
+def _transform_outlines(outlines, transforms):
+    """
+    Generate a transformed copy of the outlines for each transform given.
+    """
+    outlines = list(outlines)
+    styles = [(rgba, width) for rgba, width, _line in outlines]
+
+    if numpy is not None:
+        # Gather all coordinates into a single array so that each copy is
+        # computed with a single matrix multiply
+        bounds = [0]
+        for _rgba, _width, line in outlines:
+            bounds.append(bounds[-1] + len(line))
+        coords = numpy.array(
+            [p for _rgba, _width, line in outlines for p in line],
+            dtype=float,
+        ).reshape(-1, 2)
+
+        for transform in transforms:
+            a, b, c, d, e, f = transform
+            matrix = numpy.array([[a, b], [c, d]], dtype=float)
+            points = list(map(tuple, ((coords @ matrix) + (e, f)).tolist()))
+            width_scale = _width_scale(transform)
+            yield [
+                (rgba, width * width_scale, points[start:end])
+                for (rgba, width), start, end in zip(styles, bounds, bounds[1:])
+            ]
+    else:
+        for transform in transforms:
+            a, b, c, d, e, f = transform
+            width_scale = _width_scale(transform)
+            yield [
+                (
+                    rgba,
+                    width * width_scale,
+                    [((a * x) + (c * y) + e, (b * x) + (d * y) + f) for x, y in line],
+                )
+                for rgba, width, line in outlines
+            ]
+
+
+def page_bounds(width_mm, height_mm, margin_mm=0.0):
+    """
+    Return the rectangle covering a page of the given size, less a margin
+    of 'margin_mm' on every side.
+    """
+    return (margin_mm, margin_mm, width_mm - margin_mm, height_mm - margin_mm)
+
+
+def clip_outlines(outlines, bounds):
+    """
+    Clip a list of outlines to a rectangle, e.g. to discard lines which
+    extend beyond the edges of the page::
+
+        outlines = clip_outlines(outlines, page_bounds(210, 297, margin_mm=5))
+
+    Outlines which leave and re-enter the rectangle are split into several
+    outlines. Outlines lying entirely outside the rectangle are removed.
+
+    Parameters
+    ----------
+    outlines : [((r, g, b, a) or None, width, [(x, y), ...]), ...]
+    bounds : (x_min, y_min, x_max, y_max)
+        The rectangle to clip to (see :py:func:`page_bounds`).
+
+    Returns
+    -------
+    [((r, g, b, a) or None, width, [(x, y), ...]), ...]
+        A new list of outlines.
+    """
+    outlines = list(outlines)
+    if numpy is not None:
+        return _clip_outlines_numpy(outlines, bounds)
+    else:
+        return _clip_outlines_python(outlines, bounds)
+
+
+def _clip_outlines_python(outlines, bounds):
+    """
+    Pure Python implementation of :py:func:`clip_outlines`.
+    """
+    x_min, y_min, x_max, y_max = bounds
+
+    out = []
+    for rgba, width, line in outlines:
+        if line and all(x_min <= x <= x_max and y_min <= y <= y_max for x, y in line):
+            # Entirely within the rectangle
+            out.append((rgba, width, list(line)))
+            continue
+        elif len(line) < 2:
+            # Degenerate (empty or single point) outline outside the rectangle
+            continue
+
+        clipped = None
+        for (x0, y0), (x1, y1) in zip(line, line[1:]):
+            # Liang-Barsky: find the range of t (where the segment is
+            # parameterised as p0 + t*(p1 - p0)) within the rectangle
+            dx = x1 - x0
+            dy = y1 - y0
+            t0 = 0.0
+            t1 = 1.0
+            for p, q in (
+                (-dx, x0 - x_min),
+                (dx, x_max - x0),
+                (-dy, y0 - y_min),
+                (dy, y_max - y0),
+            ):
+                if p == 0:
+                    if q < 0:
+                        t0 = 1.0
+                        t1 = 0.0
+                elif p < 0:
+                    t0 = max(t0, q / p)
+                else:
+                    t1 = min(t1, q / p)
+
+            if t0 >= t1:
+                # Segment entirely outside (or just touching the rectangle)
+                clipped = None
+                continue
+
+            if clipped is None or t0 > 0.0:
+                clipped = [(x0 + (t0 * dx), y0 + (t0 * dy))]
+                out.append((rgba, width, clipped))
+            clipped.append((x0 + (t1 * dx), y0 + (t1 * dy)))
+            if t1 < 1.0:
+                # Segment leaves the rectangle
+                clipped = None
+
+    return out
+
+
+def _clip_outlines_numpy(outlines, bounds):
+    """
+    Numpy implementation of :py:func:`clip_outlines` which clips every line
+    segment of every outline at once.
+    """
+    x_min, y_min, x_max, y_max = bounds
+
+    lengths = numpy.array([len(line) for _rgba, _width, line in outlines], dtype=int)
+    coords = numpy.fromiter(
+        chain.from_iterable(chain.from_iterable(line for _r, _w, line in outlines)),
+        dtype=float,
+        count=2 * int(lengths.sum()),
+    ).reshape(-1, 2)
+
+    # Outlines lying entirely within the rectangle (usually the majority) are
+    # passed through unchanged
+    inside = (
+        (coords[:, 0] >= x_min)
+        & (coords[:, 0] <= x_max)
+        & (coords[:, 1] >= y_min)
+        & (coords[:, 1] <= y_max)
+    )
+    point_outline = numpy.repeat(numpy.arange(len(outlines)), lengths)
+    num_inside = numpy.bincount(point_outline, inside, minlength=len(outlines))
+    fully_inside = (num_inside == lengths) & (lengths > 0)
+
+    # Gather the line segments of the remaining outlines
+    num_segments = numpy.where(fully_inside, 0, numpy.maximum(lengths - 1, 0))
+    segment_outline = numpy.repeat(numpy.arange(len(outlines)), num_segments)
+    first_segment = numpy.cumsum(num_segments) - num_segments
+    segment_start = (
+        numpy.arange(len(segment_outline))
+        - first_segment[segment_outline]
+        + (numpy.cumsum(lengths) - lengths)[segment_outline]
+    )
+    p0 = coords[segment_start]
+    d = coords[segment_start + 1] - p0
+
+    # Liang-Barsky: find the range of t (where each segment is parameterised
+    # as p0 + t*d) within the rectangle
+    p = numpy.stack([-d[:, 0], d[:, 0], -d[:, 1], d[:, 1]], axis=1)
+    q = numpy.stack(
+        [p0[:, 0] - x_min, x_max - p0[:, 0], p0[:, 1] - y_min, y_max - p0[:, 1]],
+        axis=1,
+    )
+    parallel = p == 0
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        r = q / numpy.where(parallel, 1.0, p)
+    t0 = numpy.max(numpy.where(p < 0, r, 0.0), axis=1, initial=0.0)
+    t1 = numpy.min(numpy.where(p > 0, r, 1.0), axis=1, initial=1.0)
+    visible = (t0 < t1) & ~numpy.any(parallel & (q < 0), axis=1)
+
+    # A new outline starts at each visible segment which is not a
+    # continuation of a visible segment of the same outline ending at its
+    # end point.
+    continues = numpy.zeros(len(visible), dtype=bool)
+    continues[1:] = (
+        visible[:-1] & (t1[:-1] == 1.0) & (segment_outline[:-1] == segment_outline[1:])
+    )
+    continues &= t0 == 0.0
+    new_outline = visible & ~continues
+
+    # Emit the start point of each new outline followed by the end point of
+    # every visible segment.
+    counts = 1 + new_outline[visible]
+    end_positions = numpy.cumsum(counts) - 1
+    start_positions = (end_positions - 1)[new_outline[visible]]
+    points = numpy.empty((int(counts.sum()), 2))
+    points[end_positions] = (p0 + (t1[:, numpy.newaxis] * d))[visible]
+    points[start_positions] = (p0 + (t0[:, numpy.newaxis] * d))[new_outline]
+    points = list(map(tuple, points.tolist()))
+
+    # Assemble the output, in the original order
+    piece_outlines = segment_outline[new_outline].tolist()
+    piece_starts = start_positions.tolist()
+    piece_ends = piece_starts[1:] + [len(points)]
+    fully_inside = fully_inside.tolist()
+
+    out = []
+    piece = 0
+    for index, (rgba, width, line) in enumerate(outlines):
+        if fully_inside[index]:
+            out.append((rgba, width, list(line)))
+        while piece < len(piece_outlines) and piece_outlines[piece] == index:
+            out.append((rgba, width, points[piece_starts[piece] : piece_ends[piece]]))
+            piece += 1
+
+    return out
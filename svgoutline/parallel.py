@@ -0,0 +1,198 @@
+"""
+Extraction of outlines from a single (large) SVG using several processes.
+
+The document is split into a number of smaller sub-documents, each containing
+a contiguous run of the document's elements, which are rendered in parallel
+by separate worker processes. The resulting outlines are concatenated in
+document order and so are identical to those produced by
+:py:func:`svgoutline.svg_to_outlines`.
+"""
+
+import os
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor
+
+from xml.etree import ElementTree
+
+from svgoutline.svg_utils import (
+    SVG_NAMESPACE,
+    DEFINITION_TAGS,
+    NON_RENDERED_TAGS,
+    GROUP_TAG,
+    STYLE_TAG,
+    get_svg_page_size,
+    make_subdocument,
+    copy_enclosing_groups,
+    has_group_effects,
+)
+from svgoutline.svg_to_outlines import svg_to_outlines
+from svgoutline.svg_input import parse_svg
+from svgoutline.qt_bootstrap import ensure_qt_application
+
+
+def svg_to_outlines_parallel(
+    root,
+    width_mm=None,
+    height_mm=None,
+    pixels_per_mm=5.0,
+    processes=None,
+    executor=None,
+):
+    """
+    Like :py:func:`svgoutline.svg_to_outlines` but splits the document into
+    several parts which are rendered in parallel by separate processes.
+
+    The document's elements (including those within (possibly nested) groups,
+    except groups with group effects such as opacity, which are kept whole)
+    are divided into 'processes' contiguous runs of roughly equal cost. Each
+    run is rendered as a separate sub-document containing copies of the
+    enclosing groups (and their attributes, e.g. transforms and styles), any
+    <style> sheets and any elements it references (e.g. gradients, symbols or
+    paths instantiated by <use>).
+
+    For small documents, the overhead of starting worker processes and
+    serialising the sub-documents will outweigh any speedup.
+
+    Parameters
+    ----------
+    root, width_mm, height_mm, pixels_per_mm
+        See :py:func:`svgoutline.svg_to_outlines`.
+    processes : int or None
+        The number of parts to split the document into. Defaults to the number
+        of CPUs. When passing an 'executor', this should normally be set to
+        its number of workers.
+    executor : :py:class:`concurrent.futures.Executor` or None
+        If given, the executor used to render the parts (which is left
+        running afterwards). Otherwise a pool of worker processes is started
+        (and shut down) for the duration of the call. Reusing an executor
+        avoids the (significant) cost of starting new worker processes for
+        every document.
+
+    Returns
+    -------
+    [((r, g, b, a) or None, width, [(x, y), ...]), ...]
+        See :py:func:`svgoutline.svg_to_outlines`.
+    """
+    root = parse_svg(root)
+
+    if width_mm is None or height_mm is None:
+        width_mm, height_mm = get_svg_page_size(root)
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    svg_datas = [
+        ElementTree.tostring(subdocument, "unicode")
+        for subdocument in split_svg(root, processes)
+    ]
+
+    if executor is None:
+        with ProcessPoolExecutor(
+            max_workers=min(processes, len(svg_datas)) or 1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=ensure_qt_application,
+        ) as executor:
+            return _render_parts(
+                executor, svg_datas, width_mm, height_mm, pixels_per_mm
+            )
+    else:
+        return _render_parts(executor, svg_datas, width_mm, height_mm, pixels_per_mm)
+
+
+def split_svg(root, parts):
+    """
+    Split an SVG into (at most) 'parts' sub-documents, each containing a
+    contiguous run of the document's elements and together rendering
+    identically to the original document.
+
+    Parameters
+    ----------
+    root : ElementTree
+    parts : int
+
+    Returns
+    -------
+    [ElementTree, ...]
+        The sub-documents in document order. Elements are shared with the
+        original document and so it should not be modified while the
+        sub-documents are in use.
+    """
+    # Any element may be referenced by any other (e.g. via <use>) so every
+    # identified element is potentially a definition.
+    definitions = {e.attrib["id"]: e for e in root.iter() if "id" in e.attrib}
+    stylesheets = list(root.iter(STYLE_TAG))
+
+    units = list(_iter_units(root, []))
+    if not units:
+        return [make_subdocument(root, stylesheets, definitions)]
+
+    costs = [_estimate_cost(element) for _groups, element in units]
+    target_cost = sum(costs) / parts
+
+    runs = [[]]
+    run_cost = 0
+    for unit, cost in zip(units, costs):
+        if runs[-1] and run_cost + (cost / 2) > target_cost and len(runs) < parts:
+            runs.append([])
+            run_cost = 0
+        runs[-1].append(unit)
+        run_cost += cost
+
+    return [
+        make_subdocument(
+            root,
+            stylesheets + copy_enclosing_groups(run),
+            definitions,
+        )
+        for run in runs
+    ]
+
+
+def _iter_units(element, groups):
+    """
+    Generate the (groups, element) pairs for each rendered child of an
+    element, descending into groups.
+    """
+    for child in element:
+        # NB: Groups with group effects (e.g. opacity) are rendered by QSvg as
+        # a whole (offscreen) and so cannot be split.
+        if child.tag == GROUP_TAG and not has_group_effects(child):
+            yield from _iter_units(child, groups + [child])
+        elif (
+            child.tag not in DEFINITION_TAGS
+            and child.tag not in NON_RENDERED_TAGS
+            and child.tag != STYLE_TAG
+            and child.tag.startswith(f"{{{SVG_NAMESPACE}}}")
+        ):
+            yield (groups, child)
+
+
+def _estimate_cost(element):
+    """
+    A rough estimate of the relative cost of rendering an element, based on
+    the number of elements and the amount of path data it contains.
+    """
+    return sum(1 + (len(e.get("d", "")) // 32) for e in element.iter())
+
+
+def _render_part(svg_data, width_mm, height_mm, pixels_per_mm):
+    """Render a serialised sub-document (in a worker process)."""
+    return svg_to_outlines(
+        ElementTree.fromstring(svg_data),
+        width_mm,
+        height_mm,
+        pixels_per_mm,
+    )
+
+
+def _render_parts(executor, svg_datas, width_mm, height_mm, pixels_per_mm):
+    futures = [
+        executor.submit(_render_part, svg_data, width_mm, height_mm, pixels_per_mm)
+        for svg_data in svg_datas
+    ]
+
+    outlines = []
+    for future in futures:
+        outlines.extend(future.result())
+    return outlines
@@ -0,0 +1,694 @@
+"""
+A fast pre-flight check of an SVG which, without rendering it, identifies
+constructs which :py:func:`svgoutline.svg_to_outlines` cannot handle and
+estimates the size of its output and the cost of producing it.
+
+This is intended for deciding how (or whether) to process a document before
+committing to the relatively expensive process of rendering it. For example,
+documents which would fail partway through rendering can be rejected
+immediately and particularly large documents sent to more capable workers.
+
+The estimates are based on the geometry of the stroked elements in the
+document (path lengths, shape sizes, dash patterns, text lengths and the
+fan-out of <use> elements) and are only approximate: they do not account for
+CSS <style> sheets and text is assumed to consist of glyphs of typical
+complexity.
+"""
+
+import math
+import re
+
+from collections import namedtuple
+
+from svgoutline.svg_input import parse_svg
+from svgoutline.svg_utils import (
+    SVG_NAMESPACE,
+    XLINK_NAMESPACE,
+    DEFINITION_TAGS,
+    NON_RENDERED_TAGS,
+    STYLE_TAG,
+    GRAPHICS_TAGS,
+    CONTAINER_TAGS,
+    USE_TAG,
+    STROKE_PROPERTIES,
+    MARKER_PROPERTIES,
+    HIDDEN_VISIBILITIES,
+    GROUP_EFFECT_PROPERTIES,
+    MM_PER_INCH,
+    NUMBER_REGEX,
+    URL_REFERENCE_REGEX,
+    get_specified_properties,
+    get_svg_dpi,
+    get_svg_page_size,
+)
+
+
+PreflightReport = namedtuple(
+    "PreflightReport", "errors warnings elements outlines points cost"
+)
+"""
+The result of :py:func:`preflight_svg`.
+
+Attributes
+----------
+errors : [str, ...]
+    Descriptions of constructs which will cause
+    :py:func:`svgoutline.svg_to_outlines` to fail. If non-empty, rendering the
+    document is pointless.
+warnings : [str, ...]
+    Descriptions of constructs which will not be rendered (or not rendered as
+    a web browser would), e.g. clipping paths which will be ignored.
+elements : int
+    The estimated number of stroked elements drawn (counting each <use>
+    instance separately).
+outlines : int
+    The estimated number of outlines (polylines) produced.
+points : int
+    The estimated total number of points in the outlines produced.
+cost : float
+    A relative estimate of the render time. Calibrated to roughly correspond
+    with seconds on a typical desktop machine.
+"""
+
+# Estimated render cost per stroked element drawn, per outline and per output
+# point (roughly in seconds).
+COST_PER_ELEMENT = 35e-6
+COST_PER_OUTLINE = 28e-6
+COST_PER_POINT = 1.5e-6
+
+# The font size (in user units) assumed for text which doesn't specify one
+# (approximately that used by QSvg).
+DEFAULT_FONT_SIZE = 9.0
+
+# Estimated number of outlines and points in a stroked glyph. The number of
+# points grows with the square root of the font size (in pixels), like the
+# number of lines used to approximate a curve (see
+# :py:func:`_get_curve_points`).
+OUTLINES_PER_GLYPH = 1.4
+POINTS_PER_GLYPH = 12.0
+POINTS_PER_GLYPH_PER_SQRT_PIXEL = 2.8
+
+# The (initial values of) the inherited properties which determine the
+# outlines produced by an element.
+PREFLIGHT_PROPERTIES = {
+    **STROKE_PROPERTIES,
+    "stroke-dasharray": "none",
+    "font-size": "medium",
+}
+
+# The properties checked for unsupported values
+CHECKED_PROPERTIES = ("display", "comp-op", "clip-path", *GROUP_EFFECT_PROPERTIES)
+
+# Overflow values which do not cause QSvg to clip <symbol> and <marker>
+# contents (clipping is not supported by the OutlinePaintDevice).
+UNCLIPPED_OVERFLOWS = ("visible", "auto")
+
+# Elements which QSvg silently skips
+UNRENDERED_TAGS = {
+    f"{{{SVG_NAMESPACE}}}{tag}" for tag in ["svg", "textPath", "foreignObject"]
+}
+
+SWITCH_TAG = f"{{{SVG_NAMESPACE}}}switch"
+SYMBOL_TAG = f"{{{SVG_NAMESPACE}}}symbol"
+MARKER_TAG = f"{{{SVG_NAMESPACE}}}marker"
+TEXT_TAGS = {f"{{{SVG_NAMESPACE}}}{tag}" for tag in ["text", "tspan"]}
+
+# Matches each command (and its arguments) in path data
+PATH_COMMAND_REGEX = re.compile(r"([MmZzLlHhVvCcSsQqTtAa])([^MmZzLlHhVvCcSsQqTtAa]*)")
+
+# The number of arguments taken by each path command
+PATH_COMMAND_ARGUMENTS = {
+    "m": 2,
+    "l": 2,
+    "h": 1,
+    "v": 1,
+    "c": 6,
+    "s": 4,
+    "q": 4,
+    "t": 2,
+    "a": 7,
+    "z": 0,
+}
+
+# Matches each operation in a transform list
+TRANSFORM_REGEX = re.compile(r"([A-Za-z]+)\s*\(([^)]*)\)")
+
+
+def _get_curve_points(length):
+    """
+    Estimate the number of points in the lines used to approximate a curve
+    segment of the given length (in pixels).
+    """
+    return max(2, math.ceil(1.3 * math.sqrt(length)))
+
+
+def _get_transform_scale(transform):
+    """
+    Return the (geometric mean) scale factor of an SVG transform attribute.
+    """
+    scale = 1.0
+    for name, arguments in TRANSFORM_REGEX.findall(transform):
+        arguments = [float(v) for v in NUMBER_REGEX.findall(arguments)]
+        if name == "matrix" and len(arguments) == 6:
+            a, b, c, d, _e, _f = arguments
+            scale *= math.sqrt(abs((a * d) - (b * c)))
+        elif name == "scale" and arguments:
+            scale *= math.sqrt(abs(arguments[0] * arguments[-1]))
+    return scale
+
+
+def _get_length(element, name, default=0.0):
+    """
+    Get a numerical attribute (units are ignored).
+    """
+    match = NUMBER_REGEX.search(element.get(name, ""))
+    return float(match.group()) if match else default
+
+
+def _get_font_size(value, parent):
+    """
+    Compute a font size in user units given its specified value and the
+    (computed) font size of the parent.
+    """
+    match = re.match(r"\s*(" + NUMBER_REGEX.pattern + r")\s*([a-z%]*)", value)
+    if value == "medium":
+        return DEFAULT_FONT_SIZE
+    elif not match:
+        return parent
+
+    number, unit = match.groups()
+    number = float(number)
+    if unit == "em":
+        return number * parent
+    elif unit == "%":
+        return number * parent / 100.0
+    elif unit == "pt":
+        return number * 96.0 / 72.0
+    else:
+        return number
+
+
+def _get_dash_array(value):
+    """
+    Parse a stroke-dasharray value into a list of dash and gap lengths with
+    an even number of entries, or None for solid lines.
+    """
+    dashes = [abs(float(v)) for v in NUMBER_REGEX.findall(value)]
+    if not any(dashes):
+        return None
+    elif len(dashes) % 2:
+        dashes *= 2
+    return dashes
+
+
+def _get_path_stats(d, pixels_per_unit):
+    """
+    Estimate the length (in user units), number of subpaths and number of
+    points (once flattened) of some path data.
+    """
+    length = 0.0
+    subpaths = 0
+    points = 0
+
+    x = y = start_x = start_y = 0.0
+    for command, numbers in PATH_COMMAND_REGEX.findall(d):
+        lower = command.lower()
+        if lower == "z":
+            length += math.hypot(start_x - x, start_y - y)
+            points += 1
+            x, y = start_x, start_y
+            continue
+
+        relative = command == lower
+        num_arguments = PATH_COMMAND_ARGUMENTS[lower]
+        values = [float(v) for v in NUMBER_REGEX.findall(numbers)]
+        for i in range(0, len(values) - num_arguments + 1, num_arguments):
+            arguments = values[i : i + num_arguments]
+
+            # Make all coordinates absolute
+            if lower == "h":
+                arguments.append(0.0 if relative else y)
+            elif lower == "v":
+                arguments.insert(0, 0.0 if relative else x)
+            if relative:
+                if lower == "a":
+                    arguments[5] += x
+                    arguments[6] += y
+                else:
+                    arguments = [
+                        v + (x if j % 2 == 0 else y) for j, v in enumerate(arguments)
+                    ]
+
+            new_x, new_y = arguments[-2:]
+            chord = math.hypot(new_x - x, new_y - y)
+            if lower == "m":
+                subpaths += 1
+                points += 1
+                start_x, start_y = new_x, new_y
+                # Subsequent coordinate pairs are implicit line-to commands
+                lower = "l"
+            elif lower in "lhv":
+                length += chord
+                points += 1
+            elif lower == "a":
+                # Arcs are drawn as (up to) one curve per quarter turn
+                radius = max(
+                    (abs(arguments[0]) + abs(arguments[1])) / 2.0, chord / 2.0, 1e-9
+                )
+                angle = 2.0 * math.asin(min(1.0, chord / (2.0 * radius)))
+                if arguments[3]:
+                    angle = (2.0 * math.pi) - angle
+                segments = max(1, math.ceil(angle / (math.pi / 2.0)))
+                length += radius * angle
+                points += segments * _get_curve_points(
+                    radius * angle * pixels_per_unit / segments
+                )
+            else:
+                # Bezier curves: estimate the length as the mean of the chord
+                # and control polygon lengths
+                polygon = 0.0
+                last_x, last_y = x, y
+                for j in range(0, len(arguments), 2):
+                    polygon += math.hypot(
+                        arguments[j] - last_x, arguments[j + 1] - last_y
+                    )
+                    last_x, last_y = arguments[j : j + 2]
+                curve_length = (chord + polygon) / 2.0
+                length += curve_length
+                points += _get_curve_points(curve_length * pixels_per_unit)
+
+            x, y = new_x, new_y
+
+    return length, subpaths, points
+
+
+def _get_shape_stats(element, pixels_per_unit):
+    """
+    Estimate the length (in user units), number of subpaths and number of
+    points (once flattened) of a shape element (e.g. <path> or <rect>), or
+    return None if the element does not draw a shape.
+    """
+    tag = element.tag[len(SVG_NAMESPACE) + 2 :]
+    if tag == "path":
+        return _get_path_stats(element.get("d", ""), pixels_per_unit)
+    elif tag in ("rect", "image"):
+        width = _get_length(element, "width")
+        height = _get_length(element, "height")
+        if width <= 0 or height <= 0:
+            return None
+        points = 5
+        if tag == "rect" and (
+            _get_length(element, "rx") > 0 or _get_length(element, "ry") > 0
+        ):
+            # Rounded corners
+            radius = min(
+                max(_get_length(element, "rx"), _get_length(element, "ry")),
+                width / 2.0,
+                height / 2.0,
+            )
+            points += 4 * _get_curve_points(radius * pixels_per_unit * math.pi / 2)
+        return 2 * (width + height), 1, points
+    elif tag in ("circle", "ellipse"):
+        if tag == "circle":
+            rx = ry = _get_length(element, "r")
+        else:
+            rx = _get_length(element, "rx")
+            ry = _get_length(element, "ry")
+        if rx <= 0 or ry <= 0:
+            return None
+        length = math.pi * (rx + ry)
+        return length, 1, 1 + (4 * _get_curve_points(length * pixels_per_unit / 4))
+    elif tag == "line":
+        length = math.hypot(
+            _get_length(element, "x2") - _get_length(element, "x1"),
+            _get_length(element, "y2") - _get_length(element, "y1"),
+        )
+        return length, 1, 2
+    elif tag in ("polyline", "polygon"):
+        coords = [float(v) for v in NUMBER_REGEX.findall(element.get("points", ""))]
+        points = list(zip(coords[0::2], coords[1::2]))
+        if len(points) < 2:
+            return None
+        if tag == "polygon":
+            points.append(points[0])
+        length = sum(
+            math.hypot(x2 - x1, y2 - y1)
+            for (x1, y1), (x2, y2) in zip(points, points[1:])
+        )
+        return length, 1, len(points)
+    else:
+        return None
+
+
+def _count_glyphs(text):
+    """Count the (non-whitespace) characters in a string."""
+    return len(text) - sum(c.isspace() for c in text) if text else 0
+
+
+def _has_group_effects(specified):
+    """
+    Given the specified properties of an element, test whether QSvg will
+    render it (and its children) via an off-screen image.
+    """
+    for name in GROUP_EFFECT_PROPERTIES:
+        value = specified.get(name, "none")
+        if name == "opacity":
+            match = NUMBER_REGEX.match(value)
+            if match and float(match.group()) < 1.0:
+                return True
+        elif value != "none":
+            return True
+    return False
+
+
+def _describe(element):
+    """Produce a short description of an element for use in messages."""
+    description = element.tag.rpartition("}")[2]
+    if element.get("id"):
+        description += f" id=\"{element.get('id')}\""
+    return f"<{description}>"
+
+
+class _Preflight(object):
+    """
+    The state of a :py:func:`preflight_svg` pass over a document.
+    """
+
+    def __init__(self, root, pixels_per_unit):
+        self.root = root
+        self.pixels_per_unit = pixels_per_unit
+
+        self.ids = {e.get("id"): e for e in root.iter() if e.get("id") is not None}
+
+        # Lists of messages, as dicts (to discard duplicates)
+        self.errors = {}
+        self.warnings = {}
+
+        # The estimates for each <use> target, {key: (elements, outlines,
+        # points), ...}
+        self.use_estimates = {}
+
+        # The <use> targets currently being visited
+        self.use_stack = set()
+
+    def visit(self, element, inherited, scale):
+        """
+        Visit an element (and its descendants), returning its estimated
+        (elements, outlines, points).
+
+        Parameters
+        ----------
+        element : Element
+        inherited : {name: value, ...}
+            The computed PREFLIGHT_PROPERTIES of the element's parent.
+        scale : float
+            The scale factor applied to the element by its ancestors.
+        """
+        tag = element.tag
+        if (
+            not isinstance(tag, str)
+            or not tag.startswith(f"{{{SVG_NAMESPACE}}}")
+            or tag in DEFINITION_TAGS
+            or tag in NON_RENDERED_TAGS
+            or tag == STYLE_TAG
+        ):
+            return (0, 0, 0)
+
+        specified = get_specified_properties(
+            element, (*CHECKED_PROPERTIES, *PREFLIGHT_PROPERTIES)
+        )
+        if specified.get("display") == "none":
+            return (0, 0, 0)
+        elif (
+            tag in CONTAINER_TAGS
+            and _has_group_effects(specified)
+            and sum(isinstance(child.tag, str) for child in element) > 1
+        ):
+            # NB: QSvg renders these via an off-screen image
+            self.warnings[
+                f"{_describe(element)} has a group effect "
+                f"({', '.join(GROUP_EFFECT_PROPERTIES)}) and will not produce "
+                "any outlines."
+            ] = None
+            return (0, 0, 0)
+        self.check(element, specified)
+
+        properties = dict(inherited)
+        for name in PREFLIGHT_PROPERTIES:
+            value = specified.get(name, "inherit")
+            if name == "font-size":
+                properties[name] = _get_font_size(value, inherited[name])
+            elif value != "inherit":
+                properties[name] = value
+
+        scale *= _get_transform_scale(element.get("transform", ""))
+
+        if tag in UNRENDERED_TAGS and element is not self.root:
+            self.warnings[f"{_describe(element)} is not rendered."] = None
+            return (0, 0, 0)
+        elif tag in CONTAINER_TAGS:
+            return self.visit_children(element, properties, scale)
+        elif tag == SWITCH_TAG:
+            for child in element:
+                if isinstance(child.tag, str):
+                    return self.visit(child, properties, scale)
+            return (0, 0, 0)
+        elif tag == USE_TAG:
+            return self.visit_use(element, properties, scale)
+        elif tag in GRAPHICS_TAGS:
+            estimate = self.estimate(element, properties, scale)
+            if tag in TEXT_TAGS:
+                children = self.visit_children(element, properties, scale)
+                estimate = tuple(a + b for a, b in zip(estimate, children))
+            return estimate
+        else:
+            return (0, 0, 0)
+
+    def visit_children(self, element, properties, scale):
+        """
+        Visit the children of an element, returning the sum of their
+        estimates.
+        """
+        elements = outlines = points = 0
+        for child in element:
+            child_elements, child_outlines, child_points = self.visit(
+                child, properties, scale
+            )
+            elements += child_elements
+            outlines += child_outlines
+            points += child_points
+        return (elements, outlines, points)
+
+    def visit_use(self, element, properties, scale):
+        """
+        Visit a <use> element, returning the estimate for its target (which
+        is computed only once for each combination of properties and scale).
+        """
+        href = element.get("href", element.get(f"{{{XLINK_NAMESPACE}}}href", ""))
+        target = self.ids.get(href.strip()[1:]) if href.startswith("#") else None
+        if target is None:
+            self.warnings[f"{_describe(element)} references a missing element."] = None
+            return (0, 0, 0)
+        elif id(target) in self.use_stack:
+            self.warnings[f"{_describe(element)} is a circular reference."] = None
+            return (0, 0, 0)
+
+        key = (id(target), tuple(sorted(properties.items())), scale)
+        estimate = self.use_estimates.get(key)
+        if estimate is None:
+            self.use_stack.add(id(target))
+            try:
+                if target.tag == SYMBOL_TAG:
+                    if target.get("overflow", "").strip() not in UNCLIPPED_OVERFLOWS:
+                        self.errors[
+                            f"{_describe(target)} (used by {_describe(element)}) "
+                            'must have the attribute overflow="visible" '
+                            "(clipping is not supported)."
+                        ] = None
+                    estimate = self.visit_children(target, properties, scale)
+                else:
+                    estimate = self.visit(target, properties, scale)
+            finally:
+                self.use_stack.discard(id(target))
+            self.use_estimates[key] = estimate
+
+        return estimate
+
+    def check(self, element, specified):
+        """
+        Check the properties specified on a rendered element for unsupported
+        values.
+        """
+        if specified.get("comp-op", "src-over") != "src-over":
+            self.errors[
+                f"{_describe(element)} uses unsupported comp-op "
+                f"'{specified['comp-op']}'."
+            ] = None
+
+        for name in ("clip-path", "mask"):
+            if specified.get(name, "none") != "none":
+                self.warnings[
+                    f"{_describe(element)} has a {name} which will be ignored."
+                ] = None
+
+    def estimate(self, element, properties, scale):
+        """
+        Estimate the (elements, outlines, points) produced by a graphics
+        element itself (i.e. not including its children).
+        """
+        tag = element.tag
+        if properties["visibility"] in HIDDEN_VISIBILITIES:
+            return (0, 0, 0)
+
+        markers = [
+            URL_REFERENCE_REGEX.findall(properties[name]) for name in MARKER_PROPERTIES
+        ]
+        for marker_id in sum(markers, []):
+            marker = self.ids.get(marker_id)
+            if (
+                marker is not None
+                and marker.tag == MARKER_TAG
+                and marker.get("overflow", "").strip() not in UNCLIPPED_OVERFLOWS
+            ):
+                self.errors[
+                    f"{_describe(marker)} (used by {_describe(element)}) must "
+                    'have the attribute overflow="visible" (clipping is not '
+                    "supported)."
+                ] = None
+
+        if properties["stroke"] == "none":
+            return (0, 0, 0)
+
+        pixels_per_unit = self.pixels_per_unit * scale
+        if tag in TEXT_TAGS:
+            glyphs = _count_glyphs(element.text) + sum(
+                _count_glyphs(child.tail) for child in element
+            )
+            if glyphs == 0:
+                return (0, 0, 0)
+            font_size = properties["font-size"] * pixels_per_unit
+            return (
+                1,
+                math.ceil(glyphs * OUTLINES_PER_GLYPH),
+                math.ceil(
+                    glyphs
+                    * (
+                        POINTS_PER_GLYPH
+                        + (POINTS_PER_GLYPH_PER_SQRT_PIXEL * math.sqrt(font_size))
+                    )
+                ),
+            )
+
+        stats = _get_shape_stats(element, pixels_per_unit)
+        if stats is None:
+            return (0, 0, 0)
+        length, outlines, points = stats
+        if outlines == 0:
+            return (0, 0, 0)
+
+        dashes = _get_dash_array(properties["stroke-dasharray"])
+        if dashes is not None:
+            # Each dash becomes a separate outline
+            outlines = math.ceil(length / sum(dashes)) * (len(dashes) // 2)
+            points += 2 * outlines
+
+        return (1, outlines, points)
+
+
+def _get_pixels_per_unit(root, width_mm, height_mm, page_size, pixels_per_mm):
+    """
+    Determine the number of pixels per SVG user unit when rendering a
+    document.
+
+    Parameters
+    ----------
+    root : ElementTree
+    width_mm, height_mm : float or None
+        The page size given to :py:func:`svgoutline.svg_to_outlines` (if any).
+    page_size : (width_mm, height_mm) or None
+        The page size specified by the document (or None if it could not be
+        determined).
+    pixels_per_mm : float
+    """
+    page_width_mm, page_height_mm = page_size or (None, None)
+    if width_mm is None or height_mm is None:
+        width_mm, height_mm = page_width_mm, page_height_mm
+
+    # By default, user units are CSS pixels
+    mm_per_unit = MM_PER_INCH / get_svg_dpi(root)
+
+    view_box = [float(v) for v in NUMBER_REGEX.findall(root.get("viewBox", ""))]
+    if width_mm is not None and len(view_box) == 4 and min(view_box[2:]) > 0:
+        mm_per_unit = math.sqrt((width_mm / view_box[2]) * (height_mm / view_box[3]))
+    elif width_mm is not None and page_width_mm:
+        mm_per_unit *= math.sqrt(
+            (width_mm / page_width_mm) * (height_mm / page_height_mm)
+        )
+
+    return pixels_per_mm * mm_per_unit
+
+
+def preflight_svg(root, width_mm=None, height_mm=None, pixels_per_mm=5.0):
+    """
+    Check an SVG for constructs unsupported by
+    :py:func:`svgoutline.svg_to_outlines` and estimate the size of its output
+    and the time it will take to render, without rendering it.
+
+    Example::
+
+        report = preflight_svg("example.svg", pixels_per_mm=20.0)
+        if report.errors:
+            reject(report.errors)
+        elif report.cost > 10.0:
+            send_to_big_worker("example.svg")
+
+    Parameters
+    ----------
+    root : ElementTree, str, bytes or file-like object
+        The SVG, in any form accepted by :py:func:`svgoutline.svg_to_outlines`.
+    width_mm, height_mm, pixels_per_mm
+        The rendering parameters which will be passed to
+        :py:func:`svgoutline.svg_to_outlines`.
+
+    Returns
+    -------
+    :py:class:`PreflightReport`
+    """
+    root = parse_svg(root)
+
+    try:
+        page_size = get_svg_page_size(root)
+        page_size_error = None
+    except ValueError as exc:
+        page_size = None
+        page_size_error = f"The page size cannot be determined: {exc}"
+
+    preflight = _Preflight(
+        root,
+        _get_pixels_per_unit(root, width_mm, height_mm, page_size, pixels_per_mm),
+    )
+
+    # svg_to_outlines needs the page size from the document unless one is
+    # given explicitly
+    if page_size_error is not None and (width_mm is None or height_mm is None):
+        preflight.errors[page_size_error] = None
+
+    initial = dict(PREFLIGHT_PROPERTIES)
+    initial["font-size"] = DEFAULT_FONT_SIZE
+    elements, outlines, points = preflight.visit(root, initial, 1.0)
+
+    if any(e.tag == STYLE_TAG and (e.text or "").strip() for e in root.iter(STYLE_TAG)):
+        preflight.warnings["<style> sheets are not considered by the estimates."] = None
+
+    return PreflightReport(
+        errors=list(preflight.errors),
+        warnings=list(preflight.warnings),
+        elements=elements,
+        outlines=outlines,
+        points=points,
+        cost=(
+            (elements * COST_PER_ELEMENT)
+            + (outlines * COST_PER_OUTLINE)
+            + (points * COST_PER_POINT)
+        ),
+    )
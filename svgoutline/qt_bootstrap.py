@@ -0,0 +1,111 @@
+"""
+Creation of the QGuiApplication which Qt's rendering machinery requires.
+
+When svgoutline has to create the application itself, it is created using a
+display-free platform plugin ('offscreen' by default) so that it starts
+quickly and works on servers without a display.
+"""
+
+import os
+import time
+import warnings
+import threading
+
+from collections import namedtuple
+
+from PySide6.QtGui import QGuiApplication
+from PySide6.QtGui import QFontDatabase
+
+
+QtBootstrapInfo = namedtuple(
+    "QtBootstrapInfo", "application platform startup_time font_load_time"
+)
+"""
+Information about the QGuiApplication in use.
+
+Attributes
+----------
+application : QGuiApplication
+platform : str
+    The name of the Qt platform plugin in use (e.g. 'offscreen').
+startup_time : float or None
+    The time (in seconds) taken to create the application or None if it was
+    not created by svgoutline.
+font_load_time : float or None
+    The time (in seconds) taken to preload the font database or None if the
+    font database has not been preloaded.
+"""
+
+# The platform plugin used when none is specified by the user or the
+# QT_QPA_PLATFORM environment variable.
+DEFAULT_PLATFORM = "offscreen"
+
+_lock = threading.Lock()
+
+# The QtBootstrapInfo for the current application (holding a reference to the
+# application to prevent it being garbage collected).
+_info = None
+
+
+def ensure_qt_application(
+    platform=None, preload_fonts=False, require_main_thread=False
+):
+    """
+    Return a :py:class:`QtBootstrapInfo` describing the QGuiApplication,
+    creating the application if one does not already exist.
+
+    Parameters
+    ----------
+    platform : str or None
+        The Qt platform plugin to use if an application must be created. If
+        None, the QT_QPA_PLATFORM environment variable is respected, falling
+        back on :py:data:`DEFAULT_PLATFORM`. Ignored if an application already
+        exists.
+    preload_fonts : bool
+        If True, the font database will be loaded now (rather than lazily
+        when text is first rendered). This is useful in long-running worker
+        processes where the cost can be paid before the first job arrives.
+
+    require_main_thread : bool
+        Qt requires that the application is created in the main thread. If
+        an application must be created and this function is called from any
+        other thread, a RuntimeError is raised if this argument is True.
+        Otherwise a RuntimeWarning is issued and the application is created
+        anyway (which works in practice so long as the application is only
+        ever used from that thread).
+    """
+    global _info
+
+    with _lock:
+        app = QGuiApplication.instance()
+        if _info is None or _info.application is not app:
+            if app is None:
+                if threading.current_thread() is not threading.main_thread():
+                    message = (
+                        "The Qt application must be created in the main thread "
+                        "(call svgoutline.ensure_qt_application() before "
+                        "rendering from other threads)."
+                    )
+                    if require_main_thread:
+                        raise RuntimeError(message)
+                    warnings.warn(message, RuntimeWarning, stacklevel=2)
+
+                argv = ["svgoutline"]
+                if platform is not None or not os.environ.get("QT_QPA_PLATFORM"):
+                    argv += ["-platform", platform or DEFAULT_PLATFORM]
+
+                before = time.perf_counter()
+                app = QGuiApplication(argv)
+                startup_time = time.perf_counter() - before
+            else:
+                # Application created by someone else
+                startup_time = None
+
+            _info = QtBootstrapInfo(app, app.platformName(), startup_time, None)
+
+        if preload_fonts and _info.font_load_time is None:
+            before = time.perf_counter()
+            QFontDatabase.families()
+            _info = _info._replace(font_load_time=time.perf_counter() - before)
+
+        return _info
@@ -0,0 +1,141 @@
+"""
+Repeated rendering of an SVG at different sizes and resolutions.
+
+Parsing, pre-processing and loading an SVG into QSvg can account for a
+significant part of the time taken by :py:func:`svgoutline.svg_to_outlines`.
+When the same SVG is to be rendered several times (e.g. a low resolution
+preview followed by a high resolution render, or at several sheet sizes), an
+:py:class:`OutlineRenderer` allows this work to be done just once, leaving
+only the paint pass to be repeated.
+"""
+
+import threading
+
+from collections import OrderedDict
+
+from svgoutline.svg_input import parse_svg
+from svgoutline.svg_utils import get_svg_page_size
+from svgoutline.svg_to_outlines import load_svg_renderer, render_outlines
+from svgoutline.qt_bootstrap import ensure_qt_application
+from svgoutline.cache import hash_svg
+
+
+class OutlineRenderer(object):
+    """
+    An SVG which has been parsed and loaded into QSvg, ready to be rendered
+    (repeatedly).
+
+    Example::
+
+        renderer = OutlineRenderer("example.svg")
+        preview = renderer.render(pixels_per_mm=1.0)
+        outlines = renderer.render(pixels_per_mm=20.0)
+
+    Renders are serialised (i.e. concurrent calls to :py:meth:`render` from
+    several threads will wait for each other).
+    """
+
+    def __init__(self, root):
+        """
+        Parameters
+        ----------
+        root
+            The SVG to load, in any form accepted by
+            :py:func:`svgoutline.svg_to_outlines`.
+        """
+        ensure_qt_application()
+
+        root = parse_svg(root)
+
+        try:
+            self.page_size = get_svg_page_size(root)
+        except ValueError:
+            # No page size given in the SVG, must be specified on render
+            self.page_size = None
+
+        self._svg_renderer = load_svg_renderer(root)
+        self._lock = threading.Lock()
+
+    def render(self, width_mm=None, height_mm=None, pixels_per_mm=5.0):
+        """
+        Render the SVG and return its outlines. See
+        :py:func:`svgoutline.svg_to_outlines` for a description of the
+        arguments and return value.
+        """
+        if width_mm is None or height_mm is None:
+            if self.page_size is None:
+                raise ValueError("SVG has no page size; width and height required.")
+            width_mm, height_mm = self.page_size
+
+        with self._lock:
+            return render_outlines(
+                self._svg_renderer, width_mm, height_mm, pixels_per_mm
+            )
+
+
+class RendererCache(object):
+    """
+    An in-memory, least-recently-used cache of :py:class:`OutlineRenderer`
+    objects keyed by the content of the SVG.
+
+    Example::
+
+        renderers = RendererCache(max_entries=8)
+        preview = renderers.render("example.svg", pixels_per_mm=1.0)
+        # ...later (the SVG is not parsed or loaded again)...
+        outlines = renderers.render("example.svg", pixels_per_mm=20.0)
+    """
+
+    def __init__(self, max_entries=16):
+        """
+        Parameters
+        ----------
+        max_entries : int
+            The maximum number of renderers to retain.
+        """
+        self.max_entries = max_entries
+
+        # {digest: OutlineRenderer, ...} in least-to-most recently used order
+        self._renderers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._renderers)
+
+    def get(self, source):
+        """
+        Get the :py:class:`OutlineRenderer` for an SVG (in any form accepted
+        by :py:func:`svgoutline.svg_to_outlines`), loading it if it is not
+        already in the cache.
+        """
+        digest, source = hash_svg(source)
+
+        with self._lock:
+            renderer = self._renderers.get(digest)
+            if renderer is not None:
+                self._renderers.move_to_end(digest)
+                return renderer
+
+        # Load outside of the lock so that loading one SVG doesn't block
+        # access to those already loaded.
+        renderer = OutlineRenderer(source)
+
+        with self._lock:
+            renderer = self._renderers.setdefault(digest, renderer)
+            self._renderers.move_to_end(digest)
+            while len(self._renderers) > self.max_entries:
+                self._renderers.popitem(last=False)
+
+        return renderer
+
+    def render(self, source, width_mm=None, height_mm=None, pixels_per_mm=5.0):
+        """
+        Render an SVG using a cached :py:class:`OutlineRenderer`. Arguments
+        and return value are as :py:func:`svgoutline.svg_to_outlines`.
+        """
+        return self.get(source).render(width_mm, height_mm, pixels_per_mm)
+
+    def clear(self):
+        """Remove all renderers from the cache."""
+        with self._lock:
+            self._renderers.clear()
@@ -0,0 +1,134 @@
+"""
+A fast scanner for SVG metadata (page size etc.) which avoids parsing (or even
+reading) more of the document than is necessary.
+"""
+
+from collections import Counter, namedtuple
+
+from xml.etree import ElementTree
+from xml.parsers import expat
+
+from svgoutline.svg_input import open_svg
+from svgoutline.svg_utils import (
+    SVG_NAMESPACE,
+    get_svg_dpi,
+    get_svg_page_size,
+)
+
+
+SvgMetadata = namedtuple("SvgMetadata", "width_mm height_mm dpi element_counts")
+"""
+Metadata produced by :py:func:`scan_svg`.
+
+Attributes
+----------
+width_mm, height_mm : float
+    The page size, as produced by :py:func:`svgoutline.get_svg_page_size`.
+dpi : float
+    The DPI used to compute the page size (see
+    :py:func:`svgoutline.svg_utils.get_svg_dpi`).
+element_counts : Counter or None
+    If requested, a count of the SVG elements in the document, indexed by
+    (non-namespaced) tag name, e.g. 'path', 'text' or 'use'.
+"""
+
+# Number of bytes read at a time while looking for the root element (which is
+# usually found within the first few hundred bytes).
+HEADER_BLOCK_SIZE = 4096
+
+# Number of bytes read at a time while counting elements
+COUNT_BLOCK_SIZE = 1024 * 1024
+
+
+class _StopScan(Exception):
+    """Raised within expat callbacks to stop parsing early."""
+
+
+def _to_clark_notation(name):
+    """
+    Convert an expat name of the form 'uri}local' into ElementTree's
+    '{uri}local' form.
+    """
+    if "}" in name:
+        return "{" + name
+    else:
+        return name
+
+
+def scan_svg(source, count_elements=False, dpi=None, use_illustrator_heuristic=True):
+    """
+    Determine the page size of an SVG without parsing the whole document.
+
+    Unless 'count_elements' is True, reading stops once the root <svg>
+    element's start tag has been read.
+
+    Parameters
+    ----------
+    source : str, bytes or file-like object
+        The SVG, in any form accepted by
+        :py:func:`svgoutline.svg_input.open_svg` (e.g. a filename or a file
+        object opened in binary mode).
+    count_elements : bool
+        If True, the whole document will be scanned (without building an
+        ElementTree) and the number of each kind of SVG element counted.
+    dpi, use_illustrator_heuristic
+        See :py:func:`svgoutline.get_svg_page_size`.
+
+    Returns
+    -------
+    :py:class:`SvgMetadata`
+    """
+    with open_svg(source) as file:
+        root, element_counts = _scan(file, count_elements)
+
+    if dpi is None:
+        dpi = get_svg_dpi(root, use_illustrator_heuristic)
+
+    width_mm, height_mm = get_svg_page_size(root, dpi)
+
+    return SvgMetadata(width_mm, height_mm, dpi, element_counts)
+
+
+def _scan(file, count_elements):
+    """
+    Read the root element (and optionally count the elements) of an open SVG
+    file. Returns (root, element_counts).
+    """
+    parser = expat.ParserCreate(namespace_separator="}")
+
+    root = None
+    element_counts = Counter() if count_elements else None
+    svg_prefix = SVG_NAMESPACE + "}"
+
+    def start_element(name, attrs):
+        nonlocal root
+
+        if root is None:
+            root = ElementTree.Element(
+                _to_clark_notation(name),
+                {_to_clark_notation(k): v for k, v in attrs.items()},
+            )
+            if not count_elements:
+                raise _StopScan()
+
+        if name.startswith(svg_prefix):
+            element_counts[name[len(svg_prefix) :]] += 1
+
+    parser.StartElementHandler = start_element
+
+    try:
+        block_size = HEADER_BLOCK_SIZE
+        while True:
+            data = file.read(block_size)
+            parser.Parse(data, not data)
+            if not data:
+                break
+            if root is not None:
+                block_size = COUNT_BLOCK_SIZE
+    except _StopScan:
+        pass
+
+    if root is None:
+        raise ValueError("No root element found.")
+
+    return root, element_counts
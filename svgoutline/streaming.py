@@ -0,0 +1,223 @@
+"""
+Extraction of outlines from very large SVG documents in a streaming fashion.
+
+Rather than parsing the whole document before rendering it, the document is
+parsed incrementally and rendered a chunk of elements at a time, with the
+elements of each chunk being discarded once rendered. As a result, the peak
+memory usage is bounded by the chunk size rather than the document size.
+"""
+
+from svgoutline.svg_utils import (
+    SVG_NAMESPACE,
+    DEFINITION_TAGS,
+    NON_RENDERED_TAGS,
+    GROUP_TAG,
+    STYLE_TAG,
+    get_svg_page_size,
+    make_subdocument,
+    copy_enclosing_groups,
+    has_group_effects,
+)
+from svgoutline.svg_to_outlines import svg_to_outlines
+from svgoutline.svg_input import open_svg, iterparse_svg
+
+
+def svg_to_outlines_streaming(
+    source,
+    width_mm=None,
+    height_mm=None,
+    pixels_per_mm=5.0,
+    chunk_size=1000,
+):
+    """
+    Like :py:func:`svgoutline.svg_to_outlines` but parses and renders the SVG
+    incrementally, yielding outlines as each chunk of the document is
+    rendered.
+
+    The document is split into chunks of 'chunk_size' elements. Elements
+    within (possibly nested) groups (<g>) are split between chunks as
+    required (except groups with group effects such as opacity, which are
+    kept whole), with each chunk receiving a copy of the enclosing groups (and
+    their attributes, e.g. transforms and styles). Each chunk also receives
+    any <style> sheets and the definitions (e.g. gradients and symbols) it
+    references.
+
+    .. warning::
+
+        Since earlier parts of the document are discarded once rendered,
+        references are only resolved to:
+
+        * Elements defined within <defs> (or other non-rendered elements such
+          as <symbol> or <linearGradient>) which appear *before* the
+          reference in the document.
+        * Elements within the same top-level element as the reference (e.g.
+          a <use> referencing a path within the same group).
+
+        References to other rendered elements, for example a <use>
+        referencing a path in a different group, may not be resolved.
+
+    Parameters
+    ----------
+    source : str, bytes or file-like object
+        The SVG, in any form accepted by
+        :py:func:`svgoutline.svg_input.open_svg` (e.g. a filename or a file
+        object opened in binary mode). Compressed (.svgz) files are
+        decompressed as they are parsed.
+    width_mm, height_mm, pixels_per_mm
+        See :py:func:`svgoutline.svg_to_outlines`.
+    chunk_size : int
+        The number of elements to render at once.
+
+    Generates
+    ---------
+    ((r, g, b, a) or None, width, [(x, y), ...])
+        The outlines in the same order and form as produced by
+        :py:func:`svgoutline.svg_to_outlines`.
+    """
+    with open_svg(source) as file:
+        yield from _svg_to_outlines_streaming(
+            file, width_mm, height_mm, pixels_per_mm, chunk_size
+        )
+
+
+def _svg_to_outlines_streaming(file, width_mm, height_mm, pixels_per_mm, chunk_size):
+    """
+    Implementation of :py:func:`svg_to_outlines_streaming` for an open file.
+    """
+    root = None
+
+    # The stack of currently open elements, excluding the root. Each entry is
+    # a (element, splittable) pair where splittable is True for groups whose
+    # children may be split across chunks (i.e. groups whose ancestors are all
+    # splittable groups).
+    stack = []
+
+    # Splittable groups whose end tags have been seen (by id()). Removed from
+    # the document once their children have all been rendered.
+    closed_groups = set()
+
+    # The definitions and stylesheets seen so far
+    definitions = {}
+    stylesheets = []
+
+    # The elements to be rendered in the next chunk, [(groups, element), ...]
+    # where 'groups' is the list of splittable groups containing the element.
+    pending = []
+
+    for event, element in iterparse_svg(file, ("start", "end")):
+        if event == "start":
+            if root is None:
+                root = element
+                if width_mm is None or height_mm is None:
+                    width_mm, height_mm = get_svg_page_size(root)
+            else:
+                # NB: Groups with group effects (e.g. opacity) are rendered by
+                # QSvg as a whole (offscreen) and so cannot be split. (An
+                # element's attributes are complete at its start tag.)
+                parent_splittable = stack[-1][1] if stack else True
+                stack.append(
+                    (
+                        element,
+                        parent_splittable
+                        and element.tag == GROUP_TAG
+                        and not has_group_effects(element),
+                    )
+                )
+            continue
+
+        if element is root:
+            break
+
+        element, splittable = stack.pop()
+
+        if stack:
+            parent, parent_splittable = stack[-1]
+        else:
+            parent, parent_splittable = root, True
+
+        if not parent_splittable:
+            # Part of a larger element, will be handled when its (splittable)
+            # ancestor is complete.
+            continue
+
+        if splittable:
+            if len(element) == 0:
+                parent.remove(element)
+            else:
+                closed_groups.add(id(element))
+        elif element.tag in DEFINITION_TAGS:
+            for e in element.iter():
+                if "id" in e.attrib:
+                    definitions[e.attrib["id"]] = e
+            parent.remove(element)
+        elif element.tag == STYLE_TAG:
+            stylesheets.append(element)
+            parent.remove(element)
+        elif (
+            element.tag in NON_RENDERED_TAGS
+            or not element.tag.startswith(f"{{{SVG_NAMESPACE}}}")
+        ):
+            parent.remove(element)
+        else:
+            pending.append(([e for e, _ in stack], element))
+            if len(pending) >= chunk_size:
+                yield from _render_chunk(
+                    root,
+                    pending,
+                    definitions,
+                    stylesheets,
+                    width_mm,
+                    height_mm,
+                    pixels_per_mm,
+                )
+                _discard_chunk(root, pending, closed_groups)
+                pending = []
+
+    if pending:
+        yield from _render_chunk(
+            root,
+            pending,
+            definitions,
+            stylesheets,
+            width_mm,
+            height_mm,
+            pixels_per_mm,
+        )
+
+
+def _render_chunk(
+    root,
+    pending,
+    definitions,
+    stylesheets,
+    width_mm,
+    height_mm,
+    pixels_per_mm,
+):
+    """
+    Render a list of [(groups, element), ...] as produced by
+    :py:func:`svg_to_outlines_streaming`, returning the outlines.
+    """
+    children = list(stylesheets) + copy_enclosing_groups(pending)
+
+    return svg_to_outlines(
+        make_subdocument(root, children, definitions),
+        width_mm,
+        height_mm,
+        pixels_per_mm,
+    )
+
+
+def _discard_chunk(root, pending, closed_groups):
+    """
+    Remove the rendered elements from the document along with any groups
+    which have been closed and are now empty.
+    """
+    for groups, element in pending:
+        parents = [root] + groups
+        parents[-1].remove(element)
+
+        for parent, group in reversed(list(zip(parents, groups))):
+            if id(group) in closed_groups and len(group) == 0:
+                closed_groups.discard(id(group))
+                parent.remove(group)
@@ -0,0 +1,184 @@
+"""
+Opening and parsing SVGs from the various forms in which they may be
+supplied: filenames, bytes (or other buffers such as mmaps), file objects and
+already parsed ElementTrees. Gzip-compressed SVGs (.svgz) are detected and
+decompressed automatically.
+
+Data is always read (and decompressed) incrementally so the document is never
+held in memory in both its raw and parsed forms.
+"""
+
+import io
+import os
+import gzip
+import mmap
+
+from contextlib import contextmanager
+
+from xml.etree import ElementTree
+
+
+# The first two bytes of every gzip stream
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Number of bytes read at a time from buffers
+BUFFER_READ_SIZE = 64 * 1024
+
+# Number of bytes initially fed to the XML parser at a time, and the limit to
+# which this may grow when parsing very large tokens (see iterparse_svg).
+PARSE_BLOCK_SIZE = 64 * 1024
+MAX_PARSE_BLOCK_SIZE = 16 * 1024 * 1024
+
+
+class _BufferReader(io.RawIOBase):
+    """
+    A read-only file object reading from a bytes-like object (e.g. bytes,
+    bytearray, memoryview or mmap) without copying it.
+    """
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast("B")
+        self._offset = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = min(len(b), len(self._view) - self._offset)
+        b[:n] = self._view[self._offset : self._offset + n]
+        self._offset += n
+        return n
+
+    def close(self):
+        self._view.release()
+        super().close()
+
+
+class _PrefixedReader(io.RawIOBase):
+    """
+    A read-only file object which returns 'prefix' followed by the remaining
+    contents of 'file'. Used to 'un-read' bytes from non-seekable files.
+    """
+
+    def __init__(self, prefix, file):
+        self._prefix = prefix
+        self._file = file
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if self._prefix:
+            n = min(len(b), len(self._prefix))
+            b[:n] = self._prefix[:n]
+            self._prefix = self._prefix[n:]
+            return n
+        else:
+            data = self._file.read(len(b))
+            b[: len(data)] = data
+            return len(data)
+
+
+def _peek(file, size):
+    """
+    Return the first 'size' bytes of a file object (opened in binary mode)
+    along with a file object which still returns those bytes.
+    """
+    if hasattr(file, "peek"):
+        return file.peek(size)[:size], file
+    elif getattr(file, "seekable", lambda: False)():
+        position = file.tell()
+        data = file.read(size)
+        file.seek(position)
+        return data, file
+    else:
+        data = file.read(size)
+        return data, io.BufferedReader(_PrefixedReader(data, file))
+
+
+@contextmanager
+def open_svg(source):
+    """
+    A context manager which produces a binary file object containing the
+    (decompressed) SVG document given by 'source'.
+
+    Parameters
+    ----------
+    source : str or path-like, bytes-like object or file-like object
+        A filename, a bytes-like object (e.g. bytes, bytearray, memoryview or
+        mmap) containing the document or a file object opened in binary mode.
+        In all cases the document may be gzip compressed (e.g. a .svgz file).
+        File objects are not closed.
+    """
+    with _open_raw(source) as file:
+        magic, file = _peek(file, len(GZIP_MAGIC))
+        if magic == GZIP_MAGIC:
+            with gzip.GzipFile(fileobj=file, mode="rb") as decompressed:
+                yield decompressed
+        else:
+            yield file
+
+
+@contextmanager
+def _open_raw(source):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            yield file
+    elif hasattr(source, "read") and not isinstance(source, mmap.mmap):
+        yield source
+    else:
+        with io.BufferedReader(_BufferReader(source), BUFFER_READ_SIZE) as file:
+            yield file
+
+
+def parse_svg(source):
+    """
+    Parse an SVG document given in any of the forms accepted by
+    :py:func:`open_svg`, returning the root element. If 'source' is already
+    a parsed ElementTree element, it is returned unchanged.
+    """
+    if ElementTree.iselement(source):
+        return source
+    elif isinstance(source, ElementTree.ElementTree):
+        return source.getroot()
+
+    with open_svg(source) as file:
+        root = None
+        for _event, element in iterparse_svg(file, ("start",)):
+            if root is None:
+                root = element
+        return root
+
+
+def iterparse_svg(file, events=("end",)):
+    """
+    Like :py:func:`xml.etree.ElementTree.iterparse` but reads the document
+    from a binary file object in blocks of adaptive size.
+
+    Older versions of expat re-scan any incomplete token from its start each
+    time more data is fed to the parser, making parsing of very large tokens
+    (e.g. an attribute containing a large embedded image) quadratic in their
+    size when fed in fixed size blocks. Here, whenever a block produces no
+    events, the size of the next block is doubled (up to
+    MAX_PARSE_BLOCK_SIZE).
+    """
+    parser = ElementTree.XMLPullParser(events)
+    block_size = PARSE_BLOCK_SIZE
+    while True:
+        data = file.read(block_size)
+        if not data:
+            break
+        parser.feed(data)
+
+        produced_events = False
+        for event in parser.read_events():
+            produced_events = True
+            yield event
+
+        if produced_events:
+            block_size = PARSE_BLOCK_SIZE
+        else:
+            block_size = min(block_size * 2, MAX_PARSE_BLOCK_SIZE)
+
+    parser.close()
+    yield from parser.read_events()
@@ -1,16 +1,22 @@
 from xml.etree import ElementTree
 
-from PySide6.QtGui import QGuiApplication
 from PySide6.QtGui import QPainter
+from PySide6.QtGui import QTransform
 from PySide6.QtSvg import QSvgRenderer
 from PySide6.QtCore import QXmlStreamReader
+from PySide6.QtCore import Qt
 
 from svgoutline.svg_utils import (
     namespaces,
     get_svg_page_size,
     lines_polylines_and_polygons_to_paths,
+    strip_image_data,
+    prune_unstroked_elements,
 )
+from svgoutline.svg_input import parse_svg
 from svgoutline.outline_painter import OutlinePaintDevice
+from svgoutline.outline_utils import page_bounds, clip_outlines
+from svgoutline.qt_bootstrap import ensure_qt_application
 
 
 # Tell ElementTree to use the conventional namespace aliases for the basic
@@ -29,14 +35,26 @@ for prefix, uri in namespaces.items():
     register_xml_namespace(prefix, uri)
 
 
-def svg_to_outlines(root, width_mm=None, height_mm=None, pixels_per_mm=5.0):
+def svg_to_outlines(
+    root,
+    width_mm=None,
+    height_mm=None,
+    pixels_per_mm=5.0,
+    cache=None,
+    cache_instances=False,
+    cache_glyphs=False,
+    clip=None,
+    occlusion=False,
+    curves=False,
+):
     """
-    Given an SVG as a Python ElementTree, return a set of straight line
+    Given an SVG (usually as a Python ElementTree), return a set of straight line
     segments which approximate the outlines in that SVG when rendered.
 
-    Occlusion is not accounted for in the returned list of outlines. Even if
-    one shape is completely occluded by another, both of their outlines will be
-    reported. Simillarly, overlapping lines will also be passed through.
+    By default, occlusion is not accounted for in the returned list of
+    outlines. Even if one shape is completely occluded by another, both of
+    their outlines will be reported (see the 'occlusion' argument). Simillarly,
+    overlapping lines will also be passed through.
 
     .. note::
 
@@ -51,12 +69,16 @@ def svg_to_outlines(root, width_mm=None, height_mm=None, pixels_per_mm=5.0):
 
         Due to its internal use of Qt, a PySide6.QtGui.QGuiApplication will be
         created if one has not already been created. Non-Qt users and most Qt
-        users should not be affected by this.
+        users should not be affected by this. See
+        :py:func:`svgoutline.qt_bootstrap.ensure_qt_application`.
 
     Parameters
     ----------
-    root : ElementTree
-        The SVG whose outlines should be extracted.
+    root : ElementTree, str, bytes or file-like object
+        The SVG whose outlines should be extracted. Either an already parsed
+        ElementTree or anything accepted by
+        :py:func:`svgoutline.svg_input.open_svg` (e.g. a filename, bytes or
+        a file object), which may be gzip compressed (.svgz).
     width_mm, height_mm : float or None
         The page size to render the SVG at (in milimeters). If omitted, this
         will be determined automatically from the SVG's width and height
@@ -68,6 +90,53 @@ def svg_to_outlines(root, width_mm=None, height_mm=None, pixels_per_mm=5.0):
         Specifically, the curve approximation will be at least fine enough for
         rasterised versions of the lines to 'look right' at the specified pixel
         density.
+    cache : :py:class:`svgoutline.cache.OutlineCache` or None
+        If given, a persistent cache in which to look up (and store) the
+        outlines. On a cache hit, the SVG is not parsed or rendered.
+    cache_instances : bool
+        If True, paths which are drawn repeatedly with the same style and
+        differing only in position, rotation or reflection (e.g. many <use>
+        instances of the same symbol) are flattened once and the resulting
+        lines transformed into place for subsequent instances. (Instances at
+        a different scale are flattened separately.) This can substantially
+        speed up rendering of such documents. Due to rounding, the
+        coordinates of translated instances may differ very slightly (in the
+        last few significant digits) from those produced when this option is
+        disabled. Rotated or reflected instances may have their curves
+        approximated by a slightly different set of line segments (within
+        the accuracy implied by 'pixels_per_mm').
+    cache_glyphs : bool
+        Like 'cache_instances' but applied to the individual subpaths of each
+        path drawn, for example the glyphs of stroked text. Each distinct
+        glyph (at a given size, orientation and stroke style) is flattened
+        only once. (Glyphs are identified by their geometry since the fonts
+        used are not known to the paint engine. Paths whose subpaths have
+        not been seen before, such as most non-text shapes, are flattened as
+        normal.) Since each glyph is flattened at the origin rather than in
+        place, curves may occasionally be approximated using a slightly
+        different set of line segments (within the accuracy implied by
+        'pixels_per_mm').
+    clip : bool or (x_min, y_min, x_max, y_max) or None
+        If True, outlines are clipped to the page (see
+        :py:func:`svgoutline.outline_utils.clip_outlines`), splitting any
+        which leave and re-enter it. Alternatively, a rectangle (in mm) to
+        clip to may be given (e.g. using
+        :py:func:`svgoutline.outline_utils.page_bounds` to exclude a margin).
+        By default no clipping is performed.
+    occlusion : bool
+        If True, the parts of outlines hidden beneath opaque filled shapes
+        drawn on top of them are removed. (Outlines are not hidden by other
+        strokes, by translucent fills or by images.) Outlines which are
+        partly hidden are split into several outlines. This requires the
+        'shapely' package and is substantially slower than ordinary
+        rendering.
+    curves : bool
+        If True, curves are not flattened into straight lines. Instead, each
+        outline is given as a list of straight line and Bezier curve
+        segments (see below). This is typically much more compact. (The
+        'pixels_per_mm' argument then only affects the rare shapes which
+        must still be flattened, e.g. those drawn in perspective.) Cannot be
+        combined with 'cache', 'clip' or 'occlusion'.
 
     Returns
     -------
@@ -89,35 +158,250 @@ def svg_to_outlines(root, width_mm=None, height_mm=None, pixels_per_mm=5.0):
         polylines may be considered open. Closed lines in the input SVG will
         result in polylines where the first and last coordinate are identical.
         Lines may go beyond the bounds of the designated page size (as in the
-        input SVG).
+        input SVG) unless 'clip' is used.
+
+        If 'curves' is True, each 'line' is instead a list of segments
+        [((x, y), ...), ...], each a tuple of two (a straight line), three (a
+        quadratic Bezier curve) or four (a cubic Bezier curve) control points
+        (given in mm). Each segment starts at the end of the previous one.
+        See :py:mod:`svgoutline.bezier` for utilities for working with these.
     """
+    if curves and (cache is not None or clip not in (None, False) or occlusion):
+        raise ValueError(
+            "The 'cache', 'clip' and 'occlusion' options are not supported "
+            "for curve outlines."
+        )
+
+    if cache is not None:
+        key, root = cache.make_key(
+            root,
+            width_mm,
+            height_mm,
+            pixels_per_mm,
+            clip,
+            occlusion,
+            cache_instances,
+            cache_glyphs,
+        )
+        outlines = cache.get(key)
+        if outlines is None:
+            outlines = svg_to_outlines(
+                root,
+                width_mm,
+                height_mm,
+                pixels_per_mm,
+                cache_instances=cache_instances,
+                cache_glyphs=cache_glyphs,
+                clip=clip,
+                occlusion=occlusion,
+            )
+            cache.put(key, outlines)
+        return outlines
+
     # This method internally uses various parts of Qt which require that a Qt
     # application exists. If one does not exist, one will be created.
-    if QGuiApplication.instance() is None:
-        QGuiApplication()
+    ensure_qt_application()
+
+    root = parse_svg(root)
 
     # Determine the page size from the document if necessary
     if width_mm is None or height_mm is None:
         width_mm, height_mm = get_svg_page_size(root)
 
+    # NB: Filled-only elements may hide other outlines and so must not be
+    # pruned when occlusion is taken into account
+    svg_renderer = load_svg_renderer(root, prune=not occlusion)
+
+    outlines = render_outlines(
+        svg_renderer,
+        width_mm,
+        height_mm,
+        pixels_per_mm,
+        cache_instances=cache_instances,
+        cache_glyphs=cache_glyphs,
+        occlusion=occlusion,
+        curves=curves,
+    )
+
+    if clip is True:
+        clip = page_bounds(width_mm, height_mm)
+    if clip is not None and clip is not False:
+        outlines = clip_outlines(outlines, clip)
+
+    return outlines
+
+
+def load_svg_renderer(root, prune=True):
+    """
+    Load an SVG (given as an ElementTree) into a new QSvgRenderer, applying
+    any pre-processing required to work around limitations in QSvg or
+    PySide. See :py:func:`serialise_svg` for the meaning of 'prune'.
+    """
+    return load_serialised_svg_renderer(serialise_svg(root, prune))
+
+
+def serialise_svg(root, prune=True):
+    """
+    Apply any pre-processing required to work around limitations in QSvg or
+    PySide to an SVG (given as an ElementTree) and serialise it ready for
+    :py:func:`load_serialised_svg_renderer`.
+
+    Unless 'prune' is False, elements which cannot produce outlines (e.g.
+    filled-only shapes) are removed.
+
+    Unlike loading the SVG into QSvg, this does not involve Qt and may be
+    performed in any thread.
+    """
+    # Remove elements which cannot produce outlines (e.g. filled-only shapes
+    # or hidden layers) to save QSvg the work of loading and rendering them
+    if prune:
+        root = prune_unstroked_elements(root)
+
     # Convert all <line>, <polyline> and <polygon> elements to <path>s to
     # work-around PySide bug PYSIDE-891. (See comments in
     # :py:mod:`svgoutline.outline_painter`.)
     root = lines_polylines_and_polygons_to_paths(root)
 
-    # Load the SVG into QSvg
+    # Avoid QSvg decoding embedded images only to draw their outlines
+    root = strip_image_data(root)
+
+    return ElementTree.tostring(root, "unicode")
+
+
+def load_serialised_svg_renderer(svg_data):
+    """
+    Load an SVG produced by :py:func:`serialise_svg` into a new QSvgRenderer.
+    """
     xml_stream_reader = QXmlStreamReader()
-    xml_stream_reader.addData(ElementTree.tostring(root, "unicode"))
+    xml_stream_reader.addData(svg_data)
     svg_renderer = QSvgRenderer()
     svg_renderer.load(xml_stream_reader)
 
+    return svg_renderer
+
+
+def render_outlines(
+    svg_renderer,
+    width_mm,
+    height_mm,
+    pixels_per_mm=5.0,
+    element_id=None,
+    cache_instances=False,
+    cache_glyphs=False,
+    occlusion=False,
+    curves=False,
+):
+    """
+    Render an SVG already loaded into a QSvgRenderer (see
+    :py:func:`load_svg_renderer`) and return the outlines. See
+    :py:func:`svg_to_outlines` for a description of the arguments and return
+    value.
+
+    If 'element_id' is given, only the element with that ID (and its
+    children) is rendered. The element is rendered at the same position (and
+    with the same inherited styles) as it would be when rendering the whole
+    document.
+    """
     # Paint the SVG into the OutlinePaintDevice which will capture the set of
     # line segments which make up the SVG as rendered.
-    outline_paint_device = OutlinePaintDevice(width_mm, height_mm, pixels_per_mm)
+    outline_paint_device = OutlinePaintDevice(
+        width_mm,
+        height_mm,
+        pixels_per_mm,
+        cache_instances,
+        cache_glyphs,
+        occlusion,
+        curves,
+    )
     painter = QPainter(outline_paint_device)
     try:
-        svg_renderer.render(painter)
+        if element_id is None:
+            svg_renderer.render(painter)
+        else:
+            _render_element(svg_renderer, painter, element_id)
     finally:
         painter.end()
 
     return outline_paint_device.getOutlines()
+
+
+def _get_document_transform(svg_renderer, paint_device):
+    """
+    Get the transform QSvgRenderer applies to map the SVG's view box onto the
+    paint device when rendering a whole document.
+    """
+    return get_view_box_transform(
+        svg_renderer.viewBoxF(),
+        keeps_aspect_ratio(svg_renderer),
+        paint_device.width(),
+        paint_device.height(),
+    )
+
+
+def keeps_aspect_ratio(svg_renderer):
+    """
+    Test whether a QSvgRenderer preserves the aspect ratio of the view box.
+    """
+    return (
+        hasattr(svg_renderer, "aspectRatioMode")
+        and svg_renderer.aspectRatioMode() == Qt.AspectRatioMode.KeepAspectRatio
+    )
+
+
+def get_view_box_transform(view_box, keep_aspect_ratio, width, height):
+    """
+    Get the transform QSvgRenderer applies to map a view box (a QRectF) onto a
+    paint device 'width' by 'height' pixels in size. NB: QSvgRenderer uses
+    the paint device's size in whole pixels (i.e. rounded down).
+    """
+    scale_x = width / view_box.width()
+    scale_y = height / view_box.height()
+
+    if keep_aspect_ratio:
+        # Scale uniformly and centre the view box on the device
+        scale_x = scale_y = min(scale_x, scale_y)
+        offset_x = (width - (view_box.width() * scale_x)) / 2
+        offset_y = (height - (view_box.height() * scale_y)) / 2
+    else:
+        offset_x = offset_y = 0
+
+    return QTransform(
+        scale_x,
+        0,
+        0,
+        scale_y,
+        offset_x - (view_box.x() * scale_x),
+        offset_y - (view_box.y() * scale_y),
+    )
+
+
+def _render_element(svg_renderer, painter, element_id):
+    """
+    Render a single element of an SVG in the same position as it would be
+    rendered as part of the whole document.
+    """
+    # QSvgRenderer.render(painter, element_id, bounds) maps the element's
+    # bounds onto the given bounds (or the whole paint device if no bounds
+    # are given). It then draws the element using just its own transform
+    # (i.e. ignoring the transforms of its ancestors and the document's
+    # view box). To place the element where it belongs we must set up the
+    # painter's transform to include the ancestor and view box transforms
+    # ourselves and then ensure the bounds mapping has no effect.
+    document_transform = _get_document_transform(svg_renderer, painter.device())
+    ancestor_transform = svg_renderer.transformForElement(element_id)
+
+    bounds = svg_renderer.boundsOnElement(element_id)
+    if not bounds.isEmpty():
+        # Mapping the element's bounds to themselves leaves the painter's
+        # transform untouched.
+        painter.setWorldTransform(ancestor_transform * document_transform)
+        svg_renderer.render(painter, element_id, bounds)
+    else:
+        # QSvgRenderer will fall back on mapping the view box onto the paint
+        # device (i.e. the document transform) which is applied before
+        # whatever transform we set.
+        inverse_document_transform, _ = document_transform.inverted()
+        painter.setWorldTransform(
+            inverse_document_transform * ancestor_transform * document_transform
+        )
+        svg_renderer.render(painter, element_id)
@@ -6,8 +6,6 @@ using Python's ElementTree library.
 
 import re
 
-from copy import deepcopy
-
 
 # Relevant XML namespace URIs used by SVGs
 SVG_NAMESPACE = "http://www.w3.org/2000/svg"
@@ -20,6 +18,34 @@ namespaces = {
     "xlink": XLINK_NAMESPACE,
 }
 
+# Elements which are not rendered directly but which may be referenced by
+# rendered elements.
+DEFINITION_TAGS = {
+    f"{{{SVG_NAMESPACE}}}{tag}"
+    for tag in [
+        "defs",
+        "symbol",
+        "linearGradient",
+        "radialGradient",
+        "solidColor",
+        "pattern",
+        "clipPath",
+        "mask",
+        "marker",
+        "filter",
+        "font",
+        "font-face",
+    ]
+}
+
+# Elements which play no part in rendering
+NON_RENDERED_TAGS = {
+    f"{{{SVG_NAMESPACE}}}{tag}" for tag in ["metadata", "title", "desc"]
+}
+
+GROUP_TAG = f"{{{SVG_NAMESPACE}}}g"
+STYLE_TAG = f"{{{SVG_NAMESPACE}}}style"
+
 # Unit conversion ratios
 MM_PER_CM = 10.0
 MM_PER_QUARTER_MM = 0.25
@@ -62,6 +88,41 @@ def css_dimension_to_mm(dimension, pixels_per_mm=96.0 / MM_PER_INCH):
     return number
 
 
+def get_svg_dpi(root, use_illustrator_heuristic: bool = True):
+    """
+    Given an ElementTree-parsed SVG file (or just its root <svg> element),
+    return the number of Dots (pixels) Per Inch (DPI) the SVG is believed to
+    use. See :py:func:`get_svg_page_size` for a description of the heuristics
+    used.
+    """
+    # As per the CSS spec
+    dpi = 96
+
+    # Certain older Inkscape versions used the wrong DPI
+    inkscape_version = root.attrib.get("{{{}}}version".format(INKSCAPE_NAMESPACE))
+    if inkscape_version:
+        version_number = inkscape_version.partition(" ")[0]
+        version_number_tuple = tuple(map(int, version_number.split(".")))
+        if version_number_tuple < (0, 92, 0):
+            dpi = 90
+
+    # Unfortunately the comments left by Illustrator in its SVGs are not
+    # accessible via Python's ElementTree library. (This includes more
+    # recent versions which support comments since the comment lies outside
+    # the document root and is therefore not exposed by ET).
+    #
+    # Instead we observe the Illustrator (at least in some modes...) sets
+    # the (deprecated) enable-background attribute to "new <x> <y> <w> <h>"
+    # where "<x> <y> <w> <h>" is the view box of the document.
+    if use_illustrator_heuristic:
+        enable_background = root.attrib.get("enable-background")
+        view_box = root.attrib.get("viewBox", "")
+        if enable_background == "new " + view_box:
+            dpi = 72
+
+    return dpi
+
+
 def get_svg_page_size(root, dpi: float = None, use_illustrator_heuristic: bool = True):
     """
     Given an ElementTree-parsed SVG file, return a (width_mm, height_mm) pair
@@ -87,30 +148,7 @@ def get_svg_page_size(root, dpi: float = None, use_illustrator_heuristic: bool =
     assert root.tag == "svg" or root.tag == "{{{}}}svg".format(SVG_NAMESPACE)
 
     if dpi is None:
-        # As per the CSS spec
-        dpi = 96
-
-        # Certain older Inkscape versions used the wrong DPI
-        inkscape_version = root.attrib.get("{{{}}}version".format(INKSCAPE_NAMESPACE))
-        if inkscape_version:
-            version_number = inkscape_version.partition(" ")[0]
-            version_number_tuple = tuple(map(int, version_number.split(".")))
-            if version_number_tuple < (0, 92, 0):
-                dpi = 90
-
-        # Unfortunately the comments left by Illustrator in its SVGs are not
-        # accessible via Python's ElementTree library. (This includes more
-        # recent versions which support comments since the comment lies outside
-        # the document root and is therefore not exposed by ET).
-        #
-        # Instead we observe the Illustrator (at least in some modes...) sets
-        # the (deprecated) enable-background attribute to "new <x> <y> <w> <h>"
-        # where "<x> <y> <w> <h>" is the view box of the document.
-        if use_illustrator_heuristic:
-            enable_background = root.attrib.get("enable-background")
-            view_box = root.attrib.get("viewBox", "")
-            if enable_background == "new " + view_box:
-                dpi = 72
+        dpi = get_svg_dpi(root, use_illustrator_heuristic)
 
     pixels_per_mm = dpi / MM_PER_INCH
 
@@ -126,6 +164,36 @@ def get_svg_page_size(root, dpi: float = None, use_illustrator_heuristic: bool =
     return (width_mm, height_mm)
 
 
+# Matches a number in a 'points' attribute or path data
+NUMBER_REGEX = re.compile(r"[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?")
+
+
+def points_to_path_data(points, closed=False):
+    """
+    Convert the value of a <polyline> or <polygon> 'points' attribute into
+    equivalent path data (i.e. a <path> 'd' attribute value).
+
+    The 'points' syntax is a subset of the path data syntax and any
+    coordinates following the initial 'M' command in path data are treated as
+    implicit 'L' commands. As such the points list can be used as-is without
+    needing to parse (and then re-format) every number it contains.
+
+    As required by the SVG spec, if an odd number of coordinates is given,
+    the final (unpaired) coordinate is ignored.
+    """
+    # NB: Only the numbers in the (rare) malformed case are actually used
+    numbers = NUMBER_REGEX.findall(points)
+    if len(numbers) < 2:
+        return ""
+    elif len(numbers) % 2 != 0:
+        points = " ".join(numbers[:-1])
+
+    if closed:
+        return "M" + points.strip() + "Z"
+    else:
+        return "M" + points.strip()
+
+
 def lines_polylines_and_polygons_to_paths(root):
     """
     Given an SVG, convert all <line>, <polyline> and <polygon> elements to
@@ -134,40 +202,480 @@ def lines_polylines_and_polygons_to_paths(root):
     element types. (See :py:mod:`svgoutline.outline_painter`.)
 
     If no substitutions are made, returns the original object unchanged,
-    otherwise returns an edited copy.
+    otherwise returns an edited copy (which shares unmodified elements with
+    the original).
     """
-    if (
-        root.find(f".//{{{SVG_NAMESPACE}}}line") is None
-        and root.find(f".//{{{SVG_NAMESPACE}}}polyline") is None
-        and root.find(f".//{{{SVG_NAMESPACE}}}polygon") is None
-    ):
+    replacements = {}
+    for element in root.iter():
+        if element.tag == f"{{{SVG_NAMESPACE}}}line":
+            attrib = dict(element.attrib)
+            x1 = attrib.pop("x1")
+            y1 = attrib.pop("y1")
+            x2 = attrib.pop("x2")
+            y2 = attrib.pop("y2")
+            attrib["d"] = f"M{x1} {y1} L{x2} {y2}"
+        elif element.tag == f"{{{SVG_NAMESPACE}}}polyline":
+            attrib = dict(element.attrib)
+            attrib["d"] = points_to_path_data(attrib.pop("points"), False)
+        elif element.tag == f"{{{SVG_NAMESPACE}}}polygon":
+            attrib = dict(element.attrib)
+            attrib["d"] = points_to_path_data(attrib.pop("points"), True)
+        else:
+            continue
+
+        replacements[element] = _modified_copy(
+            element, f"{{{SVG_NAMESPACE}}}path", attrib
+        )
+
+    if not replacements:
         # No substitutions required
         return root
 
-    root = deepcopy(root)
-
-    for line in root.findall(f".//{{{SVG_NAMESPACE}}}line"):
-        line.tag = f"{{{SVG_NAMESPACE}}}path"
-        x1 = line.attrib.pop("x1")
-        y1 = line.attrib.pop("y1")
-        x2 = line.attrib.pop("x2")
-        y2 = line.attrib.pop("y2")
-        line.set("d", f"M{x1} {y1} L{x2} {y2}")
-
-    for tag, closed in [("polyline", False), ("polygon", True)]:
-        for poly in root.findall(f".//{{{SVG_NAMESPACE}}}{tag}"):
-            poly.tag = f"{{{SVG_NAMESPACE}}}path"
-
-            # NB: Since this function is a workaround which hopefully won't
-            # stick around forever I'm deliberately taking a casual approach to
-            # parsing here since this will work for any valid (or
-            # defacto-valid, i.e. comma-separated) SVG.
-            points = map(
-                float, re.split(r"\s*(?:,|\s)\s*", poly.attrib.pop("points").strip())
-            )
-            d = "M" + "L".join(f"{x} {y}" for x, y in zip(points, points))
-            if closed:
-                d += "Z"
-            poly.set("d", d)
-
-    return root
+    return _replace_elements(root, replacements)
+
+
+def _modified_copy(element, tag, attrib):
+    """
+    Make a shallow copy of an element with a different tag and attributes.
+    """
+    copy = element.makeelement(tag, attrib)
+    copy.text = element.text
+    copy.tail = element.tail
+    copy.extend(element)
+    return copy
+
+
+def _replace_elements(root, replacements):
+    """
+    Make a copy of an SVG with the elements in the dict 'replacements'
+    replaced by the corresponding values (or removed, if the value is None).
+
+    Only the ancestors of the replaced elements are copied: all other
+    elements are shared with the original document (which therefore should
+    not be modified while the copy is in use). This is substantially cheaper
+    than a deep copy when only a few elements of a large document are
+    replaced.
+    """
+    parents = {child: parent for parent in root.iter() for child in parent}
+
+    # The elements which must be copied
+    ancestors = set()
+    for element in replacements:
+        parent = parents.get(element)
+        while parent is not None and parent not in ancestors:
+            ancestors.add(parent)
+            parent = parents.get(parent)
+
+    return _copy_replacing(root, replacements, ancestors)
+
+
+def _copy_replacing(element, replacements, ancestors):
+    if element in replacements:
+        return replacements[element]
+    elif element not in ancestors:
+        return element
+
+    copy = element.makeelement(element.tag, element.attrib)
+    copy.text = element.text
+    copy.tail = element.tail
+    for child in element:
+        child_copy = _copy_replacing(child, replacements, ancestors)
+        if child_copy is not None:
+            copy.append(child_copy)
+    return copy
+
+
+# A 1x1 pixel transparent PNG
+PLACEHOLDER_IMAGE_HREF = (
+    "data:image/png;base64,"
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB"
+    "0C8AAAAASUVORK5CYII="
+)
+
+
+def _is_embedded_image(element):
+    """
+    Test whether an element is an <image> with an explicit size whose
+    content is embedded in the document (as a 'data:' URI).
+    """
+    if element.tag != f"{{{SVG_NAMESPACE}}}image":
+        return False
+    if "width" not in element.attrib or "height" not in element.attrib:
+        return False
+    href = element.get("href", element.get(f"{{{XLINK_NAMESPACE}}}href", ""))
+    return href.lstrip().startswith("data:") and href != PLACEHOLDER_IMAGE_HREF
+
+
+def strip_image_data(root):
+    """
+    Given an SVG, replace the (potentially very large) data embedded in
+    <image> elements with a tiny placeholder image.
+
+    Only the outline of an image is ever rendered (see
+    :py:meth:`svgoutline.outline_painter.OutlinePaintEngine.drawImage`) and
+    QSvg always draws an image into the rectangle given by its x, y, width
+    and height attributes, regardless of the image's own dimensions. Images
+    lacking width or height attributes (which would be sized by their content)
+    are left unchanged.
+
+    If no substitutions are made, returns the original object unchanged,
+    otherwise returns an edited copy (which shares unmodified elements with
+    the original).
+    """
+    replacements = {}
+    for image in root.iter(f"{{{SVG_NAMESPACE}}}image"):
+        if _is_embedded_image(image):
+            attrib = dict(image.attrib)
+            for name in ("href", f"{{{XLINK_NAMESPACE}}}href"):
+                if name in attrib:
+                    attrib[name] = PLACEHOLDER_IMAGE_HREF
+            replacements[image] = _modified_copy(image, image.tag, attrib)
+
+    if not replacements:
+        # No substitutions required
+        return root
+
+    return _replace_elements(root, replacements)
+
+
+# Matches the ID in 'url(#id)' style references
+URL_REFERENCE_REGEX = re.compile(r"""url\(\s*['"]?#([^)'"\s]+)""")
+
+
+def get_referenced_ids(element):
+    """
+    Return the set of IDs referenced by the given element (or any of its
+    descendants). This includes '#id' references in 'href' and 'xlink:href'
+    attributes and 'url(#id)' references in any other attribute (e.g. 'fill'
+    or 'style') and in <style> sheets.
+    """
+    href_attributes = ("href", f"{{{XLINK_NAMESPACE}}}href")
+
+    ids = set()
+    for e in element.iter():
+        for name, value in e.attrib.items():
+            if name in href_attributes:
+                if value.startswith("#"):
+                    ids.add(value[1:].strip())
+            elif "url(" in value:
+                ids.update(URL_REFERENCE_REGEX.findall(value))
+
+        if e.tag == f"{{{SVG_NAMESPACE}}}style" and e.text and "url(" in e.text:
+            ids.update(URL_REFERENCE_REGEX.findall(e.text))
+
+    return ids
+
+
+def make_subdocument(root, children, definitions={}):
+    """
+    Create a new SVG document with the same root <svg> element attributes as
+    'root' containing just the elements given in 'children'.
+
+    Any elements in 'definitions' (a dict {id: element, ...}) which are
+    referenced (directly or indirectly) by the children are placed in a
+    <defs> element at the start of the new document.
+
+    The elements are not copied and so the new document shares elements
+    with the original.
+    """
+    # Find the (transitive) closure of the referenced definitions
+    used_definitions = {}
+    to_visit = []
+    for child in children:
+        to_visit.extend(sorted(get_referenced_ids(child)))
+    while to_visit:
+        ref = to_visit.pop(0)
+        if ref in used_definitions or ref not in definitions:
+            continue
+        used_definitions[ref] = definitions[ref]
+        to_visit.extend(sorted(get_referenced_ids(definitions[ref])))
+
+    subdocument = root.makeelement(root.tag, root.attrib)
+    if used_definitions:
+        defs = subdocument.makeelement(f"{{{SVG_NAMESPACE}}}defs", {})
+        defs.extend(used_definitions.values())
+        subdocument.append(defs)
+    subdocument.extend(children)
+
+    return subdocument
+
+
+def get_inkscape_layers(root):
+    """
+    Return a list of the Inkscape layers (i.e. <g> elements with the
+    attribute inkscape:groupmode="layer") in the SVG in document order.
+    Sub-layers (layers within other layers) are not included.
+    """
+    groupmode_attribute = f"{{{INKSCAPE_NAMESPACE}}}groupmode"
+
+    layers = []
+    to_visit = list(reversed(root))
+    while to_visit:
+        element = to_visit.pop()
+        if (
+            element.tag == f"{{{SVG_NAMESPACE}}}g"
+            and element.get(groupmode_attribute) == "layer"
+        ):
+            layers.append(element)
+        else:
+            to_visit.extend(reversed(element))
+
+    return layers
+
+
+def copy_enclosing_groups(elements):
+    """
+    Given a list [(groups, element), ...] where 'groups' is the list of <g>
+    elements (outermost first) which enclose the element in its original
+    document, return a list of elements where each element is placed inside
+    (shallow) copies of its enclosing groups. Consecutive elements sharing the
+    same enclosing groups share the same copies.
+    """
+    out = []
+
+    # Copies of the enclosing groups {id(group): copy}
+    group_copies = {}
+
+    for groups, element in elements:
+        parent_copy = None
+        for group in groups:
+            group_copy = group_copies.get(id(group))
+            if group_copy is None:
+                group_copy = group.makeelement(group.tag, group.attrib)
+                group_copies[id(group)] = group_copy
+                if parent_copy is None:
+                    out.append(group_copy)
+                else:
+                    parent_copy.append(group_copy)
+            parent_copy = group_copy
+
+        if parent_copy is None:
+            out.append(element)
+        else:
+            parent_copy.append(element)
+
+    return out
+
+
+# Elements which draw something and so may produce outlines (when stroked)
+GRAPHICS_TAGS = {
+    f"{{{SVG_NAMESPACE}}}{tag}"
+    for tag in [
+        "path",
+        "rect",
+        "circle",
+        "ellipse",
+        "line",
+        "polyline",
+        "polygon",
+        "image",
+        "text",
+        "tspan",
+        "textPath",
+        "tref",
+    ]
+}
+
+# Elements which contain other elements which may be removed individually
+CONTAINER_TAGS = {f"{{{SVG_NAMESPACE}}}{tag}" for tag in ["svg", "g", "a"]}
+
+# Elements which change the rendering of a document over time
+ANIMATION_TAGS = {
+    f"{{{SVG_NAMESPACE}}}{tag}"
+    for tag in ["animate", "set", "animateColor", "animateMotion", "animateTransform"]
+}
+
+USE_TAG = f"{{{SVG_NAMESPACE}}}use"
+
+# The (initial values of) the (inherited) properties which determine whether
+# an element is stroked.
+STROKE_PROPERTIES = {
+    "stroke": "none",
+    "visibility": "visible",
+    "marker-start": "none",
+    "marker-mid": "none",
+    "marker-end": "none",
+}
+
+
+MARKER_PROPERTIES = ("marker-start", "marker-mid", "marker-end")
+
+
+def get_specified_properties(element, names):
+    """
+    Return a dict {name: value, ...} giving the values of the named
+    properties specified directly on an element by presentation attributes
+    or its 'style' attribute (which takes precedence). The 'marker' shorthand
+    is expanded into the properties in MARKER_PROPERTIES. Values are
+    normalised to lower case.
+
+    NB: <style> sheets are not considered.
+    """
+    properties = {}
+    for name in names:
+        if name in element.attrib:
+            properties[name] = element.attrib[name]
+
+    for declaration in element.get("style", "").split(";"):
+        name, colon, value = declaration.partition(":")
+        name = name.strip().lower()
+        if not colon:
+            continue
+        elif name == "marker":
+            for marker in MARKER_PROPERTIES:
+                if marker in names:
+                    properties[marker] = value
+        elif name in names:
+            properties[name] = value
+
+    return {
+        name: value.replace("!important", "").strip().lower()
+        for name, value in properties.items()
+    }
+
+
+HIDDEN_VISIBILITIES = ("hidden", "collapse")
+
+# Properties which apply an effect to a group as a whole
+GROUP_EFFECT_PROPERTIES = ("opacity", "filter", "mask")
+
+
+def has_group_effects(element):
+    """
+    Test whether an element has any GROUP_EFFECT_PROPERTIES specified (via
+    presentation attributes or its 'style' attribute).
+    """
+    return bool(get_specified_properties(element, GROUP_EFFECT_PROPERTIES))
+
+
+# The properties considered by prune_unstroked_elements
+PRUNE_PROPERTIES = ("display", *STROKE_PROPERTIES)
+
+
+def _is_stroked(properties):
+    """
+    Given the computed STROKE_PROPERTIES of a graphics element, return True
+    if it may produce outlines.
+    """
+    return properties["visibility"] not in HIDDEN_VISIBILITIES and (
+        properties["stroke"] != "none"
+        or properties["marker-start"] != "none"
+        or properties["marker-mid"] != "none"
+        or properties["marker-end"] != "none"
+    )
+
+
+def _find_prunable(element, inherited, rendered, keep_ids, prunable):
+    """
+    Determine whether an element (or its descendants) may produce outlines,
+    or must be kept for some other reason, adding any of its descendants
+    which may be removed to the set 'prunable'.
+
+    Parameters
+    ----------
+    element : Element
+    inherited : {name: value, ...}
+        The computed STROKE_PROPERTIES of the element's parent.
+    rendered : bool
+        False if the element has an ancestor with display:none.
+    keep_ids : set
+        The IDs of elements which must not be removed.
+    prunable : set
+
+    Returns
+    -------
+    bool
+        True if the element must be kept.
+    """
+    tag = element.tag
+    if not isinstance(tag, str) or not tag.startswith(f"{{{SVG_NAMESPACE}}}"):
+        # Comments and non-SVG elements are left alone
+        return True
+    elif element.get("id") in keep_ids or tag in DEFINITION_TAGS:
+        return True
+    elif tag in NON_RENDERED_TAGS:
+        return False
+
+    specified = get_specified_properties(element, PRUNE_PROPERTIES)
+    if specified.pop("display", None) == "none":
+        rendered = False
+    if specified.get("visibility") in HIDDEN_VISIBILITIES and any(
+        get_specified_properties(descendant, ("visibility",)).get(
+            "visibility", "hidden"
+        )
+        not in HIDDEN_VISIBILITIES
+        for descendant in element.iter()
+        if descendant is not element
+    ):
+        # NB: QSvg makes hidden elements visible when any of their
+        # descendants override their visibility
+        del specified["visibility"]
+    properties = dict(inherited)
+    properties.update(
+        (name, value) for name, value in specified.items() if value != "inherit"
+    )
+
+    if tag in CONTAINER_TAGS:
+        # NB: QSvg renders groups with certain effects (e.g. opacity) via an
+        # off-screen image when they have several children, and so
+        # removing children may change what is drawn.
+        children_prunable = prunable if not has_group_effects(element) else set()
+
+        keep = False
+        for child in element:
+            if _find_prunable(
+                child, properties, rendered, keep_ids, children_prunable
+            ):
+                keep = True
+            else:
+                children_prunable.add(child)
+        return keep
+    elif tag in GRAPHICS_TAGS:
+        # NB: Children (e.g. <tspan>s within a <text>) are never removed
+        # individually since this may change the layout of their siblings.
+        keep = rendered and _is_stroked(properties)
+        for child in element:
+            if _find_prunable(child, properties, rendered, keep_ids, set()):
+                keep = True
+        return keep
+    elif tag == USE_TAG:
+        # NB: The referenced element may specify its own stroke
+        return rendered
+    else:
+        # Some other element (e.g. <switch> or <foreignObject>): keep to be
+        # safe.
+        return True
+
+
+def prune_unstroked_elements(root):
+    """
+    Given an SVG, remove elements which cannot produce any outlines: those
+    which are not stroked (e.g. filled-only shapes), are hidden (by
+    display:none or visibility:hidden) or contain only such elements.
+
+    Stroke, display and visibility are determined from presentation
+    attributes and 'style' attributes, accounting for inheritance.
+    Definitions (e.g. <defs>, <symbol>, <marker>), elements referenced
+    elsewhere in the document and <use> elements (whose referenced content
+    may specify its own stroke) are never removed. Documents containing
+    <style> sheets (whose selectors are not evaluated) or animations are left
+    unchanged.
+
+    If no elements are removed, returns the original object unchanged,
+    otherwise returns an edited copy (which shares unmodified elements with
+    the original).
+    """
+    for element in root.iter():
+        if (element.tag == STYLE_TAG and (element.text or "").strip()) or (
+            element.tag in ANIMATION_TAGS
+        ):
+            return root
+
+    prunable = set()
+    _find_prunable(root, STROKE_PROPERTIES, True, get_referenced_ids(root), prunable)
+
+    if not prunable:
+        # No elements to remove
+        return root
+
+    return _replace_elements(root, dict.fromkeys(prunable))
@@ -0,0 +1,99 @@
+"""
+A pool of threads for rendering many SVGs concurrently within a single
+process.
+
+Unlike the process-based :py:class:`svgoutline.OutlineExecutor`, all threads
+share a single copy of Qt (and its font database) making it possible to
+service many concurrent jobs with only one process's worth of memory.
+
+Each job creates its own QSvgRenderer and
+:py:class:`svgoutline.outline_painter.OutlinePaintDevice` (and hence paint
+engine and outline accumulator) on the worker thread which runs it so no Qt
+objects or mutable state are shared between threads. The only shared object,
+the QGuiApplication, is created up-front in the main thread as Qt requires.
+
+.. note::
+
+    Qt releases Python's GIL while parsing and flattening SVG geometry but
+    the paint engine which collects the outlines is written in Python. As a
+    result, throughput scales less than linearly with the number of threads,
+    particularly for documents with many small elements.
+"""
+
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+
+from svgoutline.svg_to_outlines import svg_to_outlines
+from svgoutline.qt_bootstrap import ensure_qt_application
+
+
+class OutlineThreadPool(object):
+    """
+    Runs :py:func:`svgoutline.svg_to_outlines` jobs in a pool of threads.
+
+    Example::
+
+        with OutlineThreadPool(max_workers=4) as pool:
+            future = pool.submit(root)
+            outlines = future.result()
+
+    The pool must be created from the main thread (unless a QGuiApplication
+    already exists) since it creates the QGuiApplication if required. A
+    RuntimeError is raised otherwise.
+    """
+
+    def __init__(self, max_workers=None):
+        """
+        Parameters
+        ----------
+        max_workers : int or None
+            The maximum number of threads (and hence concurrently rendered
+            SVGs). Defaults to the number of CPUs.
+        """
+        # Create the application (and load the fonts) in this (main) thread
+        # before any worker thread might attempt to.
+        ensure_qt_application(preload_fonts=True, require_main_thread=True)
+
+        self._executor = ThreadPoolExecutor(
+            max_workers or os.cpu_count() or 1,
+            thread_name_prefix="svgoutline",
+        )
+
+    def submit(self, root, width_mm=None, height_mm=None, pixels_per_mm=5.0):
+        """
+        Schedule a call to :py:func:`svgoutline.svg_to_outlines` (taking the
+        same arguments) in the pool.
+
+        Returns
+        -------
+        :py:class:`concurrent.futures.Future`
+            A future which resolves to the outlines.
+        """
+        return self._executor.submit(
+            svg_to_outlines, root, width_mm, height_mm, pixels_per_mm
+        )
+
+    def map(self, roots, width_mm=None, height_mm=None, pixels_per_mm=5.0):
+        """
+        Render an iterable of SVGs using the pool, generating their outlines
+        in the same order as the input. See :py:func:`svgoutline.svg_to_outlines`
+        for the other arguments (which apply to all SVGs).
+        """
+        return self._executor.map(
+            lambda root: svg_to_outlines(root, width_mm, height_mm, pixels_per_mm),
+            roots,
+        )
+
+    def shutdown(self, wait=True):
+        """
+        Shut down the pool. If 'wait' is True, blocks until all pending jobs
+        have completed.
+        """
+        self._executor.shutdown(wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
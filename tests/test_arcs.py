@@ -0,0 +1,189 @@
+import pytest
+
+import math
+
+import shapely
+
+from svgoutline.svg_to_outlines import svg_to_outlines
+from svgoutline.arcs import fit_arcs, Arc, _circle_through
+
+
+def circle_points(cx, cy, r, n, start=0.0, sweep=2.0 * math.pi):
+    return [
+        (
+            cx + r * math.cos(start + sweep * i / n),
+            cy + r * math.sin(start + sweep * i / n),
+        )
+        for i in range(n + 1)
+    ]
+
+
+def segments_to_points(segments, n=500):
+    """Sample a list of fitted segments as a polyline."""
+    points = []
+    for segment in segments:
+        if isinstance(segment, Arc):
+            cx, cy = segment.centre
+            x0, y0 = segment.start
+            r = math.hypot(x0 - cx, y0 - cy)
+            a0 = math.atan2(y0 - cy, x0 - cx)
+            points.extend(
+                (
+                    cx + r * math.cos(a0 + segment.sweep * i / n),
+                    cy + r * math.sin(a0 + segment.sweep * i / n),
+                )
+                for i in range(n + 1)
+            )
+        else:
+            points.extend(segment)
+    return points
+
+
+def assert_within_tolerance(line, segments, tolerance):
+    # Segments must be joined end-to-end from the start to the end of the line
+    assert segments[0][0] == pytest.approx(line[0])
+    assert segments[-1][1] == pytest.approx(line[-1])
+    for a, b in zip(segments, segments[1:]):
+        assert a[1] == b[0]
+
+    distance = shapely.hausdorff_distance(
+        shapely.LineString(line), shapely.LineString(segments_to_points(segments))
+    )
+    assert distance <= tolerance * 1.01
+
+
+@pytest.mark.parametrize(
+    "a, b, c, exp",
+    [
+        ((1, 0), (0, 1), (-1, 0), (0, 0)),
+        ((12, 10), (10, 12), (8, 10), (10, 10)),
+        # Collinear
+        ((0, 0), (1, 1), (2, 2), None),
+    ],
+)
+def test_circle_through(a, b, c, exp):
+    centre = _circle_through(a, b, c)
+    if exp is None:
+        assert centre is None
+    else:
+        assert centre == pytest.approx(exp)
+
+
+@pytest.mark.parametrize("line", [[], [(1, 2)], [(1, 2), (1, 2)]])
+def test_degenerate(line):
+    assert fit_arcs([(None, 0.1, line)]) == [(None, 0.1, [])]
+
+
+def test_preserves_colour_and_width():
+    outlines = [
+        ((1.0, 0.0, 0.0, 1.0), 0.5, [(0, 0), (1, 0)]),
+        (None, 0.1, [(0, 0), (0, 1)]),
+    ]
+    assert fit_arcs(outlines) == [
+        ((1.0, 0.0, 0.0, 1.0), 0.5, [((0, 0), (1, 0))]),
+        (None, 0.1, [((0, 0), (0, 1))]),
+    ]
+
+
+def test_collinear_points_merged():
+    line = [(0, 0), (1, 0.01), (2, 0), (3, -0.01), (4, 0)]
+    assert fit_arcs([(None, 0.1, line)], tolerance=0.05) == [
+        (None, 0.1, [((0, 0), (4, 0))])
+    ]
+
+
+def test_repeated_points_removed():
+    line = [(0, 0), (0, 0), (1, 0), (1, 0), (2, 0)]
+    assert fit_arcs([(None, 0.1, line)]) == [(None, 0.1, [((0, 0), (2, 0))])]
+
+
+def test_corners_kept():
+    square = [(0, 0), (10, 0), (10, 10), (0, 10), (0, 0)]
+    assert fit_arcs([(None, 0.1, square)]) == [
+        (None, 0.1, list(zip(square, square[1:]))),
+    ]
+
+
+@pytest.mark.parametrize("sweep", [math.pi / 2, -math.pi / 2, math.pi, -3.0])
+def test_arc(sweep):
+    line = circle_points(5, 6, 10, 64, start=1.0, sweep=sweep)
+    ((_rgba, _width, segments),) = fit_arcs([(None, 0.1, line)])
+    assert len(segments) == 1
+    (arc,) = segments
+    assert isinstance(arc, Arc)
+    assert arc.start == line[0]
+    assert arc.end == line[-1]
+    assert arc.centre == pytest.approx((5, 6))
+    assert arc.sweep == pytest.approx(sweep)
+
+
+@pytest.mark.parametrize("direction", [1, -1])
+def test_full_circle(direction):
+    line = circle_points(5, 6, 10, 128, sweep=direction * 2.0 * math.pi)
+    line[-1] = line[0]
+    ((_rgba, _width, segments),) = fit_arcs([(None, 0.1, line)])
+    assert segments == [
+        Arc(
+            line[0],
+            line[0],
+            pytest.approx((5, 6)),
+            pytest.approx(direction * 2.0 * math.pi),
+        )
+    ]
+
+
+def test_more_than_full_circle_split():
+    line = circle_points(0, 0, 10, 256, sweep=3.0 * math.pi)
+    ((_rgba, _width, segments),) = fit_arcs([(None, 0.1, line)])
+    assert len(segments) == 2
+    assert all(isinstance(segment, Arc) for segment in segments)
+    assert sum(segment.sweep for segment in segments) == pytest.approx(3.0 * math.pi)
+
+
+def test_s_curve():
+    # Two arcs curving in opposite directions must not be fitted by one arc
+    line = circle_points(0, 0, 10, 32, start=math.pi, sweep=-math.pi)
+    line += circle_points(20, 0, 10, 32, start=math.pi, sweep=math.pi)[1:]
+    ((_rgba, _width, segments),) = fit_arcs([(None, 0.1, line)])
+    assert [segment.sweep for segment in segments] == [
+        pytest.approx(-math.pi),
+        pytest.approx(math.pi),
+    ]
+    assert_within_tolerance(line, segments, 0.05)
+
+
+@pytest.mark.parametrize("tolerance", [0.01, 0.05, 0.2])
+def test_coarse_circle(tolerance):
+    # A coarsely flattened circle can only be approximated by arcs when the
+    # tolerance allows
+    line = circle_points(0, 0, 10, 16)
+    ((_rgba, _width, segments),) = fit_arcs([(None, 0.1, line)], tolerance)
+    assert_within_tolerance(line, segments, tolerance)
+    sagitta = 10 * (1 - math.cos(math.pi / 16))
+    if tolerance < sagitta:
+        assert len(segments) == 16
+    else:
+        assert len(segments) == 1
+
+
+def test_svg_to_outlines():
+    svg = (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="100mm" height="100mm" '
+        'viewBox="0 0 100 100">'
+        '<circle cx="50" cy="50" r="20" stroke="red" fill="none" />'
+        '<rect x="10" y="10" width="80" height="80" rx="5" stroke="red" '
+        'fill="none" />'
+        "</svg>"
+    ).encode("utf-8")
+    outlines = svg_to_outlines(svg, pixels_per_mm=20)
+    fitted = fit_arcs(outlines, tolerance=0.05)
+
+    assert len(fitted) == len(outlines)
+    for (_rgba, _width, line), (_rgba, _width, segments) in zip(outlines, fitted):
+        assert len(segments) < len(line) // 4
+        assert_within_tolerance(line, segments, 0.05)
+
+    # The rounded rectangle: four sides and four corners
+    _rgba, _width, segments = fitted[1]
+    assert len(segments) == 8
+    assert sum(isinstance(segment, Arc) for segment in segments) == 4
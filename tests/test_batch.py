@@ -0,0 +1,79 @@
+import pytest
+
+from io import BytesIO
+
+from xml.etree import ElementTree
+
+from svgoutline.svg_to_outlines import svg_to_outlines
+from svgoutline.batch import svg_to_outlines_batch
+
+
+def make_svg(i):
+    return f"""
+        <svg xmlns="http://www.w3.org/2000/svg" width="{i + 1}cm" height="1cm"
+          viewBox="0 0 2 1">
+            <path style="stroke-width:0.1;stroke:#ff0000" d="M0,0 Q{i % 7},1 2,0"/>
+            <polyline style="stroke-width:0.1;stroke:blue" points="0,0 1,{i} 2,0"/>
+        </svg>
+    """.encode("utf-8")
+
+
+@pytest.fixture
+def svgs():
+    return [make_svg(i) for i in range(10)]
+
+
+@pytest.fixture
+def expected(svgs):
+    return [svg_to_outlines(ElementTree.fromstring(svg)) for svg in svgs]
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 4, 100])
+def test_matches_svg_to_outlines(svgs, expected, prefetch):
+    sources = [BytesIO(svg) for svg in svgs]
+    assert list(svg_to_outlines_batch(sources, prefetch=prefetch)) == expected
+
+
+def test_filenames_and_elements(tmp_path, svgs, expected):
+    sources = []
+    for i, svg in enumerate(svgs):
+        if i % 2:
+            filename = tmp_path / f"{i}.svg"
+            filename.write_bytes(svg)
+            sources.append(str(filename))
+        else:
+            sources.append(ElementTree.fromstring(svg))
+
+    assert list(svg_to_outlines_batch(sources)) == expected
+
+
+def test_explicit_size(svgs):
+    expected = [svg_to_outlines(ElementTree.fromstring(svg), 4, 2, 10) for svg in svgs]
+    sources = [BytesIO(svg) for svg in svgs]
+    assert list(svg_to_outlines_batch(sources, 4, 2, 10)) == expected
+
+
+def test_bounded_prefetch(svgs):
+    consumed = []
+
+    def sources():
+        for svg in svgs:
+            consumed.append(svg)
+            yield BytesIO(svg)
+
+    batch = svg_to_outlines_batch(sources(), prefetch=2)
+    next(batch)
+
+    # The rendered document and two more
+    assert len(consumed) == 3
+
+    batch.close()
+    assert len(consumed) == 3
+
+
+def test_errors(svgs, expected):
+    sources = [BytesIO(svgs[0]), BytesIO(b"<not valid")]
+    batch = svg_to_outlines_batch(sources)
+    assert next(batch) == expected[0]
+    with pytest.raises(ElementTree.ParseError):
+        next(batch)
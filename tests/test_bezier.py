@@ -0,0 +1,104 @@
+import pytest
+
+import math
+
+from svgoutline.bezier import (
+    point_at,
+    split_segment,
+    segment_length,
+    parameter_at_length,
+    cubic_to_quadratic,
+)
+
+
+LINE = ((0, 0), (3, 4))
+QUADRATIC = ((0, 0), (5, 10), (10, 0))
+CUBIC = ((0, 0), (5, 3), (-2, 3), (3, 0))
+
+# Approximately a quarter of a unit circle
+K = 0.5522847498
+QUARTER_CIRCLE = ((1, 0), (1, K), (K, 1), (0, 1))
+
+
+def polyline_length(segment, t=1.0, n=10000):
+    points = [point_at(segment, t * i / n) for i in range(n + 1)]
+    return sum(math.dist(a, b) for a, b in zip(points, points[1:]))
+
+
+@pytest.mark.parametrize(
+    "segment, t, exp",
+    [
+        (LINE, 0.0, (0, 0)),
+        (LINE, 0.5, (1.5, 2)),
+        (LINE, 1.0, (3, 4)),
+        (QUADRATIC, 0.5, (5, 5)),
+        (CUBIC, 0.0, (0, 0)),
+        (CUBIC, 0.5, (1.5, 2.25)),
+        (CUBIC, 1.0, (3, 0)),
+    ],
+)
+def test_point_at(segment, t, exp):
+    assert point_at(segment, t) == pytest.approx(exp)
+
+
+@pytest.mark.parametrize("segment", [LINE, QUADRATIC, CUBIC])
+@pytest.mark.parametrize("t", [0.0, 0.25, 0.5, 1.0])
+def test_split_segment(segment, t):
+    before, after = split_segment(segment, t)
+    assert len(before) == len(after) == len(segment)
+    assert before[0] == segment[0]
+    assert after[-1] == segment[-1]
+    assert before[-1] == after[0] == pytest.approx(point_at(segment, t))
+
+    # The halves trace the same curve
+    for u in [0.0, 0.3, 1.0]:
+        assert point_at(before, u) == pytest.approx(point_at(segment, u * t))
+        assert point_at(after, u) == pytest.approx(
+            point_at(segment, t + (u * (1.0 - t)))
+        )
+
+
+@pytest.mark.parametrize("segment", [LINE, QUADRATIC, CUBIC, QUARTER_CIRCLE])
+@pytest.mark.parametrize("t", [0.0, 0.3, 1.0])
+def test_segment_length(segment, t):
+    assert segment_length(segment, t) == pytest.approx(
+        polyline_length(segment, t), rel=1e-6, abs=1e-9
+    )
+
+
+def test_segment_length_circle():
+    assert segment_length(QUARTER_CIRCLE) == pytest.approx(math.pi / 2, rel=1e-3)
+
+
+@pytest.mark.parametrize("segment", [LINE, QUADRATIC, CUBIC, QUARTER_CIRCLE])
+@pytest.mark.parametrize("fraction", [0.0, 0.1, 0.5, 0.9, 1.0])
+def test_parameter_at_length(segment, fraction):
+    total_length = segment_length(segment)
+    length = total_length * fraction
+    t = parameter_at_length(segment, length)
+    assert segment_length(segment, t) == pytest.approx(length, abs=1e-6)
+    assert parameter_at_length(segment, length, total_length) == t
+
+
+def test_parameter_at_length_out_of_range():
+    assert parameter_at_length(CUBIC, -1) == 0.0
+    assert parameter_at_length(CUBIC, 100) == 1.0
+
+
+def test_cubic_to_quadratic():
+    # Degree-elevated quadratic
+    p0, (qx, qy), p2 = QUADRATIC
+    cubic = (
+        p0,
+        (p0[0] + (2 / 3) * (qx - p0[0]), p0[1] + (2 / 3) * (qy - p0[1])),
+        (p2[0] + (2 / 3) * (qx - p2[0]), p2[1] + (2 / 3) * (qy - p2[1])),
+        p2,
+    )
+    quadratic = cubic_to_quadratic(cubic)
+    assert len(quadratic) == 3
+    assert [v for p in quadratic for v in p] == pytest.approx(
+        [v for p in QUADRATIC for v in p]
+    )
+
+    # True cubic
+    assert cubic_to_quadratic(CUBIC) == CUBIC
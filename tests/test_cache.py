@@ -0,0 +1,180 @@
+import pytest
+
+import io
+import os
+import time
+
+from xml.etree import ElementTree
+
+from svgoutline.svg_to_outlines import svg_to_outlines
+from svgoutline.cache import (
+    OutlineCache,
+    encode_outlines,
+    decode_outlines,
+    STALE_TEMP_AGE,
+)
+
+SVG = b"""
+    <svg xmlns="http://www.w3.org/2000/svg" width="2cm" height="1cm" viewBox="0 0 2 1">
+        <path style="stroke-width:0.1;stroke:#ff0000" d="M0,0 Q1,1 2,0"/>
+        <linearGradient id="g1" x1="0" y1="0" x2="2" y2="1">
+            <stop style="stop-color:red" offset="0"/>
+            <stop style="stop-color:blue" offset="1"/>
+        </linearGradient>
+        <path style="stroke-width:0.1;stroke:url(#g1)" d="M0,0 L2,1"/>
+    </svg>
+"""
+
+
+class UnseekableFile(io.RawIOBase):
+    def __init__(self, data):
+        self._file = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        return self._file.readinto(b)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return OutlineCache(str(tmp_path / "cache"))
+
+
+def test_encode_decode():
+    outlines = svg_to_outlines(ElementTree.fromstring(SVG))
+    assert outlines[0][0] is not None
+    assert outlines[1][0] is None
+    assert decode_outlines(encode_outlines(outlines)) == outlines
+    assert decode_outlines(encode_outlines([])) == []
+
+
+@pytest.mark.parametrize(
+    "data", [b"", b"nonsense", encode_outlines([(None, 1.0, [(1.0, 2.0)])])[:-1]]
+)
+def test_decode_invalid(data):
+    with pytest.raises(ValueError):
+        decode_outlines(data)
+
+
+def test_key(cache, tmp_path):
+    key, _ = cache.make_key(SVG)
+
+    # Same key for any form of the same data
+    filename = tmp_path / "test.svg"
+    filename.write_bytes(SVG)
+    assert cache.make_key(str(filename))[0] == key
+    with open(filename, "rb") as f:
+        assert cache.make_key(f) == (key, f)
+        assert f.read() == SVG
+
+    # Unseekable files are read and replaced
+    new_key, source = cache.make_key(UnseekableFile(SVG))
+    assert new_key == key
+    assert source.read() == SVG
+
+    # Parameters and content affect the key
+    assert cache.make_key(SVG, pixels_per_mm=10)[0] != key
+    assert cache.make_key(SVG, 20, 10)[0] != key
+    assert cache.make_key(SVG, clip=True)[0] != key
+    assert cache.make_key(SVG, occlusion=True)[0] != key
+    assert cache.make_key(SVG, cache_instances=True)[0] != key
+    assert cache.make_key(SVG, cache_glyphs=True)[0] != key
+    assert cache.make_key(SVG + b" ")[0] != key
+
+
+def test_svg_to_outlines(cache):
+    expected = svg_to_outlines(ElementTree.fromstring(SVG))
+
+    assert svg_to_outlines(SVG, cache=cache) == expected
+    assert len(os.listdir(cache.directory)) == 1
+
+    # Served from the cache (NB: change the entry to prove it)
+    key, _ = cache.make_key(SVG)
+    cache.put(key, [])
+    assert svg_to_outlines(SVG, cache=cache) == []
+
+    # Different parameters are cached separately
+    assert svg_to_outlines(SVG, pixels_per_mm=10, cache=cache) != []
+    assert len(os.listdir(cache.directory)) == 2
+    assert svg_to_outlines(SVG, clip=(0, 0, 1, 1), cache=cache) != []
+    assert len(os.listdir(cache.directory)) == 3
+
+
+def test_element_input(cache):
+    root = ElementTree.fromstring(SVG)
+    expected = svg_to_outlines(root)
+    assert svg_to_outlines(root, cache=cache) == expected
+    assert svg_to_outlines(root, cache=cache) == expected
+    assert len(os.listdir(cache.directory)) == 1
+
+
+def test_corrupt_entry(cache):
+    key, _ = cache.make_key(SVG)
+    with open(os.path.join(cache.directory, key + ".outlines"), "wb") as f:
+        f.write(b"corrupt")
+    assert cache.get(key) is None
+    assert svg_to_outlines(SVG, cache=cache) != []
+    assert cache.get(key) is not None
+
+
+def test_lru_eviction(cache):
+    entry_size = len(encode_outlines([(None, 1.0, [(0.0, 0.0)])]))
+    cache.max_bytes = entry_size * 3
+
+    for key in "abcd":
+        cache.put(key, [(None, 1.0, [(0.0, 0.0)])])
+        # Ensure modification times are distinct
+        os.utime(
+            os.path.join(cache.directory, key + ".outlines"),
+            (ord(key), ord(key)),
+        )
+
+    # Oldest removed on next put
+    cache.put("e", [(None, 1.0, [(0.0, 0.0)])])
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+
+    # Reading an entry marks it as recently used
+    assert cache.get("c") is not None
+    cache.put("f", [(None, 1.0, [(0.0, 0.0)])])
+    assert cache.get("c") is not None
+    assert cache.get("d") is None
+
+    assert sorted(os.listdir(cache.directory)) == [
+        "c.outlines",
+        "e.outlines",
+        "f.outlines",
+    ]
+
+
+@pytest.mark.parametrize("option", ["cache_instances", "cache_glyphs"])
+def test_svg_to_outlines_flatten_cache_options(cache, option):
+    # Entries produced with and without the flatten caches are kept apart
+    svg_to_outlines(SVG, cache=cache)
+    svg_to_outlines(SVG, cache=cache, **{option: True})
+    assert len(os.listdir(cache.directory)) == 2
+
+
+def test_stale_temp_files_evicted(cache):
+    stale = os.path.join(cache.directory, "stale.tmp")
+    fresh = os.path.join(cache.directory, "fresh.tmp")
+    for filename in [stale, fresh]:
+        with open(filename, "wb") as f:
+            f.write(b"x" * 100)
+    old = time.time() - STALE_TEMP_AGE - 10
+    os.utime(stale, (old, old))
+
+    # Fresh temporary files (i.e. entries being written) count towards the
+    # size of the cache
+    cache.max_bytes = 150
+    cache.put("a", [(None, 1.0, [(0.0, 0.0)])] * 10)
+    assert sorted(os.listdir(cache.directory)) == ["fresh.tmp"]
+
+
+def test_clear(cache):
+    cache.put("a", [])
+    cache.clear()
+    assert cache.get("a") is None
+    assert os.listdir(cache.directory) == []
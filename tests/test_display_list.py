@@ -0,0 +1,220 @@
+import pytest
+
+import os
+
+from svgoutline.svg_to_outlines import svg_to_outlines
+from svgoutline.display_list import (
+    capture_display_list,
+    DisplayList,
+    svg_to_outlines_levels,
+)
+
+SAMPLES_DIR = os.path.join(os.path.dirname(__file__), "..", "samples")
+
+SVG = b"""
+    <svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"
+         width="40mm" height="20mm" viewBox="0 0 20 10">
+        <defs>
+            <circle id="c" r="1" stroke="blue" stroke-width="0.1" fill="none"/>
+        </defs>
+        <path style="stroke-width:0.1;stroke:#ff0000;stroke-dasharray:0.5 0.2"
+              d="M0,0 Q5,10 10,0" fill="none"/>
+        <g transform="rotate(10) scale(1.5 0.8)" opacity="0.5">
+            <ellipse cx="8" cy="5" rx="4" ry="2" stroke="green" stroke-width="0.1"
+                     fill="none"/>
+        </g>
+        <use xlink:href="#c" x="14" y="3"/>
+        <use xlink:href="#c" x="17" y="3"/>
+        <rect x="13" y="1" width="6" height="6" fill="black"/>
+        <text x="1" y="9" font-size="2" stroke="black" stroke-width="0.05"
+              fill="none">Hello</text>
+    </svg>
+"""
+
+
+def assert_outlines_equal(a, b):
+    # NB: The transforms applied to each path are composed in a different
+    # order to QSvg and so may differ in the least significant digits
+    assert len(a) == len(b)
+    for (rgba_a, width_a, line_a), (rgba_b, width_b, line_b) in zip(a, b):
+        assert rgba_a == rgba_b
+        assert width_a == pytest.approx(width_b, rel=1e-9)
+        assert len(line_a) == len(line_b)
+        for point_a, point_b in zip(line_a, line_b):
+            assert point_a == pytest.approx(point_b, abs=1e-9)
+
+
+@pytest.mark.parametrize("pixels_per_mm", [0.5, 1.0, 5.0, 20.0])
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"cache_instances": True, "cache_glyphs": True},
+        {"occlusion": True},
+        {"curves": True},
+    ],
+)
+def test_matches_svg_to_outlines(pixels_per_mm, kwargs):
+    display_list = capture_display_list(SVG, occlusion=True)
+    assert display_list.render(pixels_per_mm, **kwargs) == svg_to_outlines(
+        SVG, pixels_per_mm=pixels_per_mm, **kwargs
+    )
+
+
+# NB: The page sizes of these samples are not a whole number of pixels at
+# most resolutions
+@pytest.mark.parametrize(
+    "filename",
+    [
+        "arrow.svg",
+        "basic_sample_input.svg",
+        "colours_sample_input.svg",
+        "outline_only_sample_input.svg",
+    ],
+)
+@pytest.mark.parametrize("pixels_per_mm", [0.5, 1.0, 7.3, 20.0])
+def test_matches_svg_to_outlines_samples(filename, pixels_per_mm):
+    filename = os.path.join(SAMPLES_DIR, filename)
+    assert_outlines_equal(
+        capture_display_list(filename).render(pixels_per_mm),
+        svg_to_outlines(filename, pixels_per_mm=pixels_per_mm),
+    )
+
+
+def test_render_repeatedly():
+    display_list = capture_display_list(SVG)
+    preview = display_list.render(1.0)
+    outlines = display_list.render(20.0)
+    assert display_list.render(1.0) == preview
+    assert sum(len(line) for _rgba, _width, line in outlines) > sum(
+        len(line) for _rgba, _width, line in preview
+    )
+
+
+def test_page_size():
+    display_list = capture_display_list(SVG, 80, 40)
+    assert (display_list.width_mm, display_list.height_mm) == (80, 40)
+    assert display_list.render() == svg_to_outlines(SVG, 80, 40)
+
+
+def test_items():
+    display_list = capture_display_list(SVG)
+
+    # Filled-only elements are omitted (by default)
+    assert len(display_list) == 5
+    assert not display_list.occlusion
+
+    # Transforms map into view box coordinates
+    assert display_list.view_box == (0, 0, 20, 10)
+    assert not display_list.keep_aspect_ratio
+    path_data, pen, brush, transform, opacity = display_list.items[0]
+    assert transform.isIdentity()
+    assert pen.widthF() == pytest.approx(0.1)
+    assert pen.dashPattern() == pytest.approx([5.0, 2.0])
+    assert opacity == 1.0
+
+    _path_data, _pen, _brush, _transform, opacity = display_list.items[1]
+    assert opacity == 0.5
+
+    # Paths drawn repeatedly are stored once
+    c1 = display_list.items[2]
+    c2 = display_list.items[3]
+    assert c1[0] is c2[0]
+    assert c1[3].dx() != c2[3].dx()
+
+
+def test_occlusion():
+    display_list = capture_display_list(SVG, occlusion=True)
+    assert len(display_list) == 6
+    assert display_list.occlusion
+
+    # Filled-only elements were not captured
+    with pytest.raises(ValueError):
+        capture_display_list(SVG).render(occlusion=True)
+
+
+def test_empty():
+    display_list = DisplayList(10, 10, (0, 0, 10, 10), False, [])
+    assert len(display_list) == 0
+    assert display_list.render() == []
+
+
+def test_render_levels():
+    display_list = capture_display_list(SVG)
+    levels = list(display_list.render_levels([20.0, 1.0, 5.0]))
+
+    # Coarsest first
+    assert [pixels_per_mm for pixels_per_mm, _outlines in levels] == [
+        1.0,
+        5.0,
+        20.0,
+    ]
+    for pixels_per_mm, outlines in levels:
+        assert_outlines_equal(
+            outlines, svg_to_outlines(SVG, pixels_per_mm=pixels_per_mm)
+        )
+
+    # Metadata is shared between levels
+    styles = {
+        (id(rgba), id(width))
+        for _ppmm, outlines in levels
+        for rgba, width, _line in outlines
+    }
+    assert len(styles) == len(
+        {(rgba, round(width, 9)) for rgba, width, _line in levels[0][1]}
+    )
+
+
+@pytest.mark.parametrize(
+    "filename", ["basic_sample_input.svg", "colours_sample_input.svg"]
+)
+def test_render_levels_samples(filename):
+    filename = os.path.join(SAMPLES_DIR, filename)
+    levels = list(capture_display_list(filename).render_levels([0.5, 7.3, 20.0]))
+    for pixels_per_mm, outlines in levels:
+        assert_outlines_equal(
+            outlines, svg_to_outlines(filename, pixels_per_mm=pixels_per_mm)
+        )
+
+    # Colours are shared between levels
+    assert len(
+        {id(rgba) for _ppmm, outlines in levels for rgba, _width, _line in outlines}
+    ) == len({rgba for rgba, _width, _line in levels[0][1]})
+
+
+def test_render_levels_lazy():
+    display_list = capture_display_list(SVG)
+    levels = display_list.render_levels([1.0, 5.0])
+    pixels_per_mm, _outlines = next(levels)
+    assert pixels_per_mm == 1.0
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"width_mm": 80, "height_mm": 40},
+        {"cache_instances": True, "cache_glyphs": True},
+        {"occlusion": True},
+        {"clip": True},
+        {"clip": (0, 0, 20, 10)},
+    ],
+)
+def test_svg_to_outlines_levels(kwargs):
+    levels = list(svg_to_outlines_levels(SVG, levels=(2.0, 0.5), **kwargs))
+    assert [pixels_per_mm for pixels_per_mm, _outlines in levels] == [0.5, 2.0]
+    for pixels_per_mm, outlines in levels:
+        assert_outlines_equal(
+            outlines, svg_to_outlines(SVG, pixels_per_mm=pixels_per_mm, **kwargs)
+        )
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"clip": True}, {"occlusion": True}])
+def test_svg_to_outlines_levels_sample(kwargs):
+    filename = os.path.join(SAMPLES_DIR, "outline_only_sample_input.svg")
+    levels = list(svg_to_outlines_levels(filename, **kwargs))
+    assert [pixels_per_mm for pixels_per_mm, _outlines in levels] == [1.0, 5.0, 20.0]
+    for pixels_per_mm, outlines in levels:
+        assert_outlines_equal(
+            outlines, svg_to_outlines(filename, pixels_per_mm=pixels_per_mm, **kwargs)
+        )
@@ -0,0 +1,293 @@
+import pytest
+
+import io
+import gzip
+import time
+import mmap
+import asyncio
+import threading
+
+from xml.etree import ElementTree
+
+from svgoutline.svg_to_outlines import svg_to_outlines
+from svgoutline.executor import OutlineExecutor, svg_to_outlines_async, _acquire
+
+SVG = b"""
+    <svg xmlns="http://www.w3.org/2000/svg" width="2cm" height="1cm" viewBox="0 0 2 1">
+        <path style="stroke-width:0.1;stroke:#ff0000" d="M0,0 L2,1"/>
+    </svg>
+"""
+
+
+@pytest.fixture
+def svg():
+    return ElementTree.fromstring(SVG)
+
+
+@pytest.fixture
+def slow_svg():
+    # An SVG which takes many seconds to render (due to the very fine dash
+    # pattern)
+    paths = """
+        <path
+          style="stroke-width:0.1;stroke:black;stroke-dasharray:0.0001,0.0001"
+          d="M0,0 Q1,1 2,0"
+        />
+    """
+    return ElementTree.fromstring(f"""
+        <svg xmlns="http://www.w3.org/2000/svg" width="2cm" height="1cm" viewBox="0 0 2 1">
+            {paths * 100}
+        </svg>
+    """)
+
+
+def test_matches_svg_to_outlines(svg):
+    async def main():
+        async with OutlineExecutor(max_workers=2) as executor:
+            return await asyncio.gather(
+                executor.svg_to_outlines(svg),
+                executor.svg_to_outlines(SVG, pixels_per_mm=10),
+                svg_to_outlines_async(svg, 40, 20, executor=executor),
+            )
+
+    assert asyncio.run(main()) == [
+        svg_to_outlines(svg),
+        svg_to_outlines(svg, pixels_per_mm=10),
+        svg_to_outlines(svg, 40, 20),
+    ]
+
+
+def map_file(path):
+    with open(path, "rb") as file:
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+@pytest.mark.parametrize(
+    "make_source",
+    [
+        lambda path: ElementTree.parse(path),
+        lambda path: ElementTree.parse(path).getroot(),
+        lambda path: str(path),
+        lambda path: path,
+        lambda path: path.read_bytes(),
+        lambda path: gzip.compress(path.read_bytes()),
+        lambda path: bytearray(path.read_bytes()),
+        lambda path: io.BytesIO(path.read_bytes()),
+        lambda path: open(path, "rb"),
+        lambda path: map_file(path),
+    ],
+)
+def test_input_forms(tmp_path, make_source):
+    path = tmp_path / "test.svg"
+    path.write_bytes(SVG)
+    source = make_source(path)
+
+    async def main():
+        async with OutlineExecutor(max_workers=1) as executor:
+            return await executor.svg_to_outlines(source)
+
+    try:
+        assert asyncio.run(main()) == svg_to_outlines(SVG)
+    finally:
+        if hasattr(source, "close"):
+            source.close()
+
+
+def test_exceptions_propagated():
+    async def main():
+        async with OutlineExecutor(max_workers=1) as executor:
+            # Missing width/height
+            with pytest.raises(ValueError):
+                await executor.svg_to_outlines(
+                    ElementTree.fromstring('<svg xmlns="http://www.w3.org/2000/svg"/>')
+                )
+
+            # Worker should still be usable (and not have been replaced)
+            (worker,) = executor._workers
+            assert await executor.svg_to_outlines(SVG) == [
+                ((1, 0, 0, 1), 1, [(0, 0), (20, 10)]),
+            ]
+            assert executor._workers == {worker}
+
+    asyncio.run(main())
+
+
+def test_timeout_kills_worker(svg, slow_svg):
+    async def main():
+        async with OutlineExecutor(max_workers=1) as executor:
+            # Warm the worker up
+            await executor.svg_to_outlines(svg)
+            (worker,) = executor._workers
+
+            with pytest.raises(asyncio.TimeoutError):
+                await executor.svg_to_outlines(slow_svg, timeout=0.5)
+
+            # Worker should have been killed and a new one used for the next
+            # job
+            assert not worker._process.is_alive()
+            assert await executor.svg_to_outlines(svg) == svg_to_outlines(svg)
+            assert worker not in executor._workers
+
+    asyncio.run(main())
+
+
+def test_cancellation_kills_worker(svg, slow_svg):
+    async def main():
+        async with OutlineExecutor(max_workers=1) as executor:
+            task = asyncio.create_task(executor.svg_to_outlines(slow_svg))
+            await asyncio.sleep(0.5)
+            (worker,) = executor._workers
+
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+            assert not worker._process.is_alive()
+            assert not executor._workers
+            assert await executor.svg_to_outlines(svg) == svg_to_outlines(svg)
+
+    asyncio.run(main())
+
+
+def test_kill_does_not_block_event_loop(svg, slow_svg, monkeypatch):
+    from svgoutline.executor import _Worker
+
+    # Make killing a worker (very) slow
+    kill = _Worker.kill
+
+    def slow_kill(self):
+        time.sleep(1.0)
+        kill(self)
+
+    monkeypatch.setattr(_Worker, "kill", slow_kill)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.05)
+                ticks += 1
+
+        async with OutlineExecutor(max_workers=1) as executor:
+            await executor.svg_to_outlines(svg)
+            ticker_task = asyncio.create_task(ticker())
+            with pytest.raises(asyncio.TimeoutError):
+                await executor.svg_to_outlines(slow_svg, timeout=0.1)
+            ticker_task.cancel()
+
+        # The event loop kept running while the worker was killed
+        return ticks
+
+    assert asyncio.run(main()) >= 10
+
+
+def test_read_timeout_does_not_starve_workers(svg):
+    unblock = threading.Event()
+
+    class BlockedFile(object):
+        def read(self, size=-1):
+            unblock.wait()
+            return b""
+
+    async def main():
+        async with OutlineExecutor(max_workers=1) as executor:
+            with pytest.raises(asyncio.TimeoutError):
+                await executor.svg_to_outlines(BlockedFile(), timeout=0.1)
+
+            # The read is still blocked but workers remain usable
+            return await executor.svg_to_outlines(svg, timeout=30)
+
+    try:
+        assert asyncio.run(main()) == svg_to_outlines(svg)
+    finally:
+        unblock.set()
+
+
+@pytest.mark.parametrize("delay", range(6))
+@pytest.mark.parametrize("timeout", [None, 10])
+def test_acquire_cancelled(delay, timeout):
+    # Whenever the caller is cancelled, the semaphore must either be acquired
+    # (and the call complete) or left as it was
+    async def main():
+        semaphore = asyncio.Semaphore(1)
+        await semaphore.acquire()
+
+        task = asyncio.create_task(_acquire(semaphore, timeout))
+        await asyncio.sleep(0)
+        semaphore.release()
+        for _ in range(delay):
+            await asyncio.sleep(0)
+        task.cancel()
+
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        else:
+            semaphore.release()
+
+        # Let any cancelled acquisition finish
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert not semaphore.locked()
+
+    asyncio.run(main())
+
+
+def test_acquire_timeout():
+    async def main():
+        semaphore = asyncio.Semaphore(1)
+        await semaphore.acquire()
+        with pytest.raises(asyncio.TimeoutError):
+            await _acquire(semaphore, 0.01)
+        semaphore.release()
+
+        await _acquire(semaphore, 0.01)
+        assert semaphore.locked()
+
+    asyncio.run(main())
+
+
+def test_successive_event_loops(svg):
+    async def main(executor):
+        # NB: More jobs than workers so that the executor's semaphore is
+        # contended (and so bound to the running event loop)
+        return await asyncio.gather(
+            *(svg_to_outlines_async(svg, executor=executor) for _ in range(3))
+        )
+
+    expected = [svg_to_outlines(svg)] * 3
+
+    executor = OutlineExecutor(max_workers=1)
+    try:
+        assert asyncio.run(main(executor)) == expected
+        assert asyncio.run(main(executor)) == expected
+    finally:
+        executor.close()
+
+    # The default executor
+    assert asyncio.run(main(None)) == expected
+    assert asyncio.run(main(None)) == expected
+
+
+@pytest.mark.parametrize("max_queue", [0, 1])
+def test_queue_limit(svg, max_queue):
+    async def main():
+        async with OutlineExecutor(max_workers=1, max_queue=max_queue) as executor:
+            tasks = [
+                asyncio.create_task(executor.svg_to_outlines(svg))
+                for _ in range(max_queue + 1)
+            ]
+            await asyncio.sleep(0)
+
+            # Worker busy and queue full
+            with pytest.raises(asyncio.QueueFull):
+                await executor.svg_to_outlines(svg)
+
+            # Queued jobs still complete
+            for result in await asyncio.gather(*tasks):
+                assert result == svg_to_outlines(svg)
+
+    asyncio.run(main())
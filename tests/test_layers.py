@@ -0,0 +1,78 @@
+import pytest
+
+from xml.etree import ElementTree
+
+from svgoutline.svg_to_outlines import svg_to_outlines
+from svgoutline.svg_utils import get_inkscape_layers
+from svgoutline.layers import svg_to_layer_outlines
+
+
+SVG = """
+    <svg
+      xmlns="http://www.w3.org/2000/svg"
+      xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape"
+      width="2cm" height="1cm" viewBox="1 0 2 1"
+    >
+        <g style="stroke:#ff0000" transform="translate(1, 0)">
+            <g inkscape:groupmode="layer" inkscape:label="cut" id="l1">
+                <path style="stroke-width:0.1" d="M0,0 L2,1"/>
+                <g inkscape:groupmode="layer" inkscape:label="sublayer" id="l2">
+                    <path style="stroke-width:0.1" d="M0,0.5 L2,0.5"/>
+                </g>
+            </g>
+        </g>
+        <g inkscape:groupmode="layer" inkscape:label="score" transform="scale(2)">
+            <path style="stroke-width:0.1;stroke:#00ff00" d="M0,0 Q1,1 2,0"/>
+        </g>
+        <g
+          inkscape:groupmode="layer" inkscape:label="hidden" id="l3"
+          style="display:none"
+        >
+            <path style="stroke-width:0.1;stroke:#00ff00" d="M0,0 L2,1"/>
+        </g>
+        <g inkscape:groupmode="layer" inkscape:label="cut" id="l4">
+            <path style="stroke-width:0.1;stroke:#0000ff" d="M1,0 L1,1"/>
+        </g>
+        <g inkscape:groupmode="layer" id="l5">
+            <path style="stroke-width:0.1;stroke:#0000ff" d="M2,0 L1,1"/>
+        </g>
+    </svg>
+"""
+
+
+def test_get_inkscape_layers():
+    svg = ElementTree.fromstring(SVG)
+    assert [layer.get("id") for layer in get_inkscape_layers(svg)] == [
+        "l1",
+        None,
+        "l3",
+        "l4",
+        "l5",
+    ]
+
+
+@pytest.mark.parametrize("processes", [None, 2])
+def test_svg_to_layer_outlines(processes):
+    svg = ElementTree.fromstring(SVG)
+    layers = svg_to_layer_outlines(svg, processes=processes)
+
+    # Original unchanged (despite unnamed layer)
+    assert ElementTree.tostring(svg) == ElementTree.tostring(ElementTree.fromstring(SVG))
+
+    assert list(layers) == ["cut", "score", "hidden", "l5"]
+    assert layers["hidden"] == []
+
+    # Result should match rendering the full document
+    full = svg_to_outlines(svg)
+    assert len(full) == 5
+    assert layers["cut"] == full[0:2] + full[3:4]
+    assert layers["score"] == full[2:3]
+    assert layers["l5"] == full[4:5]
+
+
+def test_explicit_size():
+    svg = ElementTree.fromstring(SVG)
+    layers = svg_to_layer_outlines(svg, 40, 20, 10)
+    full = svg_to_outlines(svg, 40, 20, 10)
+    assert layers["cut"][0] == full[0]
+    assert layers["score"] == full[2:3]
@@ -0,0 +1,100 @@
+import pytest
+
+from svgoutline.occlusion import remove_occluded
+
+
+RED = (1.0, 0.0, 0.0, 1.0)
+
+SQUARE = [(0, 0), (10, 0), (10, 10), (0, 10)]
+
+SQUARE_WITH_HOLE = [SQUARE, [(2, 2), (8, 2), (8, 8), (2, 8)]]
+
+
+def rounded(outlines):
+    return [
+        (rgba, width, [(round(x, 6), round(y, 6)) for x, y in line])
+        for rgba, width, line in outlines
+    ]
+
+
+def test_no_fills():
+    outlines = [(RED, 1.0, [(0, 0), (1, 1)])]
+    assert remove_occluded(outlines, []) == outlines
+    assert remove_occluded([], [(0, [SQUARE])]) == []
+
+
+@pytest.mark.parametrize(
+    "fill, exp_lines",
+    [
+        # Not overlapping
+        ([[(20, 20), (30, 20), (30, 30)]], [[(-5, 5), (15, 5)]]),
+        # Overlapping
+        ([SQUARE], [[(-5, 5), (0, 5)], [(10, 5), (15, 5)]]),
+        # Holes
+        (
+            SQUARE_WITH_HOLE,
+            [[(-5, 5), (0, 5)], [(2, 5), (8, 5)], [(10, 5), (15, 5)]],
+        ),
+        # Degenerate
+        ([], [[(-5, 5), (15, 5)]]),
+        ([[(0, 0), (10, 0)]], [[(-5, 5), (15, 5)]]),
+    ],
+)
+def test_remove_occluded(fill, exp_lines):
+    assert rounded(remove_occluded([(RED, 1.0, [(-5, 5), (15, 5)])], [(1, fill)])) == [
+        (RED, 1.0, line) for line in exp_lines
+    ]
+
+
+def test_remove_occluded_order():
+    outlines = [
+        (RED, 1.0, [(-5, 5), (15, 5)]),
+        (None, 2.0, [(-5, 6), (15, 6)]),
+        (RED, 3.0, [(-5, 7), (15, 7)]),
+    ]
+    # Only outlines drawn before a fill are hidden by it
+    assert rounded(remove_occluded(outlines, [(2, [SQUARE])])) == [
+        (RED, 1.0, [(-5, 5), (0, 5)]),
+        (RED, 1.0, [(10, 5), (15, 5)]),
+        (None, 2.0, [(-5, 6), (0, 6)]),
+        (None, 2.0, [(10, 6), (15, 6)]),
+        (RED, 3.0, [(-5, 7), (15, 7)]),
+    ]
+
+
+def test_remove_occluded_completely():
+    outlines = [
+        (RED, 1.0, [(1, 1), (9, 9)]),
+        (RED, 1.0, [(1, 1), (9, 1), (9, 9), (1, 9), (1, 1)]),
+        (RED, 1.0, [(5, 5)]),
+    ]
+    assert remove_occluded(outlines, [(3, [SQUARE])]) == []
+
+
+def test_remove_occluded_several_fills():
+    # Line passing through several (overlapping) fills
+    assert rounded(
+        remove_occluded(
+            [(RED, 1.0, [(-5, 5), (35, 5)])],
+            [
+                (1, [SQUARE]),
+                (1, [[(x + 5, y) for x, y in SQUARE]]),
+                (1, [[(x + 20, y) for x, y in SQUARE]]),
+            ],
+        )
+    ) == [
+        (RED, 1.0, [(-5, 5), (0, 5)]),
+        (RED, 1.0, [(15, 5), (20, 5)]),
+        (RED, 1.0, [(30, 5), (35, 5)]),
+    ]
+
+
+def test_remove_occluded_keeps_direction_and_joins():
+    # A closed outline split by a fill is rejoined at its start/end and keeps
+    # its direction
+    assert rounded(
+        remove_occluded(
+            [(RED, 1.0, [(0, 0), (10, 0), (10, 10), (0, 10), (0, 0)])],
+            [(1, [[(5, 5), (15, 5), (15, 15), (5, 15)]])],
+        )
+    ) == [(RED, 1.0, [(5, 10), (0, 10), (0, 0), (10, 0), (10, 5)])]
@@ -1,10 +1,21 @@
 import pytest
 
+from shapely.geometry import LineString
+
+from svgoutline.qt_bootstrap import ensure_qt_application
+from svgoutline import outline_painter
 from svgoutline.outline_painter import (
     split_line,
     dash_line,
+    dash_segments,
+    path_key,
+    split_path_data,
+    path_segments,
+    path_from_data,
+    shape_key,
     OutlinePaintDevice,
 )
+from svgoutline.bezier import point_at
 
 from PySide6.QtGui import QPainter
 from PySide6.QtGui import QPainterPath
@@ -12,14 +23,14 @@ from PySide6.QtGui import QFont
 from PySide6.QtGui import QColor
 from PySide6.QtGui import QPen
 from PySide6.QtGui import QBrush
-from PySide6.QtGui import QGuiApplication
+from PySide6.QtGui import QTransform
 
 from PySide6.QtCore import Qt
 
 
 @pytest.fixture(scope="module")
 def app():
-    return QGuiApplication()
+    return ensure_qt_application().application
 
 
 class TestSplitLine(object):
@@ -180,6 +191,80 @@ class TestDashLine(object):
         ]
 
 
+class TestDashSegments(object):
+    @pytest.mark.parametrize("dash_pattern", [[], [1, 1]])
+    def test_empty(self, dash_pattern):
+        assert dash_segments([], dash_pattern) == [[]]
+
+    def test_solid(self):
+        segments = [((0, 0), (1, 0)), ((1, 0), (2, 1), (3, 0))]
+        assert dash_segments(segments, []) == [segments]
+
+    def test_lines(self):
+        # Should match dash_line
+        segments = [((0, 0), (4, 0)), ((4, 0), (4, 4))]
+        assert dash_segments(segments, [2, 1]) == [
+            [((0, 0), (2, 0))],
+            [((3, 0), (4, 0)), ((4, 0), (4, 1))],
+            [((4, 2), (4, 4))],
+        ]
+        assert dash_segments(segments, [2, 3], 1) == [
+            [((0, 0), (1, 0))],
+            [((4, 0), (4, 2))],
+        ]
+
+    def test_dash_ends_on_segment_boundary(self):
+        # No zero-length segments should be produced
+        segments = [((0, 0), (2, 0)), ((2, 0), (4, 0)), ((4, 0), (6, 0))]
+        assert dash_segments(segments, [2, 2]) == [
+            [((0, 0), (2, 0))],
+            [((4, 0), (6, 0))],
+        ]
+
+    def test_curve(self):
+        # A quadratic curve approximating a straight line with non-uniform
+        # speed (so parameter and length are not proportional)
+        segment = ((0, 0), (1, 0), (10, 0))
+        dashes = dash_segments([segment], [2, 3])
+        assert len(dashes) == 2
+        assert [len(dash) for dash in dashes] == [1, 1]
+        assert [len(dash[0]) for dash in dashes] == [3, 3]
+
+        starts = [point_at(dash[0], 0) for dash in dashes]
+        ends = [point_at(dash[0], 1) for dash in dashes]
+        assert [x for x, _y in starts] == pytest.approx([0, 5])
+        assert [x for x, _y in ends] == pytest.approx([2, 7])
+
+
+class TestPathSegments(object):
+    def test_empty(self, app):
+        assert path_segments(path_key(QPainterPath())) == []
+
+    def test_segments(self, app):
+        path = QPainterPath()
+        path.moveTo(10, 20)
+        path.lineTo(11, 22)
+        path.quadTo(12, 30, 14, 24)
+        path.cubicTo(12, 20, 13, 21, 14, 20)
+        path.moveTo(100, 200)
+        path.lineTo(101, 202)
+        path.closeSubpath()
+        # Empty subpath
+        path.moveTo(0, 0)
+
+        assert path_segments(path_key(path)) == [
+            [
+                ((10, 20), (11, 22)),
+                ((11, 22), (12, 30), (14, 24)),
+                ((14, 24), (12, 20), (13, 21), (14, 20)),
+            ],
+            [
+                ((100, 200), (101, 202)),
+                ((101, 202), (100, 200)),
+            ],
+        ]
+
+
 class TestOutlinePaintDevice(object):
     @pytest.fixture
     def width(self):
@@ -454,3 +539,362 @@ class TestOutlinePaintDevice(object):
 
         lines = opd.getOutlines()
         assert len(lines) == 1
+
+
+class TestInstanceCache(object):
+    def draw(self, app, cache_instances):
+        opd = OutlinePaintDevice(100, 200, 10, cache_instances)
+        p = QPainter(opd)
+        try:
+            pen = QPen()
+            pen.setDashPattern([2, 1])
+            pen.setWidthF(0.5)
+            p.setPen(pen)
+
+            path = QPainterPath()
+            path.moveTo(0, 0)
+            path.cubicTo(10, 20, 30, 20, 40, 0)
+
+            # Translated instances
+            for i in range(5):
+                p.save()
+                p.translate(i * 7.5, i * 3.25)
+                p.scale(2, 2)
+                p.drawPath(path)
+                p.restore()
+
+            # Rotated instance
+            p.rotate(30)
+            p.drawPath(path)
+
+            # Different pen
+            pen.setDashPattern([3, 1])
+            p.setPen(pen)
+            p.drawPath(path)
+        finally:
+            p.end()
+
+        return opd
+
+    def test_matches_uncached(self, app):
+        expected = self.draw(app, False).getOutlines()
+        opd = self.draw(app, True)
+        actual = opd.getOutlines()
+
+        assert len(actual) == len(expected)
+        for (rgba_a, width_a, line_a), (rgba_e, width_e, line_e) in zip(
+            actual, expected
+        ):
+            assert rgba_a == rgba_e
+            assert width_a == pytest.approx(width_e)
+            assert [v for p in line_a for v in p] == pytest.approx(
+                [v for p in line_e for v in p], abs=1e-9
+            )
+
+        # One entry for the translated instances, one for the rotated
+        # instance and one for the different pen.
+        assert len(opd.paintEngine()._instance_cache) == 3
+
+    def test_rotated_and_reflected(self, app):
+        def draw(cache_instances):
+            opd = OutlinePaintDevice(100, 200, 10, cache_instances)
+            p = QPainter(opd)
+            try:
+                pen = QPen()
+                pen.setDashPattern([2, 1])
+                pen.setWidthF(0.5)
+                p.setPen(pen)
+
+                path = QPainterPath()
+                path.moveTo(0, 0)
+                path.cubicTo(10, 20, 30, 20, 40, 0)
+
+                for angle in range(0, 360, 45):
+                    for sx in [1, -1]:
+                        p.save()
+                        p.translate(50, 50)
+                        p.rotate(angle)
+                        p.scale(sx * 1.5, 0.75)
+                        p.drawPath(path)
+                        p.restore()
+            finally:
+                p.end()
+            return opd
+
+        # NB: Instances drawn in a different orientation are approximated
+        # within the flattening accuracy (here, 1 pixel = 0.1mm) rather than
+        # exactly
+        expected = draw(False).getOutlines()
+        opd = draw(True)
+        actual = opd.getOutlines()
+
+        assert len(actual) == len(expected)
+        for (rgba_a, width_a, line_a), (rgba_e, width_e, line_e) in zip(
+            actual, expected
+        ):
+            assert rgba_a == rgba_e
+            assert width_a == pytest.approx(width_e)
+            assert LineString(line_a).hausdorff_distance(
+                LineString(line_e)
+            ) == pytest.approx(0, abs=0.1)
+
+        # All instances are congruent
+        assert len(opd.paintEngine()._instance_cache) == 1
+
+
+@pytest.mark.parametrize(
+    "a, b, exp_equal",
+    [
+        # Translation is ignored
+        (QTransform(), QTransform().translate(10, 20), True),
+        # Rotation and reflection are ignored
+        (QTransform().scale(2, 3), QTransform().rotate(30).scale(2, 3), True),
+        (QTransform().scale(2, 3), QTransform().rotate(200).scale(2, 3), True),
+        (QTransform().scale(2, 3), QTransform().scale(-2, 3), True),
+        (QTransform().scale(2, 3), QTransform().rotate(30).scale(2, -3), True),
+        (
+            QTransform().shear(0.5, 0),
+            QTransform().rotate(-70).shear(0.5, 0).translate(1, 2),
+            True,
+        ),
+        # Scale and skew are not
+        (QTransform().scale(2, 3), QTransform().scale(2, 3.001), False),
+        (QTransform().scale(2, 3), QTransform().scale(3, 2), False),
+        (QTransform().scale(2, 3), QTransform().scale(2, 3).rotate(30), False),
+        (QTransform(), QTransform().shear(0.5, 0), False),
+    ],
+)
+def test_shape_key(a, b, exp_equal):
+    assert (shape_key(a) == shape_key(b)) == exp_equal
+
+
+class TestSplitPathData(object):
+    @pytest.fixture(params=[True, False], ids=["numpy", "pure_python"])
+    def use_numpy(self, request, monkeypatch):
+        if not request.param:
+            monkeypatch.setattr(outline_painter, "numpy", None)
+
+    def test_empty(self, app, use_numpy):
+        assert split_path_data(path_key(QPainterPath())) == []
+
+    def test_split(self, app, use_numpy):
+        path = QPainterPath()
+        path.moveTo(10, 20)
+        path.lineTo(11, 22)
+        path.cubicTo(12, 20, 13, 21, 14, 24)
+        path.moveTo(100.1, 200.2)
+        path.lineTo(101.1, 202.2)
+        path.cubicTo(102.1, 200.2, 103.1, 201.2, 104.1, 204.2)
+        path.moveTo(0, 0)
+        path.lineTo(1, 1)
+
+        subpaths = split_path_data(path_key(path))
+        assert [(x, y) for x, y, _data in subpaths] == [
+            (10, 20),
+            (100.1, 200.2),
+            (0, 0),
+        ]
+
+        # Identical subpaths at different positions are identified
+        assert subpaths[0][2] == subpaths[1][2]
+        assert subpaths[0][2] != subpaths[2][2]
+
+        # Subpaths translated to origin
+        first = path_from_data(subpaths[0][2])
+        assert first.elementCount() == 5
+        assert [(first.elementAt(i).x, first.elementAt(i).y) for i in range(5)] == [
+            (0, 0),
+            (1, 2),
+            (2, 0),
+            (3, 1),
+            (4, 4),
+        ]
+
+    def test_matches_numpy(self, app, monkeypatch):
+        path = QPainterPath()
+        path.addText(1.5, 2.25, QFont(), "Hello, world!")
+        data = path_key(path)
+
+        expected = split_path_data(data)
+        monkeypatch.setattr(outline_painter, "numpy", None)
+        assert split_path_data(data) == expected
+
+
+class TestGlyphCache(object):
+    def draw(self, app, cache_glyphs):
+        opd = OutlinePaintDevice(100, 200, 10, cache_glyphs=cache_glyphs)
+        p = QPainter(opd)
+        try:
+            pen = QPen()
+            pen.setDashPattern([2, 1])
+            pen.setWidthF(0.1)
+            p.setPen(pen)
+
+            font = QFont()
+            font.setPointSizeF(5)
+            path = QPainterPath()
+            for i in range(3):
+                path.addText(1.37, 10 + (i * 7.25), font, "lol lol")
+            p.scale(1.5, 1.5)
+            p.drawPath(path)
+        finally:
+            p.end()
+
+        return opd
+
+    def test_matches_uncached(self, app):
+        expected = self.draw(app, False).getOutlines()
+        opd = self.draw(app, True)
+        actual = opd.getOutlines()
+
+        assert len(actual) == len(expected)
+        for (rgba_a, width_a, line_a), (rgba_e, width_e, line_e) in zip(
+            actual, expected
+        ):
+            assert rgba_a == rgba_e
+            assert width_a == pytest.approx(width_e)
+            assert LineString(line_a).hausdorff_distance(
+                LineString(line_e)
+            ) == pytest.approx(0, abs=0.01)
+
+        # One entry for each distinct glyph contour ('l' and the inside and
+        # outside of 'o')
+        assert len(opd.paintEngine()._glyph_cache) == 3
+
+    def test_distinct_subpaths_flattened_whole(self, app, monkeypatch):
+        opd = OutlinePaintDevice(100, 200, 10, cache_glyphs=True)
+        engine = opd.paintEngine()
+
+        flattened = []
+        flatten_path = engine._flatten_path
+
+        def _flatten_path(path):
+            flattened.append(path.elementCount())
+            return flatten_path(path)
+
+        monkeypatch.setattr(engine, "_flatten_path", _flatten_path)
+
+        circle = QPainterPath()
+        circle.addEllipse(0, 0, 10, 10)
+        square = QPainterPath()
+        square.addRect(0, 0, 10, 10)
+        both = QPainterPath()
+        both.addEllipse(20, 20, 10, 10)
+        both.addRect(40, 0, 10, 10)
+
+        p = QPainter(opd)
+        try:
+            # Paths of distinct subpaths are flattened whole
+            p.drawPath(circle)
+            p.drawPath(square)
+            assert flattened == [circle.elementCount(), square.elementCount()]
+            assert list(engine._glyph_cache.values()) == [None, None]
+
+            # Once repeated, subpaths are flattened (and cached) individually
+            del flattened[:]
+            p.drawPath(both)
+            p.drawPath(both)
+            assert flattened == [circle.elementCount(), square.elementCount()]
+            assert None not in engine._glyph_cache.values()
+        finally:
+            p.end()
+
+        assert len(opd.getOutlines()) == 6
+
+
+class TestCurves(object):
+    @pytest.fixture
+    def opd(self, app):
+        return OutlinePaintDevice(100.0, 200.0, 10.0, curves=True)
+
+    @pytest.fixture
+    def p(self, app, opd):
+        p = QPainter(opd)
+        try:
+            yield p
+        finally:
+            p.end()
+
+    def test_segments(self, p, opd):
+        p.translate(10, 20)
+        p.scale(10, 10)
+        path = QPainterPath()
+        path.moveTo(0, 0)
+        path.lineTo(1, 2)
+        path.quadTo(2, 2, 2, 1)
+        path.cubicTo(2, 0, 3, 0, 3, 1)
+        p.drawPath(path)
+
+        assert opd.getOutlines() == [
+            (
+                (0.0, 0.0, 0.0, 1.0),
+                1.0,
+                [
+                    ((1.0, 2.0), (2.0, 4.0)),
+                    ((2.0, 4.0), (3.0, 4.0), (3.0, 3.0)),
+                    ((3.0, 3.0), (3.0, 2.0), (4.0, 2.0), (4.0, 3.0)),
+                ],
+            ),
+        ]
+
+    def test_dashes_match_flattened(self, app, p, opd):
+        def draw(p):
+            pen = QPen()
+            pen.setDashPattern([2, 1])
+            pen.setWidthF(0.5)
+            pen.setDashOffset(0.5)
+            p.setPen(pen)
+
+            p.scale(2, 3)
+            path = QPainterPath()
+            path.moveTo(0, 0)
+            path.cubicTo(0, 50, 100, 50, 100, 0)
+            path.lineTo(50, 0)
+            p.drawPath(path)
+
+        draw(p)
+        p.end()
+        actual = opd.getOutlines()
+
+        flat_opd = OutlinePaintDevice(100.0, 200.0, 10.0)
+        flat_p = QPainter(flat_opd)
+        try:
+            draw(flat_p)
+        finally:
+            flat_p.end()
+        expected = flat_opd.getOutlines()
+
+        assert len(actual) == len(expected)
+        for (rgba_a, width_a, line_a), (rgba_e, width_e, line_e) in zip(
+            actual, expected
+        ):
+            assert rgba_a == rgba_e
+            assert width_a == pytest.approx(width_e)
+            # NB: Small differences are expected since dashes are measured
+            # along the flattened curve in the latter case
+            assert line_a[0][0] == pytest.approx(line_e[0], abs=0.05)
+            assert line_a[-1][-1] == pytest.approx(line_e[-1], abs=0.05)
+
+            points = [
+                point_at(segment, i / 10.0) for segment in line_a for i in range(11)
+            ]
+            assert LineString(points).hausdorff_distance(
+                LineString(line_e)
+            ) == pytest.approx(0, abs=0.05)
+
+    def test_projective_transform(self, p, opd):
+        # Curves are flattened into straight line segments
+        p.setTransform(QTransform(1, 0, 0.001, 0, 1, 0.001, 0, 0, 1))
+        path = QPainterPath()
+        path.moveTo(0, 0)
+        path.quadTo(100, 0, 100, 100)
+        p.drawPath(path)
+
+        ((_rgba, _width, line),) = opd.getOutlines()
+        assert len(line) > 1
+        assert all(len(segment) == 2 for segment in line)
+        assert all(a[1] == b[0] for a, b in zip(line, line[1:]))
+
+    def test_occlusion_not_supported(self, app):
+        with pytest.raises(ValueError):
+            OutlinePaintDevice(100.0, 200.0, 10.0, occlusion=True, curves=True)
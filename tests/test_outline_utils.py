@@ -0,0 +1,198 @@
+import pytest
+
+from xml.etree import ElementTree
+
+from svgoutline.svg_to_outlines import svg_to_outlines
+from svgoutline import outline_utils
+from svgoutline.outline_utils import (
+    IDENTITY,
+    translate,
+    rotate,
+    compose,
+    grid_transforms,
+    transform_outlines,
+    step_and_repeat,
+    page_bounds,
+    clip_outlines,
+)
+
+
+def render(content, transform=""):
+    return svg_to_outlines(ElementTree.fromstring(f"""
+            <svg xmlns="http://www.w3.org/2000/svg"
+              width="100mm" height="100mm" viewBox="0 0 100 100">
+                <g transform="{transform}">{content}</g>
+            </svg>
+        """))
+
+
+DESIGN = """
+    <path style="stroke-width:1;stroke:#ff0000" d="M0,0 Q10,10 20,0"/>
+    <rect style="stroke-width:2;stroke:#00ff00" x="1" y="2" width="3" height="4"/>
+    <path style="stroke-width:0.5;stroke:#0000ff" d="M5,5 L6,6"/>
+"""
+
+
+def assert_outlines_approx_equal(actual, expected):
+    assert len(actual) == len(expected)
+    for (rgba_a, width_a, line_a), (rgba_e, width_e, line_e) in zip(actual, expected):
+        assert rgba_a == rgba_e
+        assert width_a == pytest.approx(width_e)
+        assert len(line_a) == len(line_e)
+        for pa, pe in zip(line_a, line_e):
+            assert pa == pytest.approx(pe, abs=1e-9)
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "pure_python"])
+def use_numpy(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(outline_utils, "numpy", None)
+
+
+@pytest.mark.parametrize(
+    "transform, svg_transform",
+    [
+        (IDENTITY, ""),
+        (translate(10, 20), "translate(10, 20)"),
+        (rotate(30), "rotate(30)"),
+        (rotate(30, 10, 5), "rotate(30, 10, 5)"),
+        (compose(rotate(45), translate(3, 4)), "translate(3, 4) rotate(45)"),
+        ((2, 0, 0, 2, 1, 1), "matrix(2, 0, 0, 2, 1, 1)"),
+    ],
+)
+def test_transform_outlines(use_numpy, transform, svg_transform):
+    # Rendering once and transforming the outlines should match rendering
+    # with the transform applied (for transforms which don't affect the
+    # curve approximation)
+    expected = render(DESIGN, svg_transform)
+    actual = transform_outlines(render(DESIGN), transform)
+    if transform[0] == 2:
+        # Scaling changes curve approximation; just check the straight lines
+        actual = actual[1:]
+        expected = expected[1:]
+    assert_outlines_approx_equal(actual, expected)
+
+
+def test_transform_empty(use_numpy):
+    assert transform_outlines([], translate(1, 2)) == []
+    assert transform_outlines([(None, 1.0, [])], translate(1, 2)) == [(None, 1.0, [])]
+
+
+def test_grid_transforms():
+    assert grid_transforms(2, 3, 10, 20, 1, 2) == [
+        translate(1, 2),
+        translate(11, 2),
+        translate(1, 22),
+        translate(11, 22),
+        translate(1, 42),
+        translate(11, 42),
+    ]
+
+
+def test_step_and_repeat(use_numpy):
+    design = render(DESIGN)
+    transforms = grid_transforms(3, 2, 30, 40)
+
+    expected = []
+    for transform in transforms:
+        expected.extend(render(DESIGN, "translate({}, {})".format(*transform[4:])))
+
+    assert_outlines_approx_equal(step_and_repeat(design, transforms), expected)
+
+
+def test_step_and_repeat_lazy(use_numpy):
+    design = render(DESIGN)
+
+    def transforms():
+        yield translate(1, 2)
+        raise AssertionError("Should not be reached")
+
+    copies = step_and_repeat(design, transforms(), lazy=True)
+    assert next(copies) == transform_outlines(design, translate(1, 2))
+
+
+def test_page_bounds():
+    assert page_bounds(210, 297) == (0, 0, 210, 297)
+    assert page_bounds(210, 297, 10) == (10, 10, 200, 287)
+
+
+RED = (1.0, 0.0, 0.0, 1.0)
+
+
+@pytest.mark.parametrize(
+    "line, exp_lines",
+    [
+        # Empty and single point outlines
+        ([], []),
+        ([(5, 5)], [[(5, 5)]]),
+        ([(15, 5)], []),
+        # Entirely inside (including touching the edges)
+        ([(1, 1), (9, 9), (1, 9)], [[(1, 1), (9, 9), (1, 9)]]),
+        ([(0, 0), (10, 0), (10, 10)], [[(0, 0), (10, 0), (10, 10)]]),
+        # Entirely outside
+        ([(-5, -5), (-1, 20), (15, 20)], []),
+        ([(10, -5), (10, -1)], []),
+        # Leaving and entering
+        ([(5, 5), (15, 5)], [[(5, 5), (10, 5)]]),
+        ([(-5, 5), (5, 5)], [[(0, 5), (5, 5)]]),
+        ([(-5, 5), (15, 5)], [[(0, 5), (10, 5)]]),
+        ([(-5, -5), (15, 15)], [[(0, 0), (10, 10)]]),
+        # Leaving and re-entering
+        (
+            [(5, 5), (15, 5), (15, 8), (5, 8), (5, 15), (2, 15), (2, 2)],
+            [[(5, 5), (10, 5)], [(10, 8), (5, 8), (5, 10)], [(2, 10), (2, 2)]],
+        ),
+        # Leaving and re-entering at vertices on the boundary
+        (
+            [(5, 5), (10, 5), (15, 5), (10, 8), (5, 8)],
+            [[(5, 5), (10, 5)], [(10, 8), (5, 8)]],
+        ),
+        # Outside, just touching a corner
+        ([(5, -5), (15, 5)], []),
+    ],
+)
+def test_clip_outlines(use_numpy, line, exp_lines):
+    bounds = (0, 0, 10, 10)
+    actual = clip_outlines([(RED, 1.0, line)], bounds)
+    assert_outlines_approx_equal(actual, [(RED, 1.0, exp) for exp in exp_lines])
+
+
+def test_clip_outlines_order_and_styles(use_numpy):
+    outlines = [
+        (RED, 1.0, [(-5, 5), (5, 5), (5, 15), (8, 15), (8, 5)]),
+        (None, 2.0, [(1, 1), (2, 2)]),
+        (RED, 3.0, [(20, 20), (30, 30)]),
+        (None, 4.0, [(5, 5)]),
+    ]
+    actual = clip_outlines(iter(outlines), (0, 0, 10, 10))
+    assert_outlines_approx_equal(
+        actual,
+        [
+            (RED, 1.0, [(0, 5), (5, 5), (5, 10)]),
+            (RED, 1.0, [(8, 10), (8, 5)]),
+            (None, 2.0, [(1, 1), (2, 2)]),
+            (None, 4.0, [(5, 5)]),
+        ],
+    )
+
+    # Input not modified
+    assert outlines[0][2][0] == (-5, 5)
+    assert actual[2][2] is not outlines[1][2]
+
+
+def test_clip_outlines_empty(use_numpy):
+    assert clip_outlines([], (0, 0, 10, 10)) == []
+
+
+def test_clip_outlines_margin(use_numpy):
+    design = render(DESIGN, "translate(-2, 0)")
+    actual = clip_outlines(design, page_bounds(100, 100, 1))
+
+    # Quadratic curve clipped at the left margin
+    _rgba, _width, curve = actual[0]
+    assert curve[0][0] == pytest.approx(1)
+    assert all(x >= 1 for x, _y in curve)
+
+    # Rectangle partially clipped (at x=1), path unchanged
+    assert actual[-2][2] == [(1, 2), (2, 2), (2, 6), (1, 6)]
+    assert actual[-1] == design[-1]
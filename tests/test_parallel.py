@@ -0,0 +1,120 @@
+import pytest
+
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from xml.etree import ElementTree
+
+from svgoutline.svg_to_outlines import svg_to_outlines
+from svgoutline.parallel import svg_to_outlines_parallel, split_svg
+
+SVG = """
+    <svg
+      xmlns="http://www.w3.org/2000/svg"
+      xmlns:xlink="http://www.w3.org/1999/xlink"
+      width="2cm" height="1cm" viewBox="0 0 2 1"
+    >
+        <title>Test document</title>
+        <style>.blue { stroke: blue }</style>
+        <defs>
+            <linearGradient id="g1" x1="0" y1="0" x2="2" y2="1">
+                <stop style="stop-color:red" offset="0"/>
+                <stop style="stop-color:blue" offset="1"/>
+            </linearGradient>
+        </defs>
+        <path id="p1" style="stroke-width:0.1;stroke:#ff0000" d="M0,0 L2,1"/>
+        <g transform="translate(0, 0.5)">
+            <path style="stroke-width:0.1;stroke:url(#g1)" d="M0,0 L2,0"/>
+            <g style="stroke:#00ff00;stroke-width:0.1">
+                <line x1="0" y1="0.1" x2="2" y2="0.1"/>
+                <polyline points="0,0.2 1,0.2 2,0.3"/>
+            </g>
+            <g/>
+            <path class="blue" style="stroke-width:0.1" d="M0,0.4 L2,0.4"/>
+        </g>
+        <use xlink:href="#p1" transform="translate(0, 0.5)"/>
+        <text style="stroke-width:0.1;font-size:1;stroke:black" x="0" y="1">T</text>
+        <rect
+          style="stroke-width:0.1;stroke:#ff00ff"
+          x="0.5" y="0.5" width="1" height="0.25"
+        />
+    </svg>
+"""
+
+
+@pytest.fixture(scope="module")
+def executor():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        yield executor
+
+
+@pytest.mark.parametrize("parts", [1, 2, 3, 100])
+def test_split_svg(parts):
+    root = ElementTree.fromstring(SVG)
+    subdocuments = split_svg(root, parts)
+    assert len(subdocuments) == min(parts, 8)
+
+    actual = []
+    for subdocument in subdocuments:
+        actual.extend(svg_to_outlines(subdocument, 20, 10))
+    assert actual == svg_to_outlines(root)
+
+
+@pytest.mark.parametrize(
+    "effect", ['opacity="0.5"', 'style="opacity:0.5"', 'filter="url(#f)"']
+)
+def test_split_svg_group_effects(effect):
+    # QSvg renders groups with group effects offscreen (producing no
+    # outlines) and so they must not be split
+    root = ElementTree.fromstring(
+        f"""
+            <svg xmlns="http://www.w3.org/2000/svg"
+                 width="2cm" height="1cm" viewBox="0 0 2 1">
+                <path style="stroke-width:0.1;stroke:red" d="M0,0 L2,1"/>
+                <g {effect}>
+                    <path style="stroke-width:0.1;stroke:red" d="M0,0 L2,0"/>
+                    <path style="stroke-width:0.1;stroke:red" d="M0,1 L2,1"/>
+                    <path style="stroke-width:0.1;stroke:red" d="M0,0 L0,1"/>
+                </g>
+            </svg>
+        """
+    )
+    subdocuments = split_svg(root, 4)
+    assert len(subdocuments) == 2
+
+    actual = []
+    for subdocument in subdocuments:
+        actual.extend(svg_to_outlines(subdocument, 20, 10))
+    assert actual == svg_to_outlines(root)
+
+
+def test_split_svg_empty():
+    root = ElementTree.fromstring(
+        """<svg xmlns="http://www.w3.org/2000/svg" width="1cm" height="1cm"/>"""
+    )
+    assert len(split_svg(root, 4)) == 1
+
+
+@pytest.mark.parametrize("parts", [1, 3])
+def test_matches_svg_to_outlines(executor, parts):
+    root = ElementTree.fromstring(SVG)
+    expected = svg_to_outlines(root, 40, 20, 10)
+    actual = svg_to_outlines_parallel(
+        root, 40, 20, 10, processes=parts, executor=executor
+    )
+    assert actual == expected
+
+
+def test_process_pool():
+    root = ElementTree.fromstring(SVG)
+    expected = svg_to_outlines(root)
+    assert svg_to_outlines_parallel(root, processes=2) == expected
+
+    with ProcessPoolExecutor(
+        max_workers=2, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        assert svg_to_outlines_parallel(root, executor=executor) == expected
+
+        actual = svg_to_outlines_parallel(root, processes=2, executor=executor)
+        assert actual == expected
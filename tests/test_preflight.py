@@ -0,0 +1,235 @@
+import pytest
+
+import math
+
+from svgoutline.svg_to_outlines import svg_to_outlines
+from svgoutline.preflight import (
+    preflight_svg,
+    _get_transform_scale,
+    _get_path_stats,
+)
+
+
+def make_svg(body):
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" '
+        'xmlns:xlink="http://www.w3.org/1999/xlink" '
+        'width="200mm" height="200mm" viewBox="0 0 200 200">' + body + "</svg>"
+    ).encode("utf-8")
+
+
+PATH = '<path d="M10,10 L20,20 L30,10" stroke="red" {}/>'
+
+
+@pytest.mark.parametrize(
+    "transform, exp",
+    [
+        ("", 1.0),
+        ("translate(10, 20) rotate(45) skewX(10)", 1.0),
+        ("scale(2)", 2.0),
+        ("scale(2, 8)", 4.0),
+        ("matrix(0 3 -3 0 1 1)", 3.0),
+        ("scale(2) translate(5) scale(3)", 6.0),
+    ],
+)
+def test_get_transform_scale(transform, exp):
+    assert _get_transform_scale(transform) == pytest.approx(exp)
+
+
+@pytest.mark.parametrize(
+    "d, exp_length, exp_subpaths, exp_points",
+    [
+        ("", 0, 0, 0),
+        ("M0,0 L10,0", 10, 1, 2),
+        ("M0,0 h10 v10 h-10 z", 40, 1, 5),
+        ("M0,0 H10 V10 H0 Z", 40, 1, 5),
+        # Implicit line-to after move-to
+        ("m0,0 10,0 0,10 M20,20 30,20", 30, 2, 5),
+        # Semicircle
+        ("M0,0 A5,5 0 0 1 10,0", 5 * math.pi, 1, 1 + 2 * 4),
+    ],
+)
+def test_get_path_stats(d, exp_length, exp_subpaths, exp_points):
+    length, subpaths, points = _get_path_stats(d, 1.0)
+    assert length == pytest.approx(exp_length)
+    assert subpaths == exp_subpaths
+    assert points == exp_points
+
+
+@pytest.mark.parametrize(
+    "body, exp_error",
+    [
+        # Supported
+        (PATH.format(""), False),
+        (PATH.format('comp-op="src-over"'), False),
+        (
+            '<defs><marker id="m" overflow="visible"><path d="M0,0 L5,5" '
+            'stroke="green"/></marker></defs>' + PATH.format('marker-end="url(#m)"'),
+            False,
+        ),
+        (
+            '<defs><symbol id="s" overflow="auto"><path d="M0,0 L5,5" '
+            'stroke="green"/></symbol></defs><use xlink:href="#s"/>',
+            False,
+        ),
+        # Unused markers and symbols are not a problem
+        (
+            '<defs><marker id="m"><path d="M0,0 L5,5" stroke="green"/></marker>'
+            '<symbol id="s"><path d="M0,0 L5,5" stroke="green"/></symbol></defs>',
+            False,
+        ),
+        # Unsupported composition modes
+        (PATH.format('comp-op="multiply"'), True),
+        (PATH.format('style="comp-op:multiply"'), True),
+        # Clipped markers and symbols
+        (
+            '<defs><marker id="m"><path d="M0,0 L5,5" stroke="green"/></marker>'
+            "</defs>" + PATH.format('marker-end="url(#m)"'),
+            True,
+        ),
+        (
+            '<defs><symbol id="s"><path d="M0,0 L5,5" stroke="green"/></symbol>'
+            '</defs><use xlink:href="#s"/>',
+            True,
+        ),
+        (
+            '<defs><symbol id="s" style="overflow:visible"><path d="M0,0 L5,5" '
+            'stroke="green"/></symbol></defs><use xlink:href="#s"/>',
+            True,
+        ),
+    ],
+)
+def test_errors(body, exp_error):
+    svg = make_svg(body)
+    report = preflight_svg(svg)
+    assert bool(report.errors) == exp_error
+
+    # NB: Documents with errors are not rendered here since QSvg may be left
+    # in a bad state after a failed render.
+    if not exp_error:
+        svg_to_outlines(svg)
+
+
+@pytest.mark.parametrize(
+    "body, exp_warning",
+    [
+        (PATH.format('clip-path="url(#c)"'), "clip-path"),
+        (PATH.format('style="mask: url(#k)"'), "mask"),
+        ('<svg width="10" height="10">' + PATH.format("") + "</svg>", "<svg>"),
+        ('<text><textPath xlink:href="#p">Hi</textPath></text>', "<textPath>"),
+        ("<foreignObject/>", "<foreignObject>"),
+        (
+            '<g id="g" opacity="0.5">' + PATH.format("") + PATH.format("") + "</g>",
+            '<g id="g"> has a group effect',
+        ),
+        ('<use xlink:href="#nope"/>', "missing"),
+        ('<g id="g"><use xlink:href="#g"/></g>', "circular"),
+        ("<style>path { stroke: red; }</style>", "<style>"),
+    ],
+)
+def test_warnings(body, exp_warning):
+    report = preflight_svg(make_svg(body))
+    assert report.errors == []
+    assert len(report.warnings) == 1
+    assert exp_warning in report.warnings[0]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        '<circle cx="100" cy="100" r="20" stroke="red"/>',
+        '<rect x="1" y="1" width="20" height="30" rx="3" stroke="red"/>',
+        '<ellipse cx="50" cy="50" rx="30" ry="10" stroke="red"/>',
+        '<line x1="0" y1="0" x2="10" y2="10" stroke="red"/>',
+        '<polygon points="0,0 10,10 20,0" stroke="red"/>',
+        '<path d="M10,10 C50,100 100,0 150,50 S 180,180 100,150 '
+        'Q 50,150 20,100 T 10,10 Z" stroke="red"/>',
+        '<path d="M10,100 a40,40 0 0 1 80,0 A 20 30 0 1 0 150 150" stroke="red"/>',
+        '<path d="M0,0 C50,100 100,0 150,50" stroke="red" stroke-dasharray="5 3"/>',
+        '<text x="0" y="100" font-size="10" stroke="red">'
+        'The quick <tspan font-size="20">brown</tspan> fox</text>',
+        '<g transform="scale(4)"><circle cx="10" cy="10" r="5" stroke="red"/></g>',
+        # Not stroked or not rendered
+        '<circle cx="100" cy="100" r="20" fill="red"/>',
+        '<circle cx="100" cy="100" r="20" stroke="red" display="none"/>',
+        '<g visibility="hidden"><circle r="20" stroke="red"/></g>',
+        '<defs><circle id="c" r="20" stroke="red"/></defs>',
+    ],
+)
+@pytest.mark.parametrize("pixels_per_mm", [1.0, 20.0])
+def test_estimates(body, pixels_per_mm):
+    svg = make_svg(body)
+    report = preflight_svg(svg, pixels_per_mm=pixels_per_mm)
+    outlines = svg_to_outlines(svg, pixels_per_mm=pixels_per_mm)
+
+    assert report.errors == []
+    assert report.warnings == []
+
+    exp_outlines = len(outlines)
+    exp_points = sum(len(line) for _rgba, _width, line in outlines)
+    assert exp_outlines / 1.5 <= report.outlines <= exp_outlines * 1.5
+    assert exp_points / 1.5 <= report.points <= exp_points * 1.5
+    assert bool(report.elements) == bool(outlines)
+    assert (report.cost > 0) == bool(outlines)
+
+
+def test_estimates_scale_with_page_size():
+    svg = make_svg('<circle cx="100" cy="100" r="20" stroke="red"/>')
+    small = preflight_svg(svg, 100, 100)
+    large = preflight_svg(svg, 400, 400)
+    same = preflight_svg(svg, 100, 100, pixels_per_mm=20.0)
+    assert small.points < large.points
+    assert large == same
+
+
+def test_use_fan_out():
+    svg = make_svg(
+        "<defs>"
+        '<g id="g">'
+        '<circle r="5" stroke="red"/><path d="M0,0 L5,5 L10,0" stroke="blue"/>'
+        "</g>"
+        '<g id="h">'
+        '<use xlink:href="#g"/>'
+        '<use xlink:href="#g" x="20"/>'
+        '<use xlink:href="#g" transform="scale(3)"/>'
+        "</g>"
+        "</defs>" + "".join(f'<use xlink:href="#h" y="{i * 20}"/>' for i in range(10))
+    )
+    report = preflight_svg(svg)
+    outlines = svg_to_outlines(svg)
+
+    assert report.elements == 10 * 3 * 2
+    assert report.outlines == len(outlines)
+    exp_points = sum(len(line) for _rgba, _width, line in outlines)
+    assert exp_points / 1.5 <= report.points <= exp_points * 1.5
+
+
+def test_use_inherits_properties():
+    report = preflight_svg(
+        make_svg(
+            '<defs><circle id="c" r="20"/></defs>'
+            '<use xlink:href="#c"/><use xlink:href="#c" stroke="red"/>'
+        )
+    )
+    assert report.elements == 1
+
+
+@pytest.mark.parametrize("size", ['width="100%" height="50mm"', 'width="50mm"'])
+def test_page_size_errors(size):
+    svg = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" {size} viewBox="0 0 100 100">'
+        '<circle cx="50" cy="50" r="20" stroke="red"/></svg>'
+    ).encode("utf-8")
+
+    # The page size cannot be determined from the document
+    report = preflight_svg(svg)
+    assert len(report.errors) == 1
+    assert "page size" in report.errors[0]
+    with pytest.raises(ValueError):
+        svg_to_outlines(svg)
+
+    # ...unless it is given explicitly
+    report = preflight_svg(svg, 100, 100)
+    assert report.errors == []
+    assert report.outlines == 1
+    svg_to_outlines(svg, 100, 100)
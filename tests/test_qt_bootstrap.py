@@ -0,0 +1,99 @@
+import os
+import sys
+import subprocess
+
+from PySide6.QtGui import QGuiApplication
+
+from svgoutline.qt_bootstrap import ensure_qt_application
+
+
+def test_idempotent():
+    info = ensure_qt_application()
+    assert info.application is QGuiApplication.instance()
+    assert info.platform == QGuiApplication.platformName()
+
+    assert ensure_qt_application() == info
+
+
+def test_preload_fonts():
+    info = ensure_qt_application(preload_fonts=True)
+    assert info.font_load_time is not None
+    assert info.font_load_time >= 0
+
+    # Only loaded once
+    assert ensure_qt_application(preload_fonts=True) == info
+
+
+def test_display_free_startup():
+    # In a fresh interpreter without a display (or platform chosen by the
+    # environment) the offscreen platform should be used.
+    env = dict(os.environ)
+    env.pop("QT_QPA_PLATFORM", None)
+    env.pop("DISPLAY", None)
+    env.pop("WAYLAND_DISPLAY", None)
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            (
+                "from svgoutline.qt_bootstrap import ensure_qt_application;"
+                "info = ensure_qt_application();"
+                "print(info.platform, info.startup_time > 0)"
+            ),
+        ],
+        env=env,
+        universal_newlines=True,
+    )
+    assert output.split() == ["offscreen", "True"]
+
+
+def test_must_create_in_main_thread():
+    # In a fresh interpreter, attempting to create the application from a
+    # non-main thread should fail when the main thread is required.
+    script = "\n".join(
+        [
+            "import threading",
+            "from svgoutline.qt_bootstrap import ensure_qt_application",
+            "def main():",
+            "    try:",
+            "        ensure_qt_application(require_main_thread=True)",
+            "    except RuntimeError:",
+            "        print('RuntimeError')",
+            "thread = threading.Thread(target=main)",
+            "thread.start()",
+            "thread.join()",
+        ]
+    )
+    output = subprocess.check_output(
+        [sys.executable, "-c", script],
+        universal_newlines=True,
+    )
+    assert output.split() == ["RuntimeError"]
+
+
+def test_svg_to_outlines_in_worker_thread():
+    # In a fresh interpreter, svg_to_outlines should still create the
+    # application from a worker thread (with a warning)
+    script = "\n".join(
+        [
+            "import warnings",
+            "from concurrent.futures import ThreadPoolExecutor",
+            "from svgoutline import svg_to_outlines",
+            "svg = (",
+            "    b'<svg xmlns=\"http://www.w3.org/2000/svg\" width=\"10mm\" '",
+            "    b'height=\"10mm\" viewBox=\"0 0 10 10\">'",
+            "    b'<path d=\"M0,0 L5,5\" stroke=\"red\" /></svg>'",
+            ")",
+            "with warnings.catch_warnings(record=True) as caught:",
+            "    warnings.simplefilter('always')",
+            "    with ThreadPoolExecutor(1) as executor:",
+            "        outlines = executor.submit(svg_to_outlines, svg).result()",
+            "print(len(outlines))",
+            "print(' '.join(w.category.__name__ for w in caught))",
+        ]
+    )
+    output = subprocess.check_output(
+        [sys.executable, "-c", script],
+        universal_newlines=True,
+    )
+    assert output.split() == ["1", "RuntimeWarning"]
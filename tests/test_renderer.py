@@ -0,0 +1,67 @@
+import pytest
+
+from xml.etree import ElementTree
+
+from svgoutline.svg_to_outlines import svg_to_outlines
+from svgoutline.renderer import OutlineRenderer, RendererCache
+
+SVG = b"""
+    <svg xmlns="http://www.w3.org/2000/svg" width="2cm" height="1cm" viewBox="0 0 2 1">
+        <path style="stroke-width:0.1;stroke:#ff0000" d="M0,0 Q1,1 2,0"/>
+        <polyline style="stroke-width:0.1;stroke:blue" points="0,0 1,1 2,0"/>
+    </svg>
+"""
+
+
+@pytest.mark.parametrize(
+    "width_mm, height_mm, pixels_per_mm",
+    [
+        (None, None, 5.0),
+        (None, None, 1.0),
+        (None, None, 20.0),
+        (40, 20, 5.0),
+        (10, 30, 2.0),
+    ],
+)
+def test_matches_svg_to_outlines(width_mm, height_mm, pixels_per_mm):
+    renderer = OutlineRenderer(SVG)
+    expected = svg_to_outlines(
+        ElementTree.fromstring(SVG), width_mm, height_mm, pixels_per_mm
+    )
+
+    # Render repeatedly at different settings
+    for _ in range(2):
+        assert renderer.render(width_mm, height_mm, pixels_per_mm) == expected
+        renderer.render(30, 30, 3.0)
+
+
+def test_no_page_size():
+    renderer = OutlineRenderer(b"""
+            <svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 2 1">
+                <path style="stroke-width:0.1;stroke:#ff0000" d="M0,0 L2,1"/>
+            </svg>
+        """)
+    assert renderer.page_size is None
+    with pytest.raises(ValueError):
+        renderer.render()
+    assert renderer.render(20, 10)[0][2] == [(0, 0), (20, 10)]
+
+
+def test_renderer_cache():
+    cache = RendererCache(max_entries=2)
+
+    renderer = cache.get(SVG)
+    assert cache.get(SVG) is renderer
+    assert cache.get(ElementTree.fromstring(SVG)) is not renderer
+    assert len(cache) == 2
+
+    assert cache.render(SVG, 40, 20, 10) == svg_to_outlines(SVG, 40, 20, 10)
+
+    # Least recently used entry evicted
+    cache.get(SVG.replace(b"Q1,1", b"Q1,2"))
+    assert len(cache) == 2
+    assert cache.get(SVG) is renderer
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.get(SVG) is not renderer
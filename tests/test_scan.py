@@ -0,0 +1,112 @@
+import pytest
+
+import os
+import gzip
+
+from glob import glob
+from io import BytesIO
+
+from xml.etree import ElementTree
+
+from svgoutline.svg_utils import get_svg_page_size
+from svgoutline.scan import scan_svg
+
+
+SAMPLES_DIR = os.path.join(os.path.dirname(__file__), "..", "samples")
+
+LEGACY_INKSCAPE_SVG = b"""<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<!-- Created with Inkscape (http://www.inkscape.org/) -->
+<svg
+   xmlns="http://www.w3.org/2000/svg"
+   xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape"
+   width="744.09448819"
+   height="1052.3622047"
+   inkscape:version="0.46">
+  <g inkscape:label="Layer 1" inkscape:groupmode="layer" id="layer1"></g>
+</svg>
+"""
+
+ILLUSTRATOR_SVG = b"""<?xml version="1.0" encoding="iso-8859-1"?>
+<!-- Generator: Adobe Illustrator 27.8.0, SVG Export Plug-In . SVG Version: 6.00 Build 0)  -->
+<svg version="1.1" id="Layer_1" xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" x="0px" y="0px"
+    width="841.89px" height="1190.551px" viewBox="0 0 841.89 1190.551" enable-background="new 0 0 841.89 1190.551"
+    xml:space="preserve">
+<rect x="80" y="117" fill="#FFFFFF" stroke="#000000" stroke-miterlimit="10" width="216" height="271"/>
+</svg>
+"""
+
+
+@pytest.mark.parametrize(
+    "svg",
+    [LEGACY_INKSCAPE_SVG, ILLUSTRATOR_SVG]
+    + [
+        open(filename, "rb").read()
+        for filename in sorted(glob(os.path.join(SAMPLES_DIR, "*.svg")))
+    ],
+)
+@pytest.mark.parametrize("use_illustrator_heuristic", [True, False])
+def test_matches_get_svg_page_size(svg, use_illustrator_heuristic):
+    expected = get_svg_page_size(
+        ElementTree.fromstring(svg),
+        use_illustrator_heuristic=use_illustrator_heuristic,
+    )
+    metadata = scan_svg(
+        BytesIO(svg),
+        use_illustrator_heuristic=use_illustrator_heuristic,
+    )
+    assert (metadata.width_mm, metadata.height_mm) == expected
+    assert metadata.element_counts is None
+
+
+def test_dpi():
+    assert scan_svg(BytesIO(LEGACY_INKSCAPE_SVG)).dpi == 90
+    assert scan_svg(BytesIO(ILLUSTRATOR_SVG)).dpi == 72
+
+    metadata = scan_svg(BytesIO(ILLUSTRATOR_SVG), dpi=72 / 2)
+    assert metadata.dpi == 72 / 2
+    assert (metadata.width_mm, metadata.height_mm) == pytest.approx((297 * 2, 420 * 2))
+
+
+def test_filename(tmp_path):
+    filename = tmp_path / "test.svg"
+    filename.write_bytes(ILLUSTRATOR_SVG)
+    assert scan_svg(str(filename)) == scan_svg(BytesIO(ILLUSTRATOR_SVG))
+
+
+def test_compressed():
+    compressed = gzip.compress(ILLUSTRATOR_SVG)
+    assert scan_svg(compressed) == scan_svg(BytesIO(ILLUSTRATOR_SVG))
+    assert scan_svg(compressed, count_elements=True) == scan_svg(
+        BytesIO(ILLUSTRATOR_SVG), count_elements=True
+    )
+
+
+def test_missing_size():
+    with pytest.raises(ValueError):
+        scan_svg(BytesIO(b'<svg xmlns="http://www.w3.org/2000/svg"/>'))
+
+
+def test_stops_after_root():
+    svg = (
+        b'<svg xmlns="http://www.w3.org/2000/svg" width="10mm" height="20mm">'
+        + (b'<path d="M0,0 L2,1"/>' * 100000)
+        + b"</svg>"
+    )
+    f = BytesIO(svg)
+    assert scan_svg(f)[:2] == (10, 20)
+    assert f.tell() < 10000
+
+
+def test_count_elements():
+    svg = b"""
+        <svg xmlns="http://www.w3.org/2000/svg" width="10mm" height="20mm"
+             xmlns:foo="http://example.com/foo">
+            <path/>
+            <g><path/><text>Hello<tspan>world</tspan></text></g>
+            <use/>
+            <foo:path/>
+        </svg>
+    """
+    counts = scan_svg(BytesIO(svg), count_elements=True).element_counts
+    assert counts == {"svg": 1, "path": 2, "g": 1, "text": 1, "tspan": 1, "use": 1}
+    assert counts["polyline"] == 0
@@ -0,0 +1,118 @@
+import pytest
+
+import gzip
+
+from io import BytesIO
+
+from xml.etree import ElementTree
+
+from svgoutline.svg_to_outlines import svg_to_outlines
+from svgoutline.streaming import svg_to_outlines_streaming
+
+
+SVG = b"""<?xml version="1.0" encoding="UTF-8"?>
+<svg
+  xmlns="http://www.w3.org/2000/svg"
+  xmlns:xlink="http://www.w3.org/1999/xlink"
+  xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape"
+  width="2cm" height="1cm" viewBox="0 0 2 1"
+>
+    <title>Test document</title>
+    <style>.blue { stroke: blue }</style>
+    <defs>
+        <linearGradient id="g1" x1="0" y1="0" x2="2" y2="1">
+            <stop style="stop-color:red" offset="0"/>
+            <stop style="stop-color:blue" offset="1"/>
+        </linearGradient>
+        <path id="p1" d="M0,0 L0.5,0"/>
+    </defs>
+    <path style="stroke-width:0.1;stroke:#ff0000" d="M0,0 L2,1"/>
+    <g inkscape:groupmode="layer" transform="translate(0, 0.5)">
+        <path style="stroke-width:0.1;stroke:url(#g1)" d="M0,0 L2,0"/>
+        <g style="stroke:#00ff00;stroke-width:0.1">
+            <line x1="0" y1="0.1" x2="2" y2="0.1"/>
+            <use xlink:href="#p1" transform="translate(1, 0)"/>
+            <polyline points="0,0.2 1,0.2 2,0.3"/>
+        </g>
+        <g/>
+        <path class="blue" style="stroke-width:0.1" d="M0,0.4 L2,0.4"/>
+    </g>
+    <text style="stroke-width:0.1;font-size:1;stroke:black" x="0" y="1">T</text>
+    <rect style="stroke-width:0.1;stroke:#ff00ff" x="0.5" y="0.5" width="1" height="0.25"/>
+</svg>
+"""
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 1000])
+def test_matches_svg_to_outlines(chunk_size):
+    expected = svg_to_outlines(ElementTree.fromstring(SVG))
+    assert len(expected) == 8
+
+    actual = list(svg_to_outlines_streaming(BytesIO(SVG), chunk_size=chunk_size))
+    assert actual == expected
+
+
+@pytest.mark.parametrize(
+    "effect", ['opacity="0.5"', 'style="opacity:0.5"', 'filter="url(#f)"']
+)
+def test_group_effects(effect):
+    # QSvg renders groups with group effects offscreen (producing no
+    # outlines) and so they must not be split between chunks
+    svg = f"""
+        <svg xmlns="http://www.w3.org/2000/svg"
+             width="2cm" height="1cm" viewBox="0 0 2 1">
+            <path style="stroke-width:0.1;stroke:red" d="M0,0 L2,1"/>
+            <g {effect}>
+                <path style="stroke-width:0.1;stroke:red" d="M0,0 L2,0"/>
+                <path style="stroke-width:0.1;stroke:red" d="M0,1 L2,1"/>
+                <path style="stroke-width:0.1;stroke:red" d="M0,0 L0,1"/>
+            </g>
+        </svg>
+    """.encode("utf-8")
+    expected = svg_to_outlines(ElementTree.fromstring(svg))
+    actual = list(svg_to_outlines_streaming(BytesIO(svg), chunk_size=1))
+    assert actual == expected
+
+
+def test_filename_and_explicit_size(tmp_path):
+    filename = tmp_path / "test.svg"
+    filename.write_bytes(SVG)
+
+    expected = svg_to_outlines(ElementTree.fromstring(SVG), 40, 20, 10)
+    actual = list(svg_to_outlines_streaming(str(filename), 40, 20, 10, 2))
+    assert actual == expected
+
+
+class CountingBytesIO(BytesIO):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.bytes_read = 0
+
+    def read(self, *args, **kwargs):
+        data = super().read(*args, **kwargs)
+        self.bytes_read += len(data)
+        return data
+
+
+def test_incremental():
+    # Check that outlines are produced before the whole document has been read
+    # and that the document is discarded as it is rendered.
+    svg = (
+        b'<svg xmlns="http://www.w3.org/2000/svg" width="2cm" height="1cm" '
+        b'viewBox="0 0 2 1"><g>'
+        + (b'<path style="stroke-width:0.1;stroke:#ff0000" d="M0,0 L2,1"/>' * 10000)
+        + b"</g></svg>"
+    )
+    f = CountingBytesIO(svg)
+
+    outlines = svg_to_outlines_streaming(f, chunk_size=100)
+    assert next(outlines) == ((1, 0, 0, 1), 1, [(0, 0), (20, 10)])
+    assert f.bytes_read < len(svg) / 2
+
+    assert len(list(outlines)) == 10000 - 1
+
+
+def test_compressed():
+    expected = svg_to_outlines(ElementTree.fromstring(SVG))
+    actual = list(svg_to_outlines_streaming(gzip.compress(SVG), chunk_size=2))
+    assert actual == expected
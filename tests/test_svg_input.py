@@ -0,0 +1,136 @@
+import pytest
+
+import io
+import gzip
+import mmap
+
+from xml.etree import ElementTree
+
+from svgoutline import svg_input
+from svgoutline.svg_input import open_svg, parse_svg, iterparse_svg
+
+
+SVG = b"""<svg xmlns="http://www.w3.org/2000/svg" width="2cm" height="1cm"/>"""
+
+
+class UnseekableFile(io.RawIOBase):
+    """A file object which can't seek or peek (e.g. a pipe)."""
+
+    def __init__(self, data):
+        self._file = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        return self._file.readinto(b)
+
+
+@pytest.fixture(params=[False, True], ids=["svg", "svgz"])
+def data(request):
+    if request.param:
+        return gzip.compress(SVG)
+    else:
+        return SVG
+
+
+@pytest.fixture(
+    params=[
+        "filename",
+        "pathlib",
+        "bytes",
+        "bytearray",
+        "memoryview",
+        "mmap",
+        "file",
+        "unseekable_file",
+    ]
+)
+def source(request, tmp_path, data):
+    filename = tmp_path / "test.svg"
+    filename.write_bytes(data)
+
+    if request.param == "filename":
+        yield str(filename)
+    elif request.param == "pathlib":
+        yield filename
+    elif request.param == "bytes":
+        yield data
+    elif request.param == "bytearray":
+        yield bytearray(data)
+    elif request.param == "memoryview":
+        yield memoryview(data)
+    elif request.param == "mmap":
+        with open(filename, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                yield m
+    elif request.param == "file":
+        with open(filename, "rb") as f:
+            yield f
+    elif request.param == "unseekable_file":
+        yield UnseekableFile(data)
+
+
+def test_open_svg(source):
+    with open_svg(source) as f:
+        assert f.read() == SVG
+
+
+def test_open_svg_small_reads(source):
+    with open_svg(source) as f:
+        assert b"".join(iter(lambda: f.read(1), b"")) == SVG
+
+
+def test_parse_svg(source):
+    root = parse_svg(source)
+    assert root.tag == "{http://www.w3.org/2000/svg}svg"
+    assert root.get("width") == "2cm"
+
+
+def test_parse_svg_element():
+    root = ElementTree.fromstring(SVG)
+    assert parse_svg(root) is root
+    assert parse_svg(ElementTree.ElementTree(root)) is root
+
+
+def test_file_objects_not_closed():
+    f = io.BytesIO(gzip.compress(SVG))
+    parse_svg(f)
+    assert not f.closed
+
+
+def test_iterparse_svg():
+    events = list(iterparse_svg(io.BytesIO(SVG), ("start", "end")))
+    assert [event for event, _element in events] == ["start", "end"]
+    assert events[0][1] is events[1][1]
+
+
+class RecordingFile(io.BytesIO):
+    """A file object which records the sizes of reads made."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.read_sizes = []
+
+    def read(self, size=-1):
+        self.read_sizes.append(size)
+        return super().read(size)
+
+
+def test_iterparse_svg_adaptive_block_size(monkeypatch):
+    monkeypatch.setattr(svg_input, "PARSE_BLOCK_SIZE", 16)
+    monkeypatch.setattr(svg_input, "MAX_PARSE_BLOCK_SIZE", 64)
+
+    data = b"<svg><path d='" + (b"0" * 200) + b"'/><g/><g/><g/><g/><g/><g/></svg>"
+    f = RecordingFile(data)
+    assert [e.tag for _, e in iterparse_svg(f)] == ["path"] + ["g"] * 6 + ["svg"]
+
+    # Block size grows while reading the long attribute, is capped and then
+    # returns to the initial size once it has been parsed.
+    assert f.read_sizes[:5] == [16, 32, 64, 64, 64]
+    assert f.read_sizes[5:] == [16] * (len(f.read_sizes) - 5)
+
+
+def test_parse_svg_empty():
+    with pytest.raises(ElementTree.ParseError):
+        parse_svg(b"")
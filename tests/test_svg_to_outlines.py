@@ -1,5 +1,8 @@
 import pytest
 
+import sys
+import gzip
+
 from shapely.geometry import LineString, Polygon, Point, box
 
 from xml.etree import ElementTree
@@ -92,6 +95,20 @@ def test_straight_line(element: str):
               points="0,0 0 ,1 2, 1 2 , 0"
             />
         """,
+        """
+            <!-- Exponents and signs as separators -->
+            <polyline
+              style="stroke-width:0.1;stroke:#ffff00"
+              points="0-0 0+1E0 20e-1 10.0e-1,2e+0-0.0"
+            />
+        """,
+        """
+            <!-- Odd number of coordinates (final value ignored) -->
+            <polyline
+              style="stroke-width:0.1;stroke:#ffff00"
+              points="0 0 0 1 2 1 2 0 3"
+            />
+        """,
         """
             <path
               style="stroke-width:0.1;stroke:#ffff00"
@@ -615,3 +632,281 @@ def test_alpha_values():
     coord_to_colour = {(points[0][0], points[0][1]): rgba for rgba, _, points in lines}
     for i in range(256):
         assert coord_to_colour[(0, i)] == (0, 0, 0, i / 255)
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_non_element_input(tmp_path, compress):
+    svg = b"""
+        <svg xmlns="http://www.w3.org/2000/svg" width="2cm" height="1cm" viewBox="0 0 2 1">
+            <path style="stroke-width:0.1;stroke:#ff0000" d="M0,0 L2,1"/>
+        </svg>
+    """
+    expected = svg_to_outlines(ElementTree.fromstring(svg))
+    assert len(expected) == 1
+
+    if compress:
+        svg = gzip.compress(svg)
+    filename = tmp_path / "test.svgz"
+    filename.write_bytes(svg)
+
+    assert svg_to_outlines(svg) == expected
+    assert svg_to_outlines(str(filename)) == expected
+    with open(filename, "rb") as f:
+        assert svg_to_outlines(f) == expected
+
+
+def test_cache_instances():
+    uses = "".join(
+        f'<use xlink:href="#mark" transform="translate({x * 0.1}, {y * 0.1})"/>'
+        for x in range(10)
+        for y in range(5)
+    )
+    svg = ElementTree.fromstring(f"""
+        <svg
+          xmlns="http://www.w3.org/2000/svg"
+          xmlns:xlink="http://www.w3.org/1999/xlink"
+          width="2cm" height="1cm" viewBox="0 0 2 1"
+        >
+            <defs>
+                <path
+                  id="mark"
+                  style="stroke-width:0.01;stroke:#ff0000;stroke-dasharray:0.01,0.005"
+                  d="M0,0 Q0.05,0.1 0.1,0 Z"
+                />
+            </defs>
+            {uses}
+        </svg>
+    """)
+    expected = svg_to_outlines(svg)
+    actual = svg_to_outlines(svg, cache_instances=True)
+
+    assert len(actual) == len(expected)
+    for (rgba_a, width_a, line_a), (rgba_e, width_e, line_e) in zip(actual, expected):
+        assert rgba_a == rgba_e
+        assert width_a == pytest.approx(width_e)
+        assert [v for p in line_a for v in p] == pytest.approx(
+            [v for p in line_e for v in p], abs=1e-9
+        )
+
+
+def test_cache_instances_rotated():
+    # Rotated and reflected instances share a cache entry
+    uses = "".join(
+        f'<use xlink:href="#mark" transform="translate(1, 0.5) rotate({angle}) '
+        f'scale({sx}, 1)"/>'
+        for angle in range(0, 360, 30)
+        for sx in [1, -1]
+    )
+    svg = ElementTree.fromstring(f"""
+        <svg
+          xmlns="http://www.w3.org/2000/svg"
+          xmlns:xlink="http://www.w3.org/1999/xlink"
+          width="2cm" height="1cm" viewBox="0 0 2 1"
+        >
+            <defs>
+                <path
+                  id="mark"
+                  style="stroke-width:0.01;stroke:#ff0000;stroke-dasharray:0.01,0.005"
+                  d="M0,0 Q0.05,0.4 0.4,0"
+                />
+            </defs>
+            {uses}
+        </svg>
+    """)
+    expected = svg_to_outlines(svg, pixels_per_mm=20)
+    actual = svg_to_outlines(svg, pixels_per_mm=20, cache_instances=True)
+
+    assert len(actual) == len(expected)
+    for (rgba_a, width_a, line_a), (rgba_e, width_e, line_e) in zip(actual, expected):
+        assert rgba_a == rgba_e
+        assert width_a == pytest.approx(width_e)
+        assert LineString(line_a).hausdorff_distance(
+            LineString(line_e)
+        ) == pytest.approx(0, abs=1 / 20)
+
+
+def test_cache_glyphs():
+    lines = "".join(
+        f'<text x="1" y="{5 + (i * 4)}">The quick brown fox {i}</text>'
+        for i in range(4)
+    )
+    svg = ElementTree.fromstring(f"""
+        <svg
+          xmlns="http://www.w3.org/2000/svg"
+          width="100mm" height="30mm" viewBox="0 0 100 30"
+        >
+            <g style="font-size:3px;stroke:#0000ff;stroke-width:0.1;fill:none">
+                {lines}
+            </g>
+        </svg>
+    """)
+    expected = svg_to_outlines(svg)
+    actual = svg_to_outlines(svg, cache_glyphs=True)
+
+    assert len(actual) == len(expected)
+    for (rgba_a, width_a, line_a), (rgba_e, width_e, line_e) in zip(actual, expected):
+        assert rgba_a == rgba_e
+        assert width_a == pytest.approx(width_e)
+        assert LineString(line_a).hausdorff_distance(
+            LineString(line_e)
+        ) == pytest.approx(0, abs=0.01)
+
+
+@pytest.mark.parametrize("strip", [True, False])
+def test_embedded_image(monkeypatch, strip):
+    if not strip:
+        monkeypatch.setattr(
+            sys.modules["svgoutline.svg_to_outlines"],
+            "strip_image_data",
+            lambda root: root,
+        )
+
+    # A 20x10 pixel PNG, drawn with a different aspect ratio
+    png = (
+        "iVBORw0KGgoAAAANSUhEUgAAABQAAAAKCAIAAAA7N+mxAAAACXBIWXMAAA7EAAAOxAGVKw4b"
+        "AAAAFUlEQVQokWP8z0A+YKJA76jmEaIZAHjzARO8eVH2AAAAAElFTkSuQmCC"
+    )
+    svg = ElementTree.fromstring(f"""
+        <svg
+          xmlns="http://www.w3.org/2000/svg"
+          xmlns:xlink="http://www.w3.org/1999/xlink"
+          width="100mm" height="100mm" viewBox="0 0 100 100"
+        >
+            <image
+              x="5" y="10" width="20" height="30"
+              style="stroke:#ff0000;stroke-width:0.5"
+              xlink:href="data:image/png;base64,{png}"
+            />
+        </svg>
+    """)
+    assert svg_to_outlines(svg) == [
+        ((1.0, 0.0, 0.0, 1.0), 0.5, [(5, 10), (25, 10), (25, 40), (5, 40), (5, 10)])
+    ]
+
+
+@pytest.mark.parametrize(
+    "clip, exp_lines",
+    [
+        (None, [[(-10, 5), (30, 5)], [(5, 10), (5, 30)]]),
+        (False, [[(-10, 5), (30, 5)], [(5, 10), (5, 30)]]),
+        (True, [[(0, 5), (20, 5)], [(5, 10), (5, 20)]]),
+        ((1, 1, 19, 15), [[(1, 5), (19, 5)], [(5, 10), (5, 15)]]),
+    ],
+)
+def test_clip(clip, exp_lines):
+    svg = ElementTree.fromstring("""
+        <svg xmlns="http://www.w3.org/2000/svg" width="2cm" height="2cm" viewBox="0 0 20 20">
+            <path style="stroke:#ff0000;stroke-width:0.1" d="M-10,5 L30,5"/>
+            <path style="stroke:#ff0000;stroke-width:0.1" d="M5,10 L5,30"/>
+        </svg>
+    """)
+    assert svg_to_outlines(svg, clip=clip) == [
+        ((1.0, 0.0, 0.0, 1.0), 0.1, line) for line in exp_lines
+    ]
+
+
+@pytest.mark.parametrize(
+    "fill, exp_lines",
+    [
+        # Opaque fills hide lines beneath them
+        ('<rect x="5" y="0" width="5" height="20" fill="blue"/>', [(0, 5), (10, 20)]),
+        (
+            '<circle cx="10" cy="10" r="5" fill="blue"/>',
+            [(0, 5), (15, 20)],
+        ),
+        # Holes in fills are respected
+        (
+            '<path d="M2,2 H18 V18 H2 Z M6,6 H14 V14 H6 Z" fill="blue" '
+            'fill-rule="evenodd"/>',
+            [(0, 2), (6, 14), (18, 20)],
+        ),
+        (
+            '<path d="M2,2 H18 V18 H2 Z M6,6 H14 V14 H6 Z" fill="blue"/>',
+            [(0, 2), (18, 20)],
+        ),
+        # Translucent fills do not
+        (
+            '<rect x="5" y="0" width="5" height="20" fill="blue" '
+            'fill-opacity="0.5"/>',
+            [(0, 20)],
+        ),
+        (
+            '<rect x="5" y="0" width="5" height="20" fill="blue" opacity="0.5"/>',
+            [(0, 20)],
+        ),
+        # Nor do unfilled shapes
+        ('<rect x="5" y="0" width="5" height="20" fill="none"/>', [(0, 20)]),
+    ],
+)
+def test_occlusion_option(fill, exp_lines):
+    svg = ElementTree.fromstring(f"""
+        <svg xmlns="http://www.w3.org/2000/svg" width="2cm" height="2cm" viewBox="0 0 20 20">
+            <path style="stroke:#ff0000;stroke-width:0.1" d="M0,10 L20,10"/>
+            {fill}
+        </svg>
+    """)
+    assert [
+        (colour, [(round(x, 3), round(y, 3)) for x, y in line])
+        for colour, _width, line in svg_to_outlines(svg, occlusion=True)
+    ] == [((1, 0, 0, 1), [(x0, 10), (x1, 10)]) for x0, x1 in exp_lines]
+
+
+def test_occlusion_order():
+    # Fills only hide lines drawn before them (including strokes of earlier
+    # filled shapes) but not their own strokes or those drawn later.
+    svg = ElementTree.fromstring("""
+        <svg xmlns="http://www.w3.org/2000/svg" width="2cm" height="2cm" viewBox="0 0 20 20">
+            <rect x="0" y="0" width="10" height="10" fill="red" stroke="#00ff00"/>
+            <rect x="5" y="5" width="10" height="10" fill="red" stroke="#0000ff"/>
+            <path stroke="#ff0000" d="M0,7 L20,7"/>
+        </svg>
+    """)
+    assert [
+        (colour, [(round(x, 3), round(y, 3)) for x, y in line])
+        for colour, _width, line in svg_to_outlines(svg, occlusion=True)
+    ] == [
+        # The first square's outline is partly hidden by the second square
+        ((0, 1, 0, 1), [(5, 10), (0, 10), (0, 0), (10, 0), (10, 5)]),
+        ((0, 0, 1, 1), [(5, 5), (15, 5), (15, 15), (5, 15), (5, 5)]),
+        ((1, 0, 0, 1), [(0, 7), (20, 7)]),
+    ]
+
+
+def test_curves():
+    svg = ElementTree.fromstring("""
+        <svg xmlns="http://www.w3.org/2000/svg" width="2cm" height="2cm" viewBox="0 0 20 20">
+            <path style="stroke:#ff0000;stroke-width:0.1" fill="none"
+                  d="M1,1 L2,2 Q3,1 4,2 C5,0 6,4 7,2 Z"/>
+            <circle cx="10" cy="10" r="5" style="stroke:#00ff00;stroke-width:0.1" fill="none"/>
+        </svg>
+    """)
+    ((colour_a, width_a, line_a), (colour_b, width_b, line_b)) = svg_to_outlines(
+        svg, curves=True
+    )
+
+    assert colour_a == (1, 0, 0, 1)
+    assert width_a == 0.1
+    assert line_a == [
+        ((1, 1), (2, 2)),
+        ((2, 2), (3, 1), (4, 2)),
+        ((4, 2), (5, 0), (6, 4), (7, 2)),
+        ((7, 2), (1, 1)),
+    ]
+
+    # Arcs are given as cubic curves
+    assert colour_b == (0, 1, 0, 1)
+    assert width_b == 0.1
+    assert all(len(segment) == 4 for segment in line_b)
+    assert line_b[0][0] == line_b[-1][-1] == (15, 10)
+    assert all(a[-1] == b[0] for a, b in zip(line_b, line_b[1:]))
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"clip": True}, {"occlusion": True}, {"cache": object()}]
+)
+def test_curves_unsupported_options(kwargs):
+    svg = ElementTree.fromstring(
+        '<svg xmlns="http://www.w3.org/2000/svg" width="2cm" height="2cm"/>'
+    )
+    with pytest.raises(ValueError):
+        svg_to_outlines(svg, curves=True, **kwargs)
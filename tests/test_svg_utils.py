@@ -5,6 +5,13 @@ from xml.etree import ElementTree
 from svgoutline.svg_utils import (
     css_dimension_to_mm,
     get_svg_page_size,
+    get_referenced_ids,
+    make_subdocument,
+    points_to_path_data,
+    lines_polylines_and_polygons_to_paths,
+    strip_image_data,
+    prune_unstroked_elements,
+    PLACEHOLDER_IMAGE_HREF,
 )
 
 
@@ -347,3 +354,263 @@ class TestGetSvgPageSize(object):
         """
         )
         assert get_svg_page_size(svg, dpi=72 / 2) == pytest.approx((297 * 2, 420 * 2))
+
+
+def test_get_referenced_ids():
+    svg = ElementTree.fromstring(
+        """
+        <svg xmlns="http://www.w3.org/2000/svg"
+             xmlns:xlink="http://www.w3.org/1999/xlink">
+            <style>.a { fill: url(#fromstyle) }</style>
+            <use href="#a"/>
+            <g>
+                <use xlink:href="#b"/>
+                <use xlink:href="other.svg#notme"/>
+                <path fill="url(#c)" style="stroke:url( '#d' );marker:none"/>
+            </g>
+        </svg>
+    """
+    )
+    assert get_referenced_ids(svg) == {"fromstyle", "a", "b", "c", "d"}
+    assert get_referenced_ids(svg[2]) == {"b", "c", "d"}
+
+
+def test_make_subdocument():
+    svg = ElementTree.fromstring(
+        """
+        <svg xmlns="http://www.w3.org/2000/svg" width="1" height="2">
+            <defs>
+                <linearGradient id="a" href="#b"/>
+                <linearGradient id="b"/>
+                <linearGradient id="c"/>
+            </defs>
+            <path id="p1" fill="url(#a)"/>
+            <path id="p2" fill="url(#missing)"/>
+            <path id="p3"/>
+        </svg>
+    """
+    )
+    definitions = {e.get("id"): e for e in svg[0]}
+
+    sub = make_subdocument(svg, [svg[1], svg[2]], definitions)
+    assert sub.tag == svg.tag
+    assert sub.attrib == svg.attrib
+    assert [e.get("id") for e in sub] == [None, "p1", "p2"]
+    assert [e.get("id") for e in sub[0]] == ["a", "b"]
+
+    # No definitions needed
+    sub = make_subdocument(svg, [svg[3]], definitions)
+    assert [e.get("id") for e in sub] == ["p3"]
+
+    # Original unchanged
+    assert len(svg) == 4
+
+
+@pytest.mark.parametrize(
+    "points, closed, exp",
+    [
+        # Empty
+        ("", False, ""),
+        ("  ", True, ""),
+        # Single coordinate ignored
+        ("1", False, ""),
+        # Single point
+        ("1 2", False, "M1 2"),
+        # Various separators
+        (" 1,2 3 , 4\n5\t6 ", False, "M1,2 3 , 4\n5\t6"),
+        ("1-2+3.5.5", False, "M1-2+3.5.5"),
+        ("1e1 2E-1", False, "M1e1 2E-1"),
+        # Closed
+        ("1 2 3 4", True, "M1 2 3 4Z"),
+        # Odd number of coordinates
+        ("1, 2, 3", False, "M1 2"),
+        ("1e1-2-3", True, "M1e1 -2Z"),
+    ],
+)
+def test_points_to_path_data(points, closed, exp):
+    assert points_to_path_data(points, closed) == exp
+
+
+def test_lines_polylines_and_polygons_to_paths():
+    svg = ElementTree.fromstring(
+        """
+        <svg xmlns="http://www.w3.org/2000/svg">
+            <g id="g1">
+                <line id="l" x1="1" y1="2" x2="3" y2="4" stroke="red"/>
+                <polyline id="pl" points="1 2 3 4"><title>Hi</title></polyline>
+            </g>
+            <g id="g2">
+                <polygon id="pg" points="1 2 3 4 5 6"/>
+            </g>
+            <g id="g3">
+                <path id="p" d="M1 2"/>
+            </g>
+        </svg>
+        """
+    )
+    original = ElementTree.tostring(svg)
+
+    converted = lines_polylines_and_polygons_to_paths(svg)
+    elements = {e.get("id"): e for e in converted.iter() if "id" in e.attrib}
+    path = "{http://www.w3.org/2000/svg}path"
+
+    assert elements["l"].tag == path
+    assert elements["l"].attrib == {"id": "l", "d": "M1 2 L3 4", "stroke": "red"}
+    assert elements["pl"].tag == path
+    assert elements["pl"].attrib == {"id": "pl", "d": "M1 2 3 4"}
+    assert [e.text for e in elements["pl"]] == ["Hi"]
+    assert elements["pg"].tag == path
+    assert elements["pg"].attrib == {"id": "pg", "d": "M1 2 3 4 5 6Z"}
+
+    # Original unchanged
+    assert ElementTree.tostring(svg) == original
+
+    # Unmodified parts of the document are not copied
+    assert converted is not svg
+    assert elements["g1"] is not svg[0]
+    assert elements["g2"] is not svg[1]
+    assert elements["g3"] is svg[2]
+
+    # Nothing left to convert
+    assert lines_polylines_and_polygons_to_paths(converted) is converted
+
+
+def test_strip_image_data():
+    svg = ElementTree.fromstring(
+        """
+        <svg
+          xmlns="http://www.w3.org/2000/svg"
+          xmlns:xlink="http://www.w3.org/1999/xlink"
+        >
+            <image width="1" height="2" xlink:href="data:image/png;base64,AAAA"/>
+            <image width="1" height="2" href="data:image/png;base64,AAAA"/>
+            <image width="1" height="2" xlink:href="example.png"/>
+            <image xlink:href="data:image/png;base64,AAAA"/>
+        </svg>
+        """
+    )
+    xlink_href = "{http://www.w3.org/1999/xlink}href"
+
+    stripped = strip_image_data(svg)
+    assert stripped is not svg
+    assert stripped[0].get(xlink_href) == PLACEHOLDER_IMAGE_HREF
+    assert stripped[1].get("href") == PLACEHOLDER_IMAGE_HREF
+
+    # External images and images without explicit sizes left alone
+    assert stripped[2].get(xlink_href) == "example.png"
+    assert stripped[3].get(xlink_href) == "data:image/png;base64,AAAA"
+
+    # Other attributes unchanged
+    assert stripped[0].get("width") == "1"
+    assert stripped[0].get("height") == "2"
+
+    # Original unchanged
+    assert svg[0].get(xlink_href) == "data:image/png;base64,AAAA"
+
+    # Nothing left to strip
+    assert strip_image_data(stripped) is stripped
+
+
+@pytest.mark.parametrize(
+    "body, exp_ids",
+    [
+        # Nothing to prune
+        ("", []),
+        ('<path id="a" stroke="red"/>', ["a"]),
+        # Not stroked
+        ('<path id="a"/><path id="b" fill="red"/>', []),
+        ('<path id="a" stroke="none"/><path id="b" style="stroke: none"/>', []),
+        # Style attributes take precedence over presentation attributes
+        ('<path id="a" stroke="red" style="stroke:none"/>', []),
+        ('<path id="a" stroke="none" style="stroke:red"/>', ["a"]),
+        # Inherited stroke
+        ('<g id="g" stroke="red"><path id="a"/></g>', ["g", "a"]),
+        ('<g id="g" stroke="red"><path id="a" stroke="none"/></g>', []),
+        ('<g id="g" style="stroke:none"><path id="a" stroke="red"/></g>', ["g", "a"]),
+        (
+            '<g stroke="red"><g stroke="none"><path id="a" stroke="inherit"/></g></g>',
+            [],
+        ),
+        # Only unstroked children of groups removed
+        (
+            '<g id="g"><path id="a" stroke="red"/><path id="b"/></g>',
+            ["g", "a"],
+        ),
+        # Hidden
+        ('<g style="display:none"><path id="a" stroke="red"/></g>', []),
+        ('<g display="none"><g display="inline"><path stroke="red"/></g></g>', []),
+        ('<path id="a" stroke="red" visibility="hidden"/>', []),
+        ('<g visibility="hidden"><path id="a" stroke="red"/></g>', []),
+        # ...with visibility overridden (which QSvg applies to the hidden
+        # element's other descendants too)
+        (
+            '<g id="g" visibility="hidden" stroke="red">'
+            '<path id="a" visibility="visible"/><path id="b"/>'
+            "</g>",
+            ["g", "a", "b"],
+        ),
+        # Markers may be stroked
+        ('<path id="a" marker-end="url(#m)"/>', ["a"]),
+        ('<path id="a" style="marker:url(#m)"/>', ["a"]),
+        # Children of text never removed individually
+        (
+            '<text id="t">Hello <tspan id="a" stroke="red">world</tspan></text>',
+            ["t", "a"],
+        ),
+        ('<text id="t">Hello <tspan id="a">world</tspan></text>', []),
+        # Children of groups with group effects never removed individually
+        (
+            '<g id="g" opacity="0.5"><path id="a" stroke="red"/><path id="b"/></g>',
+            ["g", "a", "b"],
+        ),
+        ('<g id="g" style="opacity:0.5"><path id="a"/><path id="b"/></g>', []),
+        # Definitions, referenced elements and <use> elements kept
+        (
+            '<defs id="d"><path id="a"/></defs><symbol id="s"><path id="b"/></symbol>',
+            ["d", "a", "s", "b"],
+        ),
+        (
+            '<g id="g" display="none"><path id="a"/><path id="b"/></g>'
+            '<use id="u" xlink:href="#a"/>',
+            ["g", "a", "u"],
+        ),
+        ('<g id="g" display="none"><use id="u" xlink:href="#a"/></g>', []),
+        # Non-SVG elements kept
+        ('<inkscape:foo id="a"/>', ["a"]),
+    ],
+)
+def test_prune_unstroked_elements(body, exp_ids):
+    svg = ElementTree.fromstring(f"""
+        <svg
+          xmlns="http://www.w3.org/2000/svg"
+          xmlns:xlink="http://www.w3.org/1999/xlink"
+          xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape"
+        >{body}</svg>
+        """)
+    original = ElementTree.tostring(svg)
+
+    pruned = prune_unstroked_elements(svg)
+    assert [e.get("id") for e in pruned.iter() if "id" in e.attrib] == exp_ids
+
+    # Original unchanged
+    assert ElementTree.tostring(svg) == original
+
+    # Copy made only when required
+    if len(list(pruned.iter())) == len(list(svg.iter())):
+        assert pruned is svg
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        # Style sheets are not evaluated
+        '<style>path { stroke: red; }</style><path id="a"/>',
+        # Animations may change visibility
+        '<path id="a"><set attributeName="stroke" to="red"/></path>',
+    ],
+)
+def test_prune_unstroked_elements_unsupported(body):
+    svg = ElementTree.fromstring(
+        f'<svg xmlns="http://www.w3.org/2000/svg">{body}</svg>'
+    )
+    assert prune_unstroked_elements(svg) is svg
@@ -0,0 +1,54 @@
+import pytest
+
+from xml.etree import ElementTree
+
+from svgoutline.svg_to_outlines import svg_to_outlines
+from svgoutline.thread_pool import OutlineThreadPool
+
+
+def make_svg(i):
+    # A unique document for each job, exercising curves, dashes and text
+    return ElementTree.fromstring(f"""
+        <svg xmlns="http://www.w3.org/2000/svg" width="2cm" height="1cm"
+          viewBox="0 0 2 1">
+            <path style="stroke-width:0.1;stroke:#ff0000" d="M0,0 Q{i % 7},1 2,0"/>
+            <path
+              style="stroke-width:0.01;stroke:#00ff00;stroke-dasharray:0.1,0.05"
+              d="M0,{(i % 10) / 10} L2,1"
+            />
+            <text style="stroke-width:0.01;font-size:0.5;stroke:black" x="0" y="1">
+                {i}
+            </text>
+        </svg>
+    """)
+
+
+@pytest.fixture(scope="module")
+def roots():
+    return [make_svg(i) for i in range(100)]
+
+
+@pytest.fixture(scope="module")
+def expected(roots):
+    return [svg_to_outlines(root, 20, 10, 10) for root in roots]
+
+
+def test_submit(roots, expected):
+    with OutlineThreadPool(max_workers=8) as pool:
+        futures = [pool.submit(root, 20, 10, 10) for root in roots]
+        assert [future.result() for future in futures] == expected
+
+
+def test_map(roots, expected):
+    with OutlineThreadPool(max_workers=8) as pool:
+        assert list(pool.map(roots, 20, 10, 10)) == expected
+
+
+def test_exceptions_propagated():
+    root = ElementTree.fromstring(
+        """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 2 1"/>"""
+    )
+    with OutlineThreadPool(max_workers=1) as pool:
+        future = pool.submit(root)
+        with pytest.raises(ValueError):
+            future.result()